@@ -0,0 +1,387 @@
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+from rich import print as rprint
+from main import BatchRunner, Project, User, hashPassword
+from storage import LockTimeout, VersionConflict, getStorage
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# an idle keep-alive connection is closed after this many seconds
+KEEPALIVE_SECONDS = 30
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {200 : "OK", 201 : "Created", 304 : "Not Modified", 400 : "Bad Request", 401 : "Unauthorized", 403 : "Forbidden",
+           404 : "Not Found", 405 : "Method Not Allowed", 409 : "Conflict", 413 : "Payload Too Large", 500 : "Internal Server Error",
+           503 : "Service Unavailable"}
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#HTTP API
+#
+#A small HTTP/1.1 server on asyncio that exposes projects, tasks, members, comments and history as json. Every request is
+#authenticated with basic auth against the accounts, reads go straight to the storage and changes go through the same
+#User operations as the menus, by way of the BatchRunner. The storage is only touched from one worker thread, so the
+#event loop keeps reading and writing connections while a request is being served.
+
+class ApiError(Exception):
+    def __init__(self, status : int, message : str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method : str, target : str, headers : dict, body : bytes):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = dict(parse_qsl(parts.query))
+        self.headers = headers
+        self.body = body
+        self.username = None
+
+    def json(self) -> dict:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise ApiError(400, "The body is not valid json.")
+        if not isinstance(data, dict):
+            raise ApiError(400, "The body must be a json object.")
+        return data
+
+
+class Response:
+    def __init__(self, status : int, data = None, etag : str = None):
+        self.status = status
+        self.data = data
+        self.etag = etag
+
+
+def makeETag(kind : str, key : str, version) -> str:
+    return '"' + hashlib.sha1(f"{kind}/{key}/{version}".encode()).hexdigest()[:20] + '"'
+
+
+def paginate(items : list, query : dict) -> dict:
+    page, size = pageOf(query)
+    start = (page - 1) * size
+    return {"items" : items[start:start + size], "page" : page, "size" : size, "total" : len(items)}
+
+
+def pageOf(query : dict) -> tuple:
+    try:
+        page = int(query.get("page", 1))
+        size = int(query.get("size", API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, "page and size must be numbers.")
+    if page < 1 or size < 1:
+        raise ApiError(400, "page and size start at 1.")
+    return page, min(size, API_MAX_PAGE_SIZE)
+
+
+class TrellomizeApi:
+    """
+    A class to route the requests of the API to the storage and to the operations of the users.
+    """
+    def __init__(self):
+        route = lambda pattern : re.compile("^" + pattern.replace("{id}", "([^/]+)") + "/?$")
+        self.routes = [
+            (route("/projects"), {"GET" : self.listProjects, "POST" : self.createProject}),
+            (route("/tasks"), {"GET" : self.listAssignedTasks}),
+            (route("/projects/{id}"), {"GET" : self.getProject, "PATCH" : self.updateProject, "DELETE" : self.deleteProject}),
+            (route("/projects/{id}/members"), {"GET" : self.listMembers, "POST" : self.addMember}),
+            (route("/projects/{id}/members/{id}"), {"DELETE" : self.removeMember}),
+            (route("/projects/{id}/tasks"), {"GET" : self.listTasks, "POST" : self.createTask}),
+            (route("/projects/{id}/tasks/{id}"), {"GET" : self.getTask, "PATCH" : self.updateTask, "DELETE" : self.deleteTask}),
+            (route("/projects/{id}/tasks/{id}/assignees"), {"POST" : self.addAssignee}),
+            (route("/projects/{id}/tasks/{id}/assignees/{id}"), {"DELETE" : self.removeAssignee}),
+            (route("/projects/{id}/tasks/{id}/comments"), {"GET" : self.listComments, "POST" : self.addComment, "DELETE" : self.clearComments}),
+            (route("/projects/{id}/tasks/{id}/history"), {"GET" : self.listHistory}),
+        ]
+
+    def handle(self, request : Request) -> Response:
+        for pattern, methods in self.routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if request.method not in methods:
+                raise ApiError(405, f"{request.method} is not allowed on {request.path}.")
+            request.username = self.authenticate(request)
+            # the operations print their messages for the menus, they are not part of a response
+            with contextlib.redirect_stdout(io.StringIO()):
+                return methods[request.method](request, *[unquote(value) for value in match.groups()])
+        raise ApiError(404, f"There is nothing at {request.path}.")
+
+    def authenticate(self, request : Request) -> str:
+        header = request.headers.get("authorization", "")
+        try:
+            username, password = base64.b64decode(header[6:]).decode().split(":", 1) if header.startswith("Basic ") else (None, None)
+        except ValueError:
+            username, password = None, None
+        account = getStorage().load("accounts", username) if username else None
+        if account is None or account["password"] != hashPassword(password):
+            raise ApiError(401, "Invalid username or password.")
+        if account["activityStatus"] == "inactive":
+            raise ApiError(403, "The account is inactive.")
+        return username
+
+    # func to check that a user can see a project, a project the user has nothing to do with does not exist for them
+    def checkProject(self, user : User, prID : str) -> None:
+        if prID not in user.projects and prID not in user.assignedProjects:
+            raise ApiError(404, f"Project '{prID}' was not found.")
+
+    def checkTask(self, user : User, prID : str, taskID : str) -> Project:
+        self.checkProject(user, prID)
+        project = Project.loadProject(prID)
+        if project is None or project.locate_task(taskID) is None:
+            raise ApiError(404, f"Task '{taskID}' was not found in project '{prID}'.")
+        return project
+
+    # func to answer a document with its ETag, the document is not even read when the client already has this version
+    def document(self, request : Request, kind : str, key : str) -> Response:
+        storage = getStorage()
+        version = storage.version(kind, key)
+        if version is None:
+            raise ApiError(404, f"'{key}' was not found.")
+        etag = makeETag(kind, key, version)
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(304, etag=etag)
+        return Response(200, storage.load(kind, key), etag)
+
+    # func to apply operations of the users in one commit, nothing is kept when one of them fails
+    def apply(self, request : Request, ops : list, status : int = 200) -> Response:
+        runner = BatchRunner(User.loadUser(request.username), io.StringIO())
+        results = []
+        try:
+            with getStorage().transaction():
+                for op in ops:
+                    result = runner.apply(len(results) + 1, op)
+                    results.append(result)
+                    if not result["ok"] and result.get("error", "").startswith(LockTimeout.__name__):
+                        raise ApiError(503, result["error"])
+                    if not result["ok"]:
+                        raise ApiError(400 if result.get("error") else 403, result.get("error") or result["message"] or "The operation was refused.")
+        except VersionConflict as conflict:
+            # a document was changed by someone else while the request was applied, the client can send it again
+            raise ApiError(409, str(conflict))
+        data = {"ok" : True, "message" : " ".join(result["message"] for result in results if result["message"])}
+        if results and "taskID" in results[-1]:
+            data["taskID"] = results[-1]["taskID"]
+        return Response(status, data)
+
+    def listProjects(self, request : Request) -> Response:
+        user = User.loadUser(request.username)
+        items = [{"projectID" : prID, "title" : project["ProjectName"], "role" : "admin"} for prID, project in user.projects.items()]
+        items += [{"projectID" : prID, "role" : "member"} for prID in user.assignedProjects]
+        page = paginate(items, request.query)
+        for item in page["items"]:
+            if "title" not in item:
+                project = Project.loadProject(item["projectID"])
+                item["title"] = project.title if project is not None else None
+        return Response(200, page)
+
+    # func to list the tasks assigned to the user in every project, soonest deadline first
+    def listAssignedTasks(self, request : Request) -> Response:
+        return Response(200, paginate(User.loadUser(request.username).assignedTasks(), request.query))
+
+    def createProject(self, request : Request) -> Response:
+        body = request.json()
+        return self.apply(request, [{"op" : "create-project", "projectID" : body.get("projectID"), "title" : body.get("title", "")}], 201)
+
+    def getProject(self, request : Request, prID : str) -> Response:
+        self.checkProject(User.loadUser(request.username), prID)
+        return self.document(request, "projects", prID)
+
+    def updateProject(self, request : Request, prID : str) -> Response:
+        body = request.json()
+        ops = []
+        if "title" in body:
+            ops.append({"op" : "retitle-project", "projectID" : prID, "title" : body["title"]})
+        if "description" in body:
+            ops.append({"op" : "describe-project", "projectID" : prID, "description" : body["description"]})
+        if not ops:
+            raise ApiError(400, "Nothing to change, send a title and/or a description.")
+        return self.apply(request, ops)
+
+    def deleteProject(self, request : Request, prID : str) -> Response:
+        return self.apply(request, [{"op" : "delete-project", "projectID" : prID}])
+
+    def listMembers(self, request : Request, prID : str) -> Response:
+        self.checkProject(User.loadUser(request.username), prID)
+        project = Project.loadProject(prID)
+        return Response(200, paginate([project.admin] + project.members, request.query))
+
+    def addMember(self, request : Request, prID : str) -> Response:
+        return self.apply(request, [{"op" : "add-member", "projectID" : prID, "username" : request.json().get("username")}])
+
+    def removeMember(self, request : Request, prID : str, username : str) -> Response:
+        return self.apply(request, [{"op" : "remove-member", "projectID" : prID, "username" : username}])
+
+    def listTasks(self, request : Request, prID : str) -> Response:
+        self.checkProject(User.loadUser(request.username), prID)
+        project = Project.loadProject(prID)
+        status, priority = request.query.get("status"), request.query.get("priority")
+        rows = [dict(row, Status=rowStatus, Priority=rowPriority) for rowStatus, cell in project.tasks.items() if status in [None, rowStatus]
+                for rowPriority, cellRows in cell.items() if priority in [None, rowPriority] for row in cellRows]
+        return Response(200, paginate(rows, request.query))
+
+    def createTask(self, request : Request, prID : str) -> Response:
+        user = User.loadUser(request.username)
+        self.checkProject(user, prID)
+        if prID not in user.projects:
+            raise ApiError(403, "Only the admin of the project can create tasks.")
+        op = {key : value for key, value in request.json().items() if key in ["title", "description", "priority", "status", "start", "deadline"]}
+        op.update({"op" : "create-task", "projectID" : prID})
+        return self.apply(request, [op], 201)
+
+    def getTask(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.document(request, "tasks", taskID)
+
+    def updateTask(self, request : Request, prID : str, taskID : str) -> Response:
+        body = request.json()
+        changes = {"title" : "retitle-task", "status" : "change-status", "priority" : "change-priority", "deadline" : "change-deadline"}
+        ops = [{"op" : op, "projectID" : prID, "taskID" : taskID, field : body[field]} for field, op in changes.items() if field in body]
+        if not ops:
+            raise ApiError(400, "Nothing to change, send a title, status, priority and/or deadline.")
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.apply(request, ops)
+
+    def deleteTask(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.apply(request, [{"op" : "delete-task", "projectID" : prID, "taskID" : taskID}])
+
+    def addAssignee(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.apply(request, [{"op" : "assign", "projectID" : prID, "taskID" : taskID, "username" : request.json().get("username")}])
+
+    def removeAssignee(self, request : Request, prID : str, taskID : str, username : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.apply(request, [{"op" : "unassign", "projectID" : prID, "taskID" : taskID, "username" : username}])
+
+    def listComments(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return Response(200, paginate(getStorage().load("tasks", taskID)["Comments"], request.query))
+
+    def addComment(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.apply(request, [{"op" : "comment", "projectID" : prID, "taskID" : taskID, "comment" : request.json().get("comment")}])
+
+    def clearComments(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        return self.apply(request, [{"op" : "clear-comments", "projectID" : prID, "taskID" : taskID}])
+
+    def listHistory(self, request : Request, prID : str, taskID : str) -> Response:
+        self.checkTask(User.loadUser(request.username), prID, taskID)
+        storage = getStorage()
+        page, size = pageOf(request.query)
+        start = (page - 1) * size
+        return Response(200, {"items" : storage.readHistory(taskID, start, start + size) or [], "page" : page, "size" : size, "total" : storage.historySize(taskID) or 0})
+
+
+class ApiServer:
+    """
+    A class to serve the API over keep-alive HTTP/1.1 connections.
+    """
+    def __init__(self, api : TrellomizeApi = None):
+        self.api = api or TrellomizeApi()
+        # the storage and the model objects are not thread safe, every request is served by the same worker thread
+        self.worker = ThreadPoolExecutor(max_workers=1)
+
+    def serve(self, request : Request) -> Response:
+        try:
+            return self.api.handle(request)
+        except ApiError as error:
+            return Response(error.status, {"error" : str(error)})
+        except Exception as error:
+            return Response(500, {"error" : f"{type(error).__name__}: {error}"})
+
+    async def readRequest(self, reader : asyncio.StreamReader) -> Request:
+        line = await asyncio.wait_for(reader.readline(), KEEPALIVE_SECONDS)
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "Malformed request line.")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in [b"\r\n", b"\n", b""]:
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, "The body is too large.")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method, target, headers, body)
+
+    def writeResponse(self, writer : asyncio.StreamWriter, response : Response, keepAlive : bool) -> None:
+        body = b"" if response.status == 304 else json.dumps(response.data, ensure_ascii=False).encode()
+        headers = [f"HTTP/1.1 {response.status} {REASONS.get(response.status, '')}", "Content-Type: application/json",
+                   f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keepAlive else 'close'}"]
+        if response.etag is not None:
+            headers.append(f"ETag: {response.etag}")
+        if response.status == 401:
+            headers.append('WWW-Authenticate: Basic realm="trellomize"')
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def connection(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await self.readRequest(reader)
+                except ApiError as error:
+                    self.writeResponse(writer, Response(error.status, {"error" : str(error)}), False)
+                    break
+                if request is None:
+                    break
+
+                keepAlive = request.headers.get("connection", "").lower() != "close"
+                response = await loop.run_in_executor(self.worker, self.serve, request)
+                self.writeResponse(writer, response, keepAlive)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host : str, port : int) -> asyncio.base_events.Server:
+        return await asyncio.start_server(self.connection, host, port)
+
+
+async def runApi(host : str, port : int) -> None:
+    server = await ApiServer().start(host, port)
+    rprint(f"[spring_green1]The API is listening on http://{host}:{server.sockets[0].getsockname()[1]}[/spring_green1]")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Trellomize HTTP API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    args = parser.parse_args()
+    try:
+        asyncio.run(runApi(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
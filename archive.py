@@ -0,0 +1,190 @@
+import gzip
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from rich import print as rprint
+from main import Project, User, generate_unique_id, logger
+from storage import getStorage
+from audit import auditEvent
+from indexes import getAssignmentIndex
+from search import indexTasks
+
+ARCHIVE_BATCH = 500
+ARCHIVE_WORKERS = 4
+# the history of a task is written and read this many records at a time
+ARCHIVE_HISTORY_CHUNK = 500
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Project archives
+#
+#An archive keeps a whole project as json lines: the project document first, then every task followed by its history in
+#chunks. A path ending with .gz is compressed. Both directions go through generators, so only a window of tasks and one
+#chunk of history are held at a time.
+
+def openArchive(path : str, mode : str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def prefetch(function, items, workers : int = ARCHIVE_WORKERS):
+    """
+    A function to map items through a thread pool, keeping their order and at most twice as many pending calls as workers.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(function, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def projectEntries(projectID : str, workers : int = ARCHIVE_WORKERS):
+    """
+    A function to go through the entries of the archive of a project.
+    """
+    storage = getStorage()
+    project = storage.load("projects", projectID)
+    yield {"kind" : "project", "data" : project}
+
+    taskIDs = (row["taskID"] for cell in project["tasks"].values() for rows in cell.values() for row in rows)
+    load = lambda taskID : storage.load("tasks", taskID)
+    tasks = prefetch(load, taskIDs, workers) if storage.parallelReads else map(load, taskIDs)
+
+    for task in tasks:
+        if task is None:
+            continue
+        yield {"kind" : "task", "data" : task}
+        size = storage.historySize(task["taskID"]) or 0
+        for start in range(0, size, ARCHIVE_HISTORY_CHUNK):
+            yield {"kind" : "history", "taskID" : task["taskID"], "records" : storage.readHistory(task["taskID"], start, start + ARCHIVE_HISTORY_CHUNK)}
+
+
+def writeArchive(path : str, entries) -> dict:
+    counts = {"tasks" : 0, "history" : 0}
+    with openArchive(path, 'w') as file:
+        for entry in entries:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if entry["kind"] == "task":
+                counts["tasks"] += 1
+            elif entry["kind"] == "history":
+                counts["history"] += len(entry["records"])
+    return counts
+
+
+def readArchive(path : str):
+    with openArchive(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def exportProject(projectID : str, path : str, workers : int = ARCHIVE_WORKERS) -> dict:
+    """
+    A function to write a project with its tasks, comments and history into a single archive.
+    """
+    if not getStorage().exists("projects", projectID):
+        rprint(f"[deep_pink2]Project '{projectID}' was not found.[/deep_pink2]")
+        return None
+
+    counts = writeArchive(path, projectEntries(projectID, workers))
+    logger.info(f"Project '{projectID}' was exported with {counts['tasks']} tasks.")
+    return counts
+
+
+def importProject(path : str, projectID : str = None, admin : str = None) -> dict:
+    """
+    A function to create a project from an archive written by exportProject.
+
+    The project gets the archived ID unless another one is given, and the archived admin unless another user is
+    given. A task whose ID is already taken gets a new one. The tasks and their history are committed every
+    ARCHIVE_BATCH entries.
+    """
+    storage = getStorage()
+    entries = readArchive(path)
+    first = next(entries, None)
+    if first is None or first["kind"] != "project":
+        rprint("[deep_pink2]The file is not a project archive.[/deep_pink2]")
+        return None
+
+    data = first["data"]
+    projectID = projectID or data["projectID"]
+    admin = admin or data["admin"]
+    adminUser = User.loadUser(admin)
+    if adminUser is None:
+        rprint(f"[deep_pink2]User '{admin}' was not found.[/deep_pink2]")
+        return None
+    if storage.exists("projects", projectID) or not storage.reserve("projectIDs", projectID):
+        rprint(f"[deep_pink2]The project ID '{projectID}' is already taken.[/deep_pink2]")
+        return None
+
+    counts = {"tasks" : 0, "history" : 0}
+    newIDs = {}
+
+    def commitBatch(batch : list) -> None:
+        assigned = {}
+        with storage.transaction():
+            for entry in batch:
+                if entry["kind"] == "task":
+                    storage.save("tasks", entry["data"]["taskID"], entry["data"])
+                    for username in entry["data"]["Assignees"]:
+                        assigned.setdefault(username, {})[entry["data"]["taskID"]] = projectID
+                else:
+                    for record in entry["records"]:
+                        storage.appendHistory(entry["taskID"], record["note"], record["time"])
+            for username, tasks in assigned.items():
+                getAssignmentIndex().assignAll(username, tasks)
+            indexTasks([(entry["data"]["taskID"], projectID, entry["data"]["taskTitle"], entry["data"]["taskDescription"], entry["data"]["Comments"])
+                        for entry in batch if entry["kind"] == "task"])
+
+    batch = []
+    size = 0
+    for entry in entries:
+        if entry["kind"] == "task":
+            task = entry["data"]
+            if storage.exists("tasks", task["taskID"]):
+                newIDs[task["taskID"]] = generate_unique_id()
+                task["taskID"] = newIDs[task["taskID"]]
+            counts["tasks"] += 1
+            size += 1
+        elif entry["kind"] == "history":
+            entry["taskID"] = newIDs.get(entry["taskID"], entry["taskID"])
+            counts["history"] += len(entry["records"])
+            size += len(entry["records"])
+        batch.append(entry)
+        if size >= ARCHIVE_BATCH:
+            commitBatch(batch)
+            batch = []
+            size = 0
+            rprint(f"[turquoise4]Imported {counts['tasks']} tasks...[/turquoise4]")
+    commitBatch(batch)
+
+    project = Project(projectID, data["title"], admin)
+    project.description = data["description"]
+    project.members = [username for username in data["members"] if username != admin]
+    project.tasks = data["tasks"]
+    for cell in project.tasks.values():
+        for rows in cell.values():
+            for row in rows:
+                row["taskID"] = newIDs.get(row["taskID"], row["taskID"])
+    project.build_locator()
+
+    with storage.transaction():
+        rows = [dict(row) for cell in project.tasks.values() for rows in cell.values() for row in rows]
+        adminUser.projects[projectID] = {"ProjectName" : project.title, "Admin" : admin, "Members" : list(project.members), "tasks" : rows}
+        # members that have no account yet get a user that keeps the project until they sign up
+        for username in project.members:
+            member = User.loadUser(username) if storage.exists("users", username) else User(username, "", "")
+            if projectID not in member.assignedProjects:
+                member.assignedProjects.append(projectID)
+            member.saveUser()
+        adminUser.saveUser()
+        project.saveProject(projectID)
+
+    logger.info(f"Project '{projectID}' was imported with {counts['tasks']} tasks by '{admin}'.")
+    auditEvent(admin, "import-project", projectID, new=counts["tasks"])
+    return counts
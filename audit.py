@@ -0,0 +1,145 @@
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+from storage import Storage, getStorage, lockFile
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Audit trail
+#
+#Every change a user makes to a project or a task is kept as a structured event: who made it, what it was, the project and
+#the task it touched, the old and the new value and when it happened.
+
+class AuditLog:
+    """
+    A class to keep audit events as json lines, one file per day, each with a sidecar index.
+
+    An event is appended to audit-<day>.jsonl and its offset, length, actor and project to audit-<day>.idx. A query
+    only opens the days in its range and seeks straight to the events that match, so it never decodes the events of
+    other users or projects. The index of a day is kept in memory as lists of offsets per actor and per project, and
+    only the lines appended since the last query are read, so a query does not go through the entries of other
+    users or projects either.
+    """
+    def __init__(self, storage : Storage):
+        self.storage = storage
+        self.root = os.path.join(getattr(storage, "root", "."), "audit")
+        # day -> {"read" : bytes of the index read so far, "all" : entries, "actors" : actor -> entries, "projects" : project -> entries}
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def _eventsPath(self, day : str) -> str:
+        return os.path.join(self.root, f"audit-{day}.jsonl")
+
+    def _indexPath(self, day : str) -> str:
+        return os.path.join(self.root, f"audit-{day}.idx")
+
+    def record(self, actor : str, action : str, project : str = None, task : str = None, old = None, new = None, time : str = None) -> dict:
+        event = {
+            "time" : time or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "actor" : actor,
+            "action" : action,
+            "project" : project,
+            "task" : task,
+            "old" : old,
+            "new" : new
+        }
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        day = event["time"][:10]
+
+        os.makedirs(self.root, exist_ok=True)
+        # the offset and the index line of an event must not interleave with another process
+        with open(self._eventsPath(day), 'ab') as events, open(self._indexPath(day), 'ab') as index, lockFile(events):
+            offset = events.seek(0, os.SEEK_END)
+            events.write(line)
+            events.flush()
+            index.write((json.dumps([offset, len(line), actor, project], ensure_ascii=False) + "\n").encode("utf-8"))
+            index.flush()
+        return event
+
+    def days(self, since : str = None, until : str = None) -> list:
+        days = sorted(os.path.basename(path)[len("audit-"):-len(".jsonl")] for path in glob.glob(os.path.join(self.root, "audit-*.jsonl")))
+        return [day for day in days if (since is None or day >= since[:10]) and (until is None or day <= until[:10])]
+
+    # func to read the index lines of a day appended since the last query into the lists of its actors and projects
+    def _dayIndex(self, day : str) -> dict:
+        with self.lock:
+            index = self.indexes.setdefault(day, {"read" : 0, "all" : [], "actors" : {}, "projects" : {}})
+            try:
+                if os.path.getsize(self._indexPath(day)) == index["read"]:
+                    return index
+            except FileNotFoundError:
+                return index
+
+            with open(self._indexPath(day), 'rb') as file:
+                file.seek(index["read"])
+                for line in file:
+                    # the last line of an index that is being written is read once it is complete
+                    if not line.endswith(b"\n"):
+                        break
+                    index["read"] += len(line)
+                    try:
+                        entry = tuple(json.loads(line))
+                    except json.JSONDecodeError:
+                        # a line that was being written when a process stopped
+                        continue
+                    index["all"].append(entry)
+                    index["actors"].setdefault(entry[2], []).append(entry)
+                    index["projects"].setdefault(entry[3], []).append(entry)
+            return index
+
+    def query(self, actor : str = None, project : str = None, since : str = None, until : str = None, action : str = None):
+        """
+        A function to go through the events of an actor and/or a project between two times ("%Y-%m-%d" or "%Y-%m-%d %H:%M:%S"), both included.
+        """
+        if until is not None and len(until) == 10:
+            until += " 23:59:59"
+
+        for day in self.days(since, until):
+            index = self._dayIndex(day)
+            entries = index["all"]
+            if actor is not None:
+                entries = index["actors"].get(actor, [])
+            if project is not None:
+                projectEntries = index["projects"].get(project, [])
+                # with an actor as well, the shorter of the two lists is gone through
+                if len(projectEntries) < len(entries) or actor is None:
+                    entries = projectEntries
+            if not entries:
+                continue
+
+            with open(self._eventsPath(day), 'rb') as events:
+                for offset, length, eventActor, eventProject in entries:
+                    if (actor is not None and eventActor != actor) or (project is not None and eventProject != project):
+                        continue
+
+                    events.seek(offset)
+                    event = json.loads(events.read(length))
+                    if (since is not None and event["time"] < since) or (until is not None and event["time"] > until):
+                        continue
+                    if action is not None and event["action"] != action:
+                        continue
+                    yield event
+
+
+_auditLog = None
+
+
+def getAuditLog() -> AuditLog:
+    """
+    A function to get the audit trail kept next to the storage in use.
+    """
+    global _auditLog
+    if _auditLog is None or _auditLog.storage is not getStorage():
+        _auditLog = AuditLog(getStorage())
+    return _auditLog
+
+
+def auditEvent(actor : str, action : str, project : str = None, task : str = None, old = None, new = None) -> None:
+    """
+    A function to record an event once the change it describes is committed, a change that is undone or retried leaves no event.
+    """
+    time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    getStorage().afterCommit(lambda : getAuditLog().record(actor, action, project, task, old, new, time))
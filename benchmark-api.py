@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import tempfile
+import time
+from rich.console import Console
+from rich.table import Table
+from api import ApiServer, Request, TrellomizeApi
+from main import User, hashPassword
+from storage import JsonStorage, getStorage, setStorage
+
+# A load test of the HTTP API on localhost, with keep-alive clients that revalidate a project and its tasks with ETags:
+# python benchmark-api.py --clients 1 10 50 --requests 200
+
+
+async def client(port : int, auth : str, targets : list, requests : int, latencies : list, statuses : list) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    for i in range(requests):
+        target = targets[i % len(targets)]
+        start = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\nAuthorization: {auth}\r\nIf-None-Match: {etags.get(target, '')}\r\n\r\n".encode())
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            headers[name.lower()] = value.strip()
+        await reader.readexactly(int(headers.get("content-length", 0)))
+        latencies.append(time.perf_counter() - start)
+        statuses.append(status)
+        if "etag" in headers:
+            etags[target] = headers["etag"]
+    writer.close()
+
+
+async def run(port : int, auth : str, targets : list, clients : int, requests : int) -> tuple:
+    latencies = []
+    statuses = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, auth, targets, requests, latencies, statuses) for _ in range(clients)))
+    return time.perf_counter() - start, latencies, statuses
+
+
+async def benchmark(clientCounts : list, requests : int, tasks : int) -> Table:
+    api = TrellomizeApi()
+    server = ApiServer(api)
+    auth = "Basic " + base64.b64encode(b"bench:pw").decode()
+    server.serve(Request("POST", "/projects", {"authorization" : auth}, json.dumps({"projectID" : "bench", "title" : "bench"}).encode()))
+    targets = ["/projects/bench", "/projects/bench/tasks"]
+    for i in range(tasks):
+        response = server.serve(Request("POST", "/projects/bench/tasks", {"authorization" : auth}, json.dumps({"title" : f"task {i}"}).encode()))
+        targets.append(f"/projects/bench/tasks/{response.data['taskID']}")
+
+    listening = await server.start("127.0.0.1", 0)
+    port = listening.sockets[0].getsockname()[1]
+
+    table = Table(title="API requests on localhost")
+    for column in ["CLIENTS", "REQUESTS", "REQ/S", "P50 (ms)", "P99 (ms)", "304"]:
+        table.add_column(column, style="cyan3" if column in ["CLIENTS", "REQUESTS"] else "chartreuse2", justify="left" if column in ["CLIENTS", "REQUESTS"] else "right")
+
+    for clients in clientCounts:
+        seconds, latencies, statuses = await run(port, auth, targets, clients, requests)
+        latencies.sort()
+        table.add_row(str(clients), str(len(latencies)), f"{len(latencies) / seconds:,.0f}",
+                      f"{statistics.median(latencies) * 1000:.2f}", f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}",
+                      f"{statuses.count(304) / len(statuses):.0%}")
+
+    listening.close()
+    await listening.wait_closed()
+    return table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='API benchmark')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10, 50], help='Number of concurrent keep-alive clients')
+    parser.add_argument('--requests', type=int, default=200, help='Number of requests of each client')
+    parser.add_argument('--tasks', type=int, default=20, help='Number of tasks in the project')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for folder in ['users', 'projects', 'tasks', 'tasks/History']:
+            os.makedirs(os.path.join(root, folder))
+        setStorage(JsonStorage(root))
+        getStorage().save("accounts", "bench", {"username" : "bench", "password" : hashPassword("pw"), "email" : "bench@gmail.com", "activityStatus" : "active", "loginStatus" : "logged out"})
+        User("bench", "bench@gmail.com", hashPassword("pw")).saveUser()
+        Console().print(asyncio.run(benchmark(args.clients, args.requests, args.tasks)))
+
+
+if __name__ == "__main__":
+    main()
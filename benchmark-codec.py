@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+import uuid
+from rich.console import Console
+from rich.table import Table
+from storage import CODECS
+
+# A benchmark to compare the size and the encode/decode cost of the codecs on a project with its tasks:
+# python benchmark-codec.py --sizes 1000 10000 100000
+
+STATUSES = ["BACKLOG", "TODO", "DOING", "DONE", "ARCHIVED"]
+PRIORITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+def makeTask(taskID : str) -> dict:
+    return {
+        "taskID": taskID,
+        "taskTitle": "task " + taskID[:8],
+        "taskDescription": "a synthetic task used by the codec benchmark",
+        "createdDT": "2024-05-01T10:00:00",
+        "deadlineDT": "2024-05-02T10:00:00",
+        "Priority": random.choice(PRIORITIES),
+        "Status": random.choice(STATUSES),
+        "Assignees": ["user0"],
+        "Comments" : ["first comment"]
+    }
+
+
+def makeProject(tasks : list) -> dict:
+    """
+    A function to build a project document whose board holds the given tasks.
+    """
+    board = {status : {priority : [] for priority in PRIORITIES} for status in STATUSES}
+    for task in tasks:
+        board[task["Status"]][task["Priority"]].append({"taskID" : task["taskID"], "taskTitle" : task["taskTitle"]})
+    return {"projectID" : "bench", "title" : "benchmark", "leader" : "user0", "members" : ["user0"], "tasks" : board}
+
+
+def timed(action) -> float:
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Codec benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Number of tasks in the synthetic project')
+    args = parser.parse_args()
+
+    table = Table(title="Project document and its tasks per codec")
+    for column in ["CODEC", "TASKS", "PROJECT BYTES", "TASK BYTES", "ENCODE MS", "DECODE MS"]:
+        table.add_column(column, style="cyan3" if column in ["CODEC", "TASKS"] else "chartreuse2", justify="left" if column in ["CODEC", "TASKS"] else "right")
+
+    for size in args.sizes:
+        random.seed(size)
+        tasks = [makeTask(str(uuid.uuid4())) for _ in range(size)]
+        project = makeProject(tasks)
+        for name, codec in CODECS.items():
+            encoded = {}
+            def encodeAll():
+                encoded["project"] = codec.encode("projects", project)
+                encoded["tasks"] = [codec.encode("tasks", task) for task in tasks]
+            def decodeAll():
+                codec.decode("projects", encoded["project"])
+                for raw in encoded["tasks"]:
+                    codec.decode("tasks", raw)
+            encodeMs = timed(encodeAll)
+            decodeMs = timed(decodeAll)
+            taskBytes = sum(len(raw) for raw in encoded["tasks"])
+            table.add_row(name, str(size), str(len(encoded["project"])), str(taskBytes), f"{encodeMs:.1f}", f"{decodeMs:.1f}")
+
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+from rich.console import Console
+from rich.table import Table
+from main import User, hashPassword
+from storage import JsonStorage, lockStats, setStorage
+
+# A benchmark of processes that comment on tasks at the same time, either all on one task or each on its own project,
+# with the time they spent waiting for the record locks:
+# python benchmark-locks.py --processes 2 4 8 --comments 100
+
+
+def seed(root : str, processes : int) -> None:
+    setStorage(JsonStorage(root))
+    with contextlib.redirect_stdout(io.StringIO()):
+        for number in range(processes):
+            user = User(f"user{number}", f"user{number}@gmail.com", hashPassword("pw"))
+            user.saveUser()
+            user.createProject(f"P{number}", "bench")
+            user.createTask(f"P{number}", "1")
+
+
+def worker(root : str, username : str, prID : str, comments : int, results) -> None:
+    setStorage(JsonStorage(root))
+    user = User.loadUser(username)
+    taskID = user.projects[prID]["tasks"][0]["taskID"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(comments):
+            user.addComment(prID, taskID, f"comment {i}")
+    results.put(lockStats())
+
+
+def run(root : str, processes : int, comments : int, shared : bool) -> tuple:
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    # on a shared task every process comments as the admin of the first project
+    workers = [context.Process(target=worker, args=(root, "user0" if shared else f"user{number}", "P0" if shared else f"P{number}", comments, results))
+               for number in range(processes)]
+    start = time.perf_counter()
+    for process in workers:
+        process.start()
+    stats = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    seconds = time.perf_counter() - start
+
+    tasks = [stat["tasks"] for stat in stats]
+    return seconds, sum(stat["contended"] for stat in tasks), sum(stat["locks"] for stat in tasks), sum(stat["waitSeconds"] for stat in tasks), max(stat["maxWaitSeconds"] for stat in tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Record lock benchmark')
+    parser.add_argument('--processes', type=int, nargs='+', default=[2, 4, 8], help='Number of processes commenting at the same time')
+    parser.add_argument('--comments', type=int, default=100, help='Number of comments of each process')
+    args = parser.parse_args()
+
+    table = Table(title="Concurrent comments with record locks")
+    for column in ["TASKS", "PROCESSES", "COMMENTS/S", "CONTENDED", "WAIT (s)", "MAX WAIT (ms)"]:
+        table.add_column(column, style="cyan3" if column in ["TASKS", "PROCESSES"] else "chartreuse2", justify="left" if column in ["TASKS", "PROCESSES"] else "right")
+
+    for processes in args.processes:
+        for shared in [True, False]:
+            with tempfile.TemporaryDirectory() as root:
+                for folder in ['users', 'projects', 'tasks', 'tasks/History']:
+                    os.makedirs(os.path.join(root, folder))
+                seed(root, processes)
+                seconds, contended, locks, waited, maxWait = run(root, processes, args.comments, shared)
+                table.add_row("same task" if shared else "own project", str(processes), f"{processes * args.comments / seconds:,.0f}",
+                              f"{contended / locks:.0%}", f"{waited:.2f}", f"{maxWait * 1000:.1f}")
+
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
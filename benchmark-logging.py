@@ -0,0 +1,77 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+from rich.console import Console
+from rich.table import Table
+from main import makeLogHandler, startLogListener
+
+# A benchmark to compare the old synchronous log file with the queued and rotated one, in records per second:
+# python benchmark-logging.py --records 10000 100000
+
+
+class RebuiltFormatter(logging.Formatter):
+    """
+    A class with the formatter the app used before, which built a new logging.Formatter for every record.
+    """
+    def format(self, record):
+        formatter = logging.Formatter("%(levelname)s - %(asctime)s - %(name)s) %(message)s")
+        return formatter.format(record)
+
+
+def logRecords(logger : logging.Logger, records : int) -> float:
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info(f"'{i}' task was removed from the 'bench' project by 'user0'.")
+    return time.perf_counter() - start
+
+
+def runSync(root : str, records : int) -> tuple:
+    logger = logging.getLogger("bench.sync")
+    handler = logging.FileHandler(os.path.join(root, "sync.log"))
+    handler.setFormatter(RebuiltFormatter())
+    logger.addHandler(handler)
+    seconds = logRecords(logger, records)
+    logger.removeHandler(handler)
+    handler.close()
+    return seconds, seconds
+
+
+def runQueued(root : str, records : int, compress : bool) -> tuple:
+    logger = logging.getLogger(f"bench.queued.{compress}")
+    listener = startLogListener(logger, makeLogHandler(os.path.join(root, f"queued-{compress}.log"), 1024 * 1024, 5, compress))
+    start = time.perf_counter()
+    seconds = logRecords(logger, records)
+    listener.stop()
+    drained = time.perf_counter() - start
+    for handler in listener.handlers:
+        handler.close()
+    return seconds, drained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Logging benchmark')
+    parser.add_argument('--records', type=int, nargs='+', default=[10000, 100000], help='Number of records to log')
+    args = parser.parse_args()
+
+    table = Table(title="Log records per second")
+    for column in ["SETUP", "RECORDS", "CALLER REC/S", "WRITTEN REC/S"]:
+        table.add_column(column, style="cyan3" if column in ["SETUP", "RECORDS"] else "chartreuse2", justify="left" if column in ["SETUP", "RECORDS"] else "right")
+
+    for records in args.records:
+        with tempfile.TemporaryDirectory() as root:
+            setups = {
+                "file handler" : lambda: runSync(root, records),
+                "queue + rotation" : lambda: runQueued(root, records, False),
+                "queue + rotation + gzip" : lambda: runQueued(root, records, True),
+            }
+            for name, run in setups.items():
+                caller, written = run()
+                table.add_row(name, str(records), f"{records / caller:,.0f}", f"{records / written:,.0f}")
+
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
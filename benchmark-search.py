@@ -0,0 +1,69 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from rich.console import Console
+from rich.table import Table
+from search import SearchIndex, taskTerms
+from storage import JsonStorage
+
+# A benchmark of the search index on synthetic tasks spread over projects of 1000 tasks, each query is scoped to the
+# projects of one user:
+# python benchmark-search.py --sizes 10000 100000 1000000 --projects-per-user 10
+
+WORDS = [f"word{i}" for i in range(20000)]
+
+
+def makeText(words : int) -> str:
+    # a few common words and a long tail, like the words of real tasks
+    return " ".join(random.choice(WORDS[:200]) if random.random() < 0.5 else random.choice(WORDS) for _ in range(words))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Search benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Number of tasks in the index')
+    parser.add_argument('--projects-per-user', type=int, default=10, help='Number of projects a query is scoped to')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries to time')
+    args = parser.parse_args()
+
+    table = Table(title="Search index")
+    for column in ["TASKS", "INDEX S", "SNAPSHOT MB", "LOAD S", "QUERY P50 MS", "QUERY P99 MS"]:
+        table.add_column(column, style="cyan3" if column == "TASKS" else "chartreuse2", justify="left" if column == "TASKS" else "right")
+
+    for size in args.sizes:
+        random.seed(size)
+        with tempfile.TemporaryDirectory() as root:
+            index = SearchIndex(JsonStorage(root))
+            start = time.perf_counter()
+            for number in range(size):
+                terms = dict(taskTerms(makeText(4), makeText(20), [makeText(10)]))
+                index._apply({"taskID" : f"task{number}", "projectID" : f"P{number // 1000}", "terms" : terms})
+            with index._openLog() as log:
+                index._writeSnapshot(log)
+            indexSeconds = time.perf_counter() - start
+            snapshotBytes = os.path.getsize(index._snapshotPath())
+
+            reader = SearchIndex(index.storage)
+            start = time.perf_counter()
+            reader.refresh()
+            loadSeconds = time.perf_counter() - start
+
+            projects = [f"P{number}" for number in range(max(size // 1000, 1))]
+            times = []
+            for _ in range(args.queries):
+                scope = random.sample(projects, min(args.projects_per_user, len(projects)))
+                query = " ".join(random.choice(WORDS) for _ in range(3))
+                start = time.perf_counter()
+                reader.search(query, scope)
+                times.append((time.perf_counter() - start) * 1000)
+            times.sort()
+            table.add_row(str(size), f"{indexSeconds:.1f}", f"{snapshotBytes / 1024 / 1024:.1f}", f"{loadSeconds:.2f}",
+                          f"{statistics.median(times):.2f}", f"{times[int(len(times) * 0.99) - 1]:.2f}")
+
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from rich.console import Console
+from rich.table import Table
+from storage import JsonStorage, SqliteStorage
+
+# A benchmark to compare the storage backends on the same synthetic workload:
+# python benchmark-storage.py --sizes 1000 10000 --ops 1000
+
+BACKENDS = {"json" : JsonStorage, "sqlite" : SqliteStorage}
+
+
+def makeTask(taskID : str) -> dict:
+    return {
+        "taskID": taskID,
+        "taskTitle": "task " + taskID[:8],
+        "taskDescription": "a synthetic task used by the storage benchmark",
+        "createdDT": "2024-05-01T10:00:00",
+        "deadlineDT": "2024-05-02T10:00:00",
+        "Priority": random.choice(["LOW", "MEDIUM", "HIGH", "CRITICAL"]),
+        "Status": random.choice(["BACKLOG", "TODO", "DOING", "DONE", "ARCHIVED"]),
+        "Assignees": ["user0"],
+        "Comments" : ["first comment"]
+    }
+
+
+def populate(storage, size : int) -> list:
+    """
+    A function to fill a storage with the given number of tasks and accounts.
+    """
+    taskIDs = [str(uuid.uuid4()) for _ in range(size)]
+    for taskID in taskIDs:
+        storage.save("tasks", taskID, makeTask(taskID))
+        storage.appendHistory(taskID, f"The {taskID} was created by user0.")
+
+    for i in range(size // 10):
+        username = f"user{i}"
+        storage.save("accounts", username, {"username" : username, "password" : "x", "email" : f"{username}@mail.com", "activityStatus" : "active", "loginStatus" : "logged in"})
+    return taskIDs
+
+
+def timeOps(ops : int, action) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        action(i)
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def runWorkload(storage, taskIDs : list, ops : int) -> dict:
+    """
+    A function to measure the average cost of each kind of operation in microseconds.
+    """
+    sample = [random.choice(taskIDs) for _ in range(ops)]
+    results = {}
+    results["load task"] = timeOps(ops, lambda i: storage.load("tasks", sample[i]))
+    results["save task"] = timeOps(ops, lambda i: storage.save("tasks", sample[i], makeTask(sample[i])))
+    results["append history"] = timeOps(ops, lambda i: storage.appendHistory(sample[i], "a comment was added."))
+    results["login lookup"] = timeOps(ops, lambda i: storage.load("accounts", f"user{i % max(1, len(taskIDs) // 10)}"))
+    results["signup"] = timeOps(ops // 10, lambda i: storage.save("accounts", f"new{i}", {"username" : f"new{i}", "password" : "x", "email" : f"new{i}@mail.com", "activityStatus" : "active", "loginStatus" : "logged in"}))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Storage benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='Number of tasks in the synthetic data set')
+    parser.add_argument('--ops', type=int, default=1000, help='Number of operations of each kind')
+    args = parser.parse_args()
+
+    table = Table(title="Average cost per operation (microseconds)")
+    table.add_column("BACKEND", style="cyan3")
+    table.add_column("TASKS", style="cyan3")
+    columns = None
+
+    for size in args.sizes:
+        for name, backend in BACKENDS.items():
+            with tempfile.TemporaryDirectory() as root:
+                os.makedirs(os.path.join(root, "tasks", "History"))
+                storage = backend(root)
+                random.seed(size)
+                taskIDs = populate(storage, size)
+                results = runWorkload(storage, taskIDs, args.ops)
+                storage.close()
+
+            if columns is None:
+                columns = list(results)
+                for column in columns:
+                    table.add_column(column.upper(), style="chartreuse2", justify="right")
+            table.add_row(name, str(size), *[f"{results[column]:.1f}" for column in columns])
+
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
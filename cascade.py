@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from storage import LockTimeout, Storage
+from indexes import AssignmentIndex
+from search import unindexTasks
+
+GC_SECONDS = int(os.environ.get("TRELLOMIZE_GC_SECONDS", 3600))
+# an orphan is only reclaimed when it was already found by a collection at least this many seconds earlier
+GC_GRACE_SECONDS = int(os.environ.get("TRELLOMIZE_GC_GRACE_SECONDS", 600))
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Cascading deletes
+#
+#A project refers to its tasks through its board and to its members through its member list, and a task refers to its
+#history through its ID. Deleting a project follows these references and removes everything in a single commit. Whatever
+#is still left without an owner (by a crash before this existed, or by an import that was interrupted) is reclaimed by
+#collectGarbage, from manager.py gc or every GC_SECONDS in the daemon.
+
+def projectReferences(storage : Storage, prID : str) -> dict:
+    """
+    A function to get the tasks, members and admin a project refers to.
+    """
+    project = storage.load("projects", prID)
+    if project is None:
+        return None
+    tasks = [row["taskID"] for cell in project["tasks"].values() for rows in cell.values() for row in rows]
+    return {"tasks" : tasks, "members" : list(project["members"]), "admin" : project["admin"]}
+
+
+def deleteProject(storage : Storage, prID : str, extraTasks : list = ()) -> dict:
+    """
+    A function to delete a project with its tasks, their history and its place in the projects of its members.
+
+    extraTasks are deleted as well, for tasks the caller knows about that may be missing from the board. Every member
+    is locked while the project is taken out of its assigned projects and the tasks assigned to them, the admin's
+    own user is left to the caller.
+    """
+    references = projectReferences(storage, prID) or {"tasks" : [], "members" : [], "admin" : None}
+    taskIDs = list(dict.fromkeys(references["tasks"] + [str(taskID) for taskID in extraTasks]))
+
+    # inside the transaction the locks are held until the changes are committed
+    with storage.transaction(), storage.lock([("tasks", taskID) for taskID in taskIDs] + [("users", username) for username in references["members"]]):
+        storage.delete("projects", prID)
+        for taskID in taskIDs:
+            storage.delete("tasks", taskID)
+            storage.deleteHistory(taskID)
+        for username in references["members"]:
+            member = storage.load("users", username)
+            if member is not None and prID in member["assignedProjects"]:
+                member["assignedProjects"].remove(prID)
+                storage.save("users", username, member)
+        # only the admin and the members can be assigned to the tasks of a project
+        assignments = AssignmentIndex(storage)
+        for username in references["members"] + ([references["admin"]] if references["admin"] else []):
+            assignments.dropProject(username, prID)
+        unindexTasks(taskIDs, storage)
+    return {"tasks" : len(taskIDs), "members" : len(references["members"])}
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Garbage collection
+
+def collectGarbage(storage : Storage, grace : int = GC_GRACE_SECONDS) -> dict:
+    """
+    A function to reclaim the tasks no project refers to, the histories of missing tasks and the projects users still
+    hold after they were deleted.
+
+    A task or a history is only reclaimed once it was found without an owner by a collection at least grace seconds
+    earlier, so a project that is still being imported is not taken apart. The orphans found so far are kept in the
+    "gc" document "orphans". The keys are listed before the projects are read, so a task created in the meantime is
+    never taken for an orphan.
+    """
+    now = time.time()
+    historyKeys = storage.historyKeys()
+    taskKeys = storage.keys("tasks")
+    referenced = set()
+    for prID in storage.keys("projects"):
+        references = projectReferences(storage, prID)
+        if references is not None:
+            referenced.update(references["tasks"])
+
+    orphanTasks = [taskID for taskID in taskKeys if taskID not in referenced]
+    existing = set(taskKeys)
+    orphanHistories = [taskID for taskID in historyKeys if taskID not in existing]
+
+    seen = storage.load("gc", "orphans") or {"tasks" : {}, "history" : {}}
+    counts = {"tasks" : 0, "history" : 0, "memberships" : 0, "pending" : 0}
+    pending = {"tasks" : {}, "history" : {}}
+    for kind, orphans in [("tasks", orphanTasks), ("history", orphanHistories)]:
+        for taskID in orphans:
+            firstSeen = seen[kind].get(taskID, now)
+            if now - firstSeen < grace:
+                pending[kind][taskID] = firstSeen
+                counts["pending"] += 1
+                continue
+            with storage.transaction(), storage.lock([("tasks", taskID)]):
+                if kind == "tasks":
+                    for username in (storage.load("tasks", taskID) or {}).get("Assignees", []):
+                        AssignmentIndex(storage).unassign(username, taskID)
+                    storage.delete("tasks", taskID)
+                    unindexTasks([taskID], storage)
+                storage.deleteHistory(taskID)
+            counts[kind] += 1
+
+    projects = set(storage.keys("projects"))
+    for username in storage.keys("users"):
+        user = storage.load("users", username)
+        dangling = [prID for prID in user["assignedProjects"] if prID not in projects] + [prID for prID in user["Projects"] if prID not in projects]
+        if not dangling:
+            continue
+        with storage.transaction(), storage.lock([("users", username)]):
+            user = storage.load("users", username)
+            assigned = [prID for prID in user["assignedProjects"] if storage.exists("projects", prID)]
+            owned = {prID : project for prID, project in user["Projects"].items() if storage.exists("projects", prID)}
+            counts["memberships"] += len(user["assignedProjects"]) - len(assigned) + len(user["Projects"]) - len(owned)
+            user["assignedProjects"] = assigned
+            user["Projects"] = owned
+            storage.save("users", username, user)
+
+    storage.save("gc", "orphans", pending)
+    return counts
+
+
+def collectorLoop(storage : Storage, stopped : threading.Event, seconds : int = GC_SECONDS) -> None:
+    """
+    A function to collect the garbage every few seconds until it is stopped.
+    """
+    while not stopped.wait(seconds):
+        try:
+            collectGarbage(storage)
+        except LockTimeout:
+            # a record stayed locked for too long, the next collection tries again
+            continue
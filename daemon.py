@@ -0,0 +1,134 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from rich import print as rprint
+from storage import LogStorage, RemoteStorage, UnitOfWork
+from cascade import GC_SECONDS, collectorLoop
+
+SNAPSHOT_SECONDS = int(os.environ.get("TRELLOMIZE_SNAPSHOT_SECONDS", 60))
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Daemon
+#
+#One process owns the data folder and keeps it in memory with a LogStorage. The CLI processes started with
+#TRELLOMIZE_STORAGE=daemon use it through a RemoteStorage, so they share one consistent state and never parse the data files.
+
+class StorageHandler(socketserver.StreamRequestHandler):
+    """
+    A class to answer the requests of one client connection, one json line per request.
+    """
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                reply = {"result" : self.server.call(request["op"], request["args"])}
+            except Exception as error:
+                reply = {"error" : f"{type(error).__name__}: {error}"}
+            self.wfile.write(json.dumps(reply, separators=(',', ':')).encode() + b"\n")
+            self.wfile.flush()
+
+
+class StorageServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A class to serve a storage to many clients, the requests of all the clients are applied one at a time.
+    """
+    daemon_threads = True
+
+    def __init__(self, path : str, storage : LogStorage):
+        self.storage = storage
+        self.lock = threading.Lock()
+        self.operations = {
+            "load" : storage._load,
+            "exists" : storage._exists,
+            "keys" : storage._keys,
+            "reserve" : storage._reserve,
+            "version" : storage._version,
+            "loadAll" : storage.loadAll,
+            "historySize" : storage._historySize,
+            "historyKeys" : storage._historyKeys,
+            "readHistory" : storage._readHistory,
+            "readHistoryBetween" : storage._readHistoryBetween,
+            "commit" : self.commit,
+            "root" : self.root,
+        }
+        super().__init__(path, StorageHandler)
+
+    def call(self, op : str, args : list):
+        if op not in self.operations:
+            raise ValueError(f"Unknown operation '{op}'.")
+        with self.lock:
+            return self.operations[op](*args)
+
+    def commit(self, documents : list, history : list) -> None:
+        unit = UnitOfWork()
+        for kind, key, data in documents:
+            unit.documents[(kind, key)] = data
+        for taskID, mode, records in history:
+            unit.history[taskID] = [mode, records]
+        self.storage.commit(unit)
+
+    # func to tell a client the data folder, the clients keep their locks, audit and search files in it
+    def root(self) -> str:
+        return os.path.abspath(self.storage.root)
+
+
+def snapshotLoop(storage : LogStorage, stopped : threading.Event, seconds : int) -> None:
+    """
+    A function to write a snapshot of the state every few seconds, as long as something was committed since the last one.
+    """
+    snapshotted = storage.commits
+    while not stopped.wait(seconds):
+        if storage.commits != snapshotted:
+            snapshotted = storage.commits
+            storage.compact()
+
+
+def stopOnTerminate(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def serveDaemon(path : str = None, root : str = ".", seconds : int = SNAPSHOT_SECONDS) -> None:
+    """
+    A function to run the daemon until it is interrupted.
+    """
+    path = path or os.environ.get("TRELLOMIZE_SOCKET", "trellomize.sock")
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            probe.close()
+            rprint(f"[deep_pink2]A daemon is already listening on '{path}'.[/deep_pink2]")
+            return
+        except ConnectionRefusedError:
+            # the socket of a daemon that did not stop cleanly
+            os.remove(path)
+
+    storage = LogStorage(root)
+    server = StorageServer(path, storage)
+    stopped = threading.Event()
+    snapshots = threading.Thread(target=snapshotLoop, args=(storage, stopped, seconds), daemon=True)
+    snapshots.start()
+    # the collector is a client like any other, so its changes go through the same locks and commits
+    if GC_SECONDS > 0:
+        collector = threading.Thread(target=collectorLoop, args=(RemoteStorage(path), stopped, GC_SECONDS), daemon=True)
+        collector.start()
+    signal.signal(signal.SIGTERM, stopOnTerminate)
+    rprint(f"[spring_green1]The daemon is listening on '{path}', press Ctrl+C to stop it.[/spring_green1]")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+        storage.compact()
+        storage.close()
+        rprint("[spring_green1]The daemon was stopped and a snapshot was written.[/spring_green1]")
@@ -0,0 +1,178 @@
+from storage import Storage, getStorage
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Indexes kept next to the documents so that lookups do not have to read every document
+
+def normalizeEmail(email : str) -> str:
+    """
+    A function to bring an email address to the form used by the email index.
+    """
+    return email.strip().casefold()
+
+
+class EmailIndex:
+    """
+    A class to check the uniqueness of emails without reading every account.
+
+    Each registered email is a document of the "emails" kind whose key is the normalized address, so a check is a
+    single lookup. An email is taken with storage.reserve, so two signups with the same address can not both
+    get it. A marker document records that the index is complete, and the index is rebuilt from the accounts
+    registry when the marker is missing.
+    """
+    MARKER = "built"
+
+    def __init__(self, storage : Storage):
+        self.storage = storage
+        self.checked = False
+
+    # func to rebuild the index once per process if it went missing
+    def ensureBuilt(self) -> None:
+        if self.checked:
+            return
+
+        if not self.storage.exists("emails", self.MARKER):
+            self.rebuild()
+        self.checked = True
+
+    def rebuild(self) -> int:
+        with self.storage.transaction():
+            for key in self.storage.keys("emails"):
+                self.storage.delete("emails", key)
+
+            count = 0
+            for username, account in self.storage.loadAll("accounts").items():
+                if account.get("email"):
+                    self.storage.save("emails", normalizeEmail(account["email"]), {"username" : username})
+                    count += 1
+            self.storage.save("emails", self.MARKER, {"count" : count})
+        return count
+
+    def contains(self, email : str) -> bool:
+        self.ensureBuilt()
+        return self.storage.exists("emails", normalizeEmail(email))
+
+    # func to take an email for a user, it fails if another user already has it even at the same moment
+    def add(self, email : str, username : str) -> bool:
+        self.ensureBuilt()
+        return self.storage.reserve("emails", normalizeEmail(email), {"username" : username})
+
+    def remove(self, email : str) -> None:
+        self.storage.delete("emails", normalizeEmail(email))
+
+    def change(self, oldEmail : str, newEmail : str, username : str) -> bool:
+        if not self.add(newEmail, username):
+            return False
+        self.remove(oldEmail)
+        return True
+
+
+_emailIndex = None
+
+
+def getEmailIndex() -> EmailIndex:
+    """
+    A function to get the email index of the storage in use.
+    """
+    global _emailIndex
+    if _emailIndex is None or _emailIndex.storage is not getStorage():
+        _emailIndex = EmailIndex(getStorage())
+    return _emailIndex
+
+
+class AssignmentIndex:
+    """
+    A class to find the tasks assigned to a user across all projects without reading every task.
+
+    Each user has a document of the "assignments" kind that maps the IDs of the tasks assigned to them to the ID of
+    their project. It is changed together with the assignees of a task, while the document is locked, so reading
+    the tasks of a user costs one lookup plus one load per assigned task. Like the email index, a marker records
+    that the index is complete and it is rebuilt from the boards of the projects when the marker is missing.
+    """
+    # usernames only hold letters, digits and underscores, so the marker cannot be taken for a user
+    MARKER = "@built"
+
+    def __init__(self, storage : Storage):
+        self.storage = storage
+        self.checked = False
+
+    # func to rebuild the index once per process if it went missing
+    def ensureBuilt(self) -> None:
+        if self.checked:
+            return
+
+        if not self.storage.exists("assignments", self.MARKER):
+            self.rebuild()
+        self.checked = True
+
+    def rebuild(self) -> int:
+        assignments = {}
+        for prID in self.storage.keys("projects"):
+            project = self.storage.load("projects", prID)
+            for cell in project["tasks"].values():
+                for rows in cell.values():
+                    for row in rows:
+                        task = self.storage.load("tasks", row["taskID"])
+                        for username in (task or {}).get("Assignees", []):
+                            assignments.setdefault(username, {})[row["taskID"]] = prID
+
+        with self.storage.transaction():
+            for key in self.storage.keys("assignments"):
+                self.storage.delete("assignments", key)
+            for username, tasks in assignments.items():
+                self.storage.save("assignments", username, {"tasks" : tasks})
+            self.storage.save("assignments", self.MARKER, {"count" : sum(len(tasks) for tasks in assignments.values())})
+        return len(assignments)
+
+    # func to change the document of a user while it is locked, inside a transaction the lock is kept until the commit
+    def _change(self, username : str, change) -> None:
+        self.ensureBuilt()
+        with self.storage.lock([("assignments", username)]):
+            data = self.storage.load("assignments", username) or {"tasks" : {}}
+            change(data["tasks"])
+            if data["tasks"]:
+                self.storage.save("assignments", username, data)
+            elif self.storage.exists("assignments", username):
+                self.storage.delete("assignments", username)
+
+    def assign(self, username : str, taskID : str, prID : str) -> None:
+        self.assignAll(username, {taskID : prID})
+
+    # func to add many tasks to a user at once, for the imports
+    def assignAll(self, username : str, assigned : dict) -> None:
+        def add(tasks : dict) -> None:
+            tasks.update(assigned)
+        self._change(username, add)
+
+    def unassign(self, username : str, taskID : str) -> None:
+        def remove(tasks : dict) -> None:
+            tasks.pop(taskID, None)
+        self._change(username, remove)
+
+    def dropProject(self, username : str, prID : str) -> None:
+        def drop(tasks : dict) -> None:
+            for taskID in [taskID for taskID, project in tasks.items() if project == prID]:
+                del tasks[taskID]
+        self._change(username, drop)
+
+    def tasksOf(self, username : str) -> dict:
+        """
+        A function to get the tasks assigned to a user as a map from the task ID to the project ID.
+        """
+        self.ensureBuilt()
+        data = self.storage.load("assignments", username)
+        return {} if data is None else data["tasks"]
+
+
+_assignmentIndex = None
+
+
+def getAssignmentIndex() -> AssignmentIndex:
+    """
+    A function to get the assignment index of the storage in use.
+    """
+    global _assignmentIndex
+    if _assignmentIndex is None or _assignmentIndex.storage is not getStorage():
+        _assignmentIndex = AssignmentIndex(getStorage())
+    return _assignmentIndex
@@ -1,15 +1,33 @@
+import argparse
+import atexit
+import contextlib
+import functools
+import inspect
+import io
+import itertools
+import sys
+import time
 import uuid
 import hashlib
 import json
 import re
 import os
 import logging
+import logging.handlers
+import gzip
+import queue
+import shutil
 from enum import Enum
 from datetime import datetime , timedelta
 from rich import print as rprint
 from typing import Type
 from rich.console import Console
 from rich.table import Table
+from storage import HISTORY_PAGE_SIZE, VersionConflict, cacheStats, getStorage, groupCommit, lockStats, storageOpened
+from indexes import getAssignmentIndex, getEmailIndex
+from audit import auditEvent
+from cascade import deleteProject
+from search import getSearchIndex, indexTask, unindexTasks
 
 #***********************************************************************************************************************************************************
 #***********************************************************************************************************************************************************
@@ -30,6 +48,36 @@ def makeTable(newList : list, colName : str) -> None:
     print()
 
 
+def showHistory(taskID : str) -> None:
+    """
+    A function to page through the history of a task, starting from the newest entries.
+    """
+    storage = getStorage()
+    size = storage.historySize(taskID)
+    if size is None:
+        rprint("[deep_pink2]History not found![/deep_pink2]")
+        return
+
+    pages = max(1, -(-size // HISTORY_PAGE_SIZE))
+    page = pages - 1
+    while True:
+        for record in storage.readHistoryPage(taskID, page):
+            rprint(f"[gold1][{record['time']}] : {record['note']}[/gold1]")
+        if pages == 1:
+            return
+
+        rprint(f"[turquoise4]Page {page + 1} of {pages}. Enter [yellow2]p[/yellow2] for older entries, [yellow2]n[/yellow2] for newer entries or [yellow2]q[/yellow2] to go back:[/turquoise4]")
+        choice = input()
+        if choice == "p" and page > 0:
+            page -= 1
+        elif choice == "n" and page < pages - 1:
+            page += 1
+        elif choice == "q":
+            return
+        else:
+            rprint("[deep_pink2]There is no such page.[/deep_pink2]")
+
+
 #***********************************************************************************************************************************************************
 #***********************************************************************************************************************************************************
 #Configure logging
@@ -38,31 +86,130 @@ class CustomFormatter(logging.Formatter):
     """
     A class to create a custom format for the log file.
     """
-    format = "%(levelname)s - %(asctime)s - %(name)s) %(message)s"
+    FORMAT = "%(levelname)s - %(asctime)s - %(name)s) %(message)s"
 
     FORMATS = {
-        logging.DEBUG:format,
-        logging.INFO:format,
-        logging.WARNING:format,
-        logging.ERROR:format,
-        logging.CRITICAL:format
+        logging.DEBUG:FORMAT,
+        logging.INFO:FORMAT,
+        logging.WARNING:FORMAT,
+        logging.ERROR:FORMAT,
+        logging.CRITICAL:FORMAT
     }
 
+    def __init__(self):
+        super().__init__(self.FORMAT)
+        # the formatter of every level is built once and not for every record
+        self.formatters = {level : logging.Formatter(logFmt) for level, logFmt in self.FORMATS.items()}
+
     def format(self, record):
-        logFmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(logFmt)
-        return formatter.format(record)
-    
+        formatter = self.formatters.get(record.levelno)
+        return formatter.format(record) if formatter is not None else super().format(record)
+
+
+LOG_FILE = "logfile.log"
+# the log file is rotated when it grows past TRELLOMIZE_LOG_MAX_BYTES (0 never rotates) and TRELLOMIZE_LOG_BACKUPS old files are kept
+LOG_MAX_BYTES = int(os.environ.get("TRELLOMIZE_LOG_MAX_BYTES", 5 * 1024 * 1024))
+LOG_BACKUPS = int(os.environ.get("TRELLOMIZE_LOG_BACKUPS", 5))
+LOG_COMPRESS = os.environ.get("TRELLOMIZE_LOG_COMPRESS", "0") == "1"
+
+
+class SizeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    A class to rotate the log file once it grows past maxBytes.
+
+    RotatingFileHandler formats every record twice, once to measure it before writing; this one checks the
+    position of the file after the record is written, so a file can end up to one record longer than maxBytes.
+    """
+    def shouldRollover(self, record) -> bool:
+        return False
+
+    def emit(self, record) -> None:
+        logging.FileHandler.emit(self, record)
+        try:
+            if self.maxBytes > 0 and self.stream is not None and self.stream.tell() >= self.maxBytes:
+                self.doRollover()
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        # a handler that opened its file with the first record starts the next file right away as well
+        if self.stream is None:
+            self.stream = self._open()
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """
+    A class to put log records on a queue that is read in the same process.
+
+    QueueHandler copies and formats every record so that it can be pickled, here the record only has its arguments
+    merged into the message and the formatting is left to the listener thread.
+    """
+    def prepare(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def gzipRotator(source : str, dest : str) -> None:
+    with open(source, 'rb') as logFile, gzip.open(dest, 'wb') as compressed:
+        shutil.copyfileobj(logFile, compressed)
+    os.remove(source)
+
+
+def makeLogHandler(path : str = LOG_FILE, maxBytes : int = LOG_MAX_BYTES, backups : int = LOG_BACKUPS, compress : bool = LOG_COMPRESS) -> logging.Handler:
+    """
+    A function to create the handler that writes the log file, the old files are gzipped when compress is set.
+    """
+    # the file is opened with the first record, so importing the module creates no log file
+    handler = SizeRotatingFileHandler(path, maxBytes=maxBytes, backupCount=backups, delay=True)
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(CustomFormatter())
+    if compress:
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = gzipRotator
+    return handler
+
+
+def startLogListener(logger : logging.Logger, handler : logging.Handler) -> logging.handlers.QueueListener:
+    """
+    A function to send the records of a logger through a queue, so that only the listener thread writes to the handler.
+    """
+    logQueue = queue.SimpleQueue()
+    logger.addHandler(LocalQueueHandler(logQueue))
+    listener = logging.handlers.QueueListener(logQueue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
 
 logger = logging.getLogger("root")
 logger.setLevel(logging.DEBUG)
 
-fileHandler = logging.FileHandler('logfile.log')
-fileHandler.setLevel(logging.DEBUG)
+logListener = startLogListener(logger, makeLogHandler())
+# the exit hooks run in reverse order, so the listener drains the queue after the last record below
+atexit.register(logListener.stop)
+
+
+def setLogHandler(handler : logging.Handler) -> logging.Handler:
+    """
+    A function to make the log listener write to another handler, the records queued before it still go to the old one.
+    """
+    logListener.stop()
+    previous = logListener.handlers[0]
+    logListener.handlers = (handler,)
+    logListener.start()
+    return previous
+
 
-fileHandler.setFormatter(CustomFormatter())
+# func to log the counters of the storage at exit, a process that never used the storage does not open it for them
+def logStorageStats() -> None:
+    if not storageOpened():
+        return
+    logger.debug(f"Record lock waits: {lockStats()}")
+    logger.debug(f"Identity map counters: {cacheStats()}")
 
-logger.addHandler(fileHandler)
+atexit.register(logStorageStats)
 
 
 #***********************************************************************************************************************************************************
@@ -73,26 +220,13 @@ def generate_unique_id() -> str:
     return str(uuid.uuid4())
 
 
-def load_projectIDs(filename = "projectsID.json") -> set:
-    if not os.path.exists(filename):
-        return set()
-    
-    with open(filename, 'r') as file:
-        pIDs = json.load(file)
-    return set(pIDs)
-
-
-def save_projectID(pID : str , filename = "projectsID.json") -> None:
-    project_ids = load_projectIDs(filename)
-    project_ids.add(pID)
-    
-    with open(filename, 'w') as file:
-        json.dump(list(project_ids) , file , indent=4)
+# func to take a project ID, it fails if another user already has it even at the same moment
+def reserve_projectID(pID : str) -> bool:
+    return getStorage().reserve("projectIDs", pID)
 
 
-def projectID_availability(projectID : str , filename = "projectsID.json") -> bool:
-    project_ids = load_projectIDs(filename)
-    return projectID not in project_ids
+def release_projectID(pID : str) -> None:
+    getStorage().release("projectIDs", pID)
 
 
 class Priority(Enum):
@@ -125,6 +259,8 @@ class Task:
         self.Assignees = []
         self.History = {}
         self.comments = []
+        # the version of the stored document this task was loaded from, None until it is saved
+        self.version = None
 
 
     @staticmethod
@@ -173,24 +309,31 @@ class Task:
             "Priority": self.Priority,
             "Status": self.Status,
             "Assignees": self.Assignees,
-            "Comments" : self.comments
+            "Comments" : self.comments,
+            "version" : (self.version or 0) + 1
         }
 
-        filename = "tasks/" + self.taskID + ".json"
-        with open(filename, 'w') as jsonFile:
-            json.dump(taskData, jsonFile, indent=4)
+        storage = getStorage()
+        # the task is only written over the version it was loaded from
+        storage.save("tasks", self.taskID, taskData, self.version)
+        self.version = taskData["version"]
+        storage.identityMap.put("tasks", self.taskID, storage.version("tasks", self.taskID), self)
 
     # func to load a task from a json file 
     @staticmethod
     def loadTask(taskID : str):
-        filename = "tasks/" + str(taskID) + ".json"
-        if not os.path.exists(filename):
+        storage = getStorage()
+        taskID = str(taskID)
+        # the same Task object is handed out again as long as its document did not change
+        version = storage.version("tasks", taskID)
+        task = storage.identityMap.get("tasks", taskID, version)
+        if task is not None:
+            return task
+
+        data = storage.load("tasks", taskID)
+        if data is None:
             rprint("[deep_pink2]Task not found![/deep_pink2]")
             return None
-
-        with open(filename, 'r') as jsonFile:
-            data = json.load(jsonFile)
-            
             
         task = Task(
             taskID=data["taskID"], 
@@ -203,43 +346,23 @@ class Task:
         task.Assignees = data["Assignees"]
         task.Description = data["taskDescription"]
         task.comments = data["Comments"]
+        task.version = data.get("version", 0)
+        storage.identityMap.put("tasks", taskID, version, task)
         return task
 
-    #func to save history in a txt file    
+    #func to save a record in the history of the task
     def saveHistory(self , historyNote : str) -> None:
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        note = f"[{current_time}] : {historyNote}\n"
-        fpath = "tasks/History/history-" + self.taskID + ".txt"
-        
-        try:
-            with open(fpath, "a") as file:
-                file.write(note)
-
-        except FileNotFoundError:
-            with open(fpath , "w") as file:
-                file.write(note) 
+        getStorage().appendHistory(self.taskID, historyNote, current_time)
 
 
     def getHistory(self) -> None:
-        fpath = "tasks/History/history-" + self.taskID + ".txt"
-
-        try:
-            with open(fpath, "r") as file:
-                for line in file:
-                    print(line.strip())
-        except FileNotFoundError:
-            rprint("[deep_pink2]History file does not exist.[/deep_pink2]")
+        showHistory(self.taskID)
             
 
 
     def clearHistory(self) -> None:
-        fpath = "tasks/History/history-" + self.taskID + ".txt"
-
-        try:
-            with open(fpath, "w") as file:
-                file.write("")
-        except FileNotFoundError:
-            rprint("[deep_pink2]History file does not exist.[/deep_pink2]")
+        getStorage().clearHistory(self.taskID)
             
     # func to handle the validity of date and time's format inputed by the user
     @staticmethod
@@ -306,6 +429,11 @@ class Task:
         return DateNote
 
 
+# the versions of the board cells of every project come from this one counter, so a project that is read again
+# never gives a cell a version the board renderer has already cached
+cellCounter = itertools.count(1)
+
+
 #***********************************************************************************************************************************************************
 #***********************************************************************************************************************************************************
 class Project:
@@ -321,41 +449,88 @@ class Project:
                         "DONE" : {"LOW" : [] , "MEDIUM" : [] , "HIGH" : [] , "CRITICAL" : []} ,
                           "ARCHIVED" : {"LOW" : [] , "MEDIUM" : [] , "HIGH" : [] , "CRITICAL" : []}
                           }
+        # taskID -> [status, priority, position] of every task on the board
+        self.locator = {}
+        # a version for every cell of the board that changes whenever the cell changes, it is only kept in memory
+        self.cellVersions = {status : {priority : next(cellCounter) for priority in priorities} for status, priorities in self.tasks.items()}
+        # the version of the stored document this project was loaded from, None until it is saved
+        self.version = None
+
+    # func to build the index that tells where each task of the board is
+    def build_locator(self) -> None:
+        self.locator = {}
+        for status, priorities in self.tasks.items():
+            for priority, task_list in priorities.items():
+                for position, entry in enumerate(task_list):
+                    self.locator[entry["taskID"]] = [status, priority, position]
+
+    # func to find the status, priority and row index of a task, None if it is not on the board
+    def locate_task(self, taskID : str) -> list:
+        return self.locator.get(taskID)
+
+    def touch_cell(self, status : str, priority : str) -> None:
+        self.cellVersions[status][priority] = next(cellCounter)
         
     # func to add task to project
     def add_task(self, task : Type[Task]) -> None:
-
-        self.tasks[task.Status][task.Priority].append({"taskID" : task.taskID , "taskTitle" : task.taskTitle})
-
-    #func to remove task from project
-    def remv_task(self, task : Type[Task]) -> None:
-
-        self.tasks[task.Status][task.Priority].remove({"taskID" : task.taskID , "taskTitle" : task.taskTitle})    
+        task_list = self.tasks[task.Status][task.Priority]
+        self.locator[task.taskID] = [task.Status, task.Priority, len(task_list)]
+        task_list.append({"taskID" : task.taskID , "taskTitle" : task.taskTitle})
+        self.touch_cell(task.Status, task.Priority)
+
+    # func to take a task off the board, the tasks below it in its cell move up one row and keep their order
+    def remove_task(self, taskID : str) -> dict:
+        status, priority, position = self.locator.pop(taskID)
+        self.touch_cell(status, priority)
+        task_list = self.tasks[status][priority]
+        removed = task_list.pop(position)
+        for row in range(position, len(task_list)):
+            self.locator[task_list[row]["taskID"]][2] = row
+        return removed
+
+    # func to move a task to another status and/or priority
+    def move_task(self, taskID : str, status : str, priority : str) -> None:
+        entry = self.remove_task(taskID)
+        task_list = self.tasks[status][priority]
+        self.locator[taskID] = [status, priority, len(task_list)]
+        task_list.append(entry)
+        self.touch_cell(status, priority)
+
+    def retitle_task(self, taskID : str, title : str) -> None:
+        status, priority, position = self.locator[taskID]
+        self.tasks[status][priority][position]["taskTitle"] = title
+        self.touch_cell(status, priority)
 
     # func to save a project in jason file
     def saveProject(self, prID : str) -> None:
-        filename = "projects/" + prID + ".json"
         projectData = {
             "projectID": self.projectID,
             "title": self.title,
             "description": self.description,
             "admin": self.admin,
             "members": self.members,
-            "tasks": self.tasks
+            "tasks": self.tasks,
+            "version" : (self.version or 0) + 1
         }
-        with open(filename, 'w') as jsonFile:
-            json.dump(projectData, jsonFile, indent=4)
+        storage = getStorage()
+        # the project is only written over the version it was loaded from
+        storage.save("projects", prID, projectData, self.version)
+        self.version = projectData["version"]
+        storage.identityMap.put("projects", prID, storage.version("projects", prID), self)
 
     # func to load a project from a json file
     @staticmethod
     def loadProject(prID : str):
-        filename = "projects/" + prID + ".json"
-        if not os.path.exists(filename):
+        storage = getStorage()
+        version = storage.version("projects", prID)
+        project = storage.identityMap.get("projects", prID, version)
+        if project is not None:
+            return project
+
+        data = storage.load("projects", prID)
+        if data is None:
             rprint("[deep_pink2]Project not found![/deep_pink2]")
             return None
-
-        with open(filename, 'r') as jsonFile:
-            data = json.load(jsonFile)
             
         project = Project(
             projectID=data["projectID"], 
@@ -365,9 +540,164 @@ class Project:
         project.description = data["description"]
         project.members = data["members"]
         project.tasks = data["tasks"]
+        project.version = data.get("version", 0)
+        project.build_locator()
+        storage.identityMap.put("projects", prID, version, project)
         return project
+
+
+BOARD_PAGE_SIZE = 20
+
+
+class BoardRenderer:
+    """
+    A class to draw the board of a project, the table of a cell is only rebuilt when the version of the cell changes.
+
+    The board is shown one page at a time: every cell shows at most pageSize of its rows, so drawing it costs the
+    same however many tasks the project has. The page size is read from TRELLOMIZE_BOARD_PAGE_SIZE, 0 shows every row.
+    """
+    COLUMN_STYLES = {"BACKLOG" : "orange_red1", "TODO" : "hot_pink3", "DOING" : "orange1", "DONE" : "cyan3", "ARCHIVED" : "spring_green3"}
+
+    def __init__(self, pageSize : int = None):
+        if pageSize is None:
+            pageSize = int(os.environ.get("TRELLOMIZE_BOARD_PAGE_SIZE", BOARD_PAGE_SIZE))
+        self.pageSize = pageSize
+        self.page = 0
+        # (projectID, status, priority) -> [cell version, page, nested table]
+        self.cells = {}
+        self.stats = {"built" : 0, "reused" : 0}
+
+    @staticmethod
+    def create_nested_table(priority : str, task_list : list, start : int = 0, stop : int = None) -> Table:
+        if stop is None:
+            stop = len(task_list)
+        nested_table = Table(title=f"{priority} ({len(task_list)})", show_header=True, header_style="bright_white")
+
+        nested_table.add_column("ROWS")
+        nested_table.add_column("TASK ID")
+        nested_table.add_column("TASK TITLE")
+
+        # the rows keep their number on the whole cell, it is the one asked for when a task is chosen
+        i = start + 1
+        for task in task_list[start:stop]:
+            nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
+            i += 1
+
+        if start >= len(task_list):
+            nested_table.caption = "no rows on this page"
+        elif start > 0 or stop < len(task_list):
+            nested_table.caption = f"rows {start + 1}-{min(stop, len(task_list))} of {len(task_list)}"
+        return nested_table
+
+    # func to count the pages of the board, the longest cell decides
+    def page_count(self, project : Project) -> int:
+        if not self.pageSize:
+            return 1
+        longest = max(len(task_list) for priorities in project.tasks.values() for task_list in priorities.values())
+        return max(1, -(-longest // self.pageSize))
+
+    def jump_to(self, project : Project, page : int) -> bool:
+        if not 0 <= page < self.page_count(project):
+            return False
+        self.page = page
+        return True
+
+    def cell_table(self, project : Project, status : str, priority : str) -> Table:
+        key = (project.projectID, status, priority)
+        version = project.cellVersions[status][priority]
+        cached = self.cells.get(key)
+        if cached is not None and cached[0] == version and cached[1] == self.page:
+            self.stats["reused"] += 1
+            return cached[2]
+
+        task_list = project.tasks[status][priority]
+        if self.pageSize:
+            nested_table = self.create_nested_table(priority, task_list, self.page * self.pageSize, (self.page + 1) * self.pageSize)
+        else:
+            nested_table = self.create_nested_table(priority, task_list)
+        self.cells[key] = [version, self.page, nested_table]
+        self.stats["built"] += 1
+        return nested_table
+
+    def render(self, project : Project) -> Table:
+        # a page can disappear when tasks are deleted or moved
+        self.page = min(self.page, self.page_count(project) - 1)
+
+        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
+        if self.page_count(project) > 1:
+            projTitle += f", page {self.page + 1} of {self.page_count(project)}"
+        main_table = Table(title=projTitle)
+        for status, style in self.COLUMN_STYLES.items():
+            main_table.add_column(status, style=style)
+
+        tasks = project.tasks
+
+        rows_data = {key: [] for key in tasks.keys()}
+
+        for status, priorities in tasks.items():
+            for priority, task_list in priorities.items():
+                if task_list:
+                    rows_data[status].append(self.cell_table(project, status, priority))
+
+        max_rows = max(len(rows) for rows in rows_data.values())
+
+        for i in range(max_rows):
+            row = []
+            for status in tasks.keys():
+                if i < len(rows_data[status]):
+                    row.append(rows_data[status][i])
+                else:
+                    row.append("")
+            main_table.add_row(*row)
+
+        return main_table
     
 
+def lockedChange(records : list = (), shared : list = ()):
+    """
+    A decorator to hold the locks of the records a method of User reads and changes until its changes are committed.
+
+    records and shared name (kind, argument) pairs, the argument holds the key of the record to lock exclusive or
+    shared. The user itself is always locked and read again before the method runs, so the changes another process
+    made to it in the meantime are not overwritten.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            arguments = signature.bind(self, *args, **kwargs).arguments
+            keys = lambda pairs : [(kind, str(arguments[name])) for kind, name in pairs if arguments.get(name) is not None]
+            with getStorage().lock([("users", self.username)] + keys(records), keys(shared)):
+                self.reload()
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+CONFLICT_RETRIES = 5
+
+
+def retryOnConflict(func):
+    """
+    A decorator to run a change again when a document it saved was changed by someone else in the meantime.
+
+    It is only used for changes that can be applied on top of any other one, like adding a comment or an assignee,
+    so running them again on the documents as they are now merges them with the other change. Inside a transaction
+    that was opened by the caller the conflict is only found when the caller commits, so it is left to the caller.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(1, CONFLICT_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except VersionConflict as conflict:
+                if getStorage().inTransaction() or attempt == CONFLICT_RETRIES:
+                    raise
+                logger.debug(f"{func.__name__} is run again, attempt {attempt + 1}: {conflict}")
+    return wrapper
+
+
 #***********************************************************************************************************************************************************
 #***********************************************************************************************************************************************************
 class User():
@@ -382,7 +712,6 @@ class User():
         
     # func to save user in json file
     def saveUser(self) -> None:
-        filename = "users/"+ self.username + ".json"
         userData = {
             "Username" : self.username ,
             "Email" : self.email ,
@@ -393,16 +722,21 @@ class User():
             "assignedProjects" : self.assignedProjects
         }
         
-        with open(filename, 'w') as jsonFile:
-            json.dump(userData, jsonFile , indent=4)
+        storage = getStorage()
+        storage.save("users", self.username, userData)
+        storage.identityMap.put("users", self.username, storage.version("users", self.username), self)
 
     # func to load user from a json file
     @staticmethod
     def loadUser(username : str):
-        filename = "users/" + username + ".json"
-        if os.path.exists(filename):
-            with open(filename, 'r') as jsonFile:
-                data = json.load(jsonFile)
+        storage = getStorage()
+        version = storage.version("users", username)
+        user = storage.identityMap.get("users", username, version)
+        if user is not None:
+            return user
+
+        data = storage.load("users", username)
+        if data is not None:
             user = User(
                 username=data["Username"] , 
                 email=data["Email"] , 
@@ -412,24 +746,37 @@ class User():
             user.loginStatus=data["loginStatus"]
             user.projects=data["Projects"]
             user.assignedProjects=data["assignedProjects"]
+            storage.identityMap.put("users", username, version, user)
             return user
         else:
             rprint(f"[deep_pink2]User {username} does not exist.[/deep_pink2]")
             return None
+
+    # func to read the user again when it was saved by another process since it was loaded
+    def reload(self) -> None:
+        storage = getStorage()
+        version = storage.version("users", self.username)
+        if version is None or storage.identityMap.get("users", self.username, version) is self:
+            return
+
+        data = storage.load("users", self.username)
+        self.email = data["Email"]
+        self.hapassword = data["Password"]
+        self.activityStatus = data["activityStatus"]
+        self.loginStatus = data["loginStatus"]
+        self.projects = data["Projects"]
+        self.assignedProjects = data["assignedProjects"]
+        storage.identityMap.put("users", self.username, version, self)
         
 
-    def createProject(self) -> Type[Project]:
-        rprint("[turquoise4]Enter an ID for your project:[/turquoise4]")
-        ID = input() 
-        while(True):
-            if projectID_availability(ID):
-                break
-            else:
-                rprint("[deep_pink2]This ID is already taken, Please Try again:[/deep_pink2]")
-                ID = input() 
-                     
-        rprint("[turquoise4]Enter a title for the project:[/turquoise4]")
-        PrName = input()
+    @lockedChange()
+    @groupCommit
+    def createProject(self, ID : str, PrName : str) -> Type[Project]:
+        if not reserve_projectID(ID):
+            rprint("[deep_pink2]This ID is already taken.[/deep_pink2]")
+            return None
+        # the ID is taken right away, so it is given back if the project is not committed
+        getStorage().afterRollback(lambda: release_projectID(ID))
         
         project = Project(ID , PrName , self.username)
 
@@ -441,14 +788,16 @@ class User():
         }
         
         self.saveUser()
-        save_projectID(ID)
         project.saveProject(ID)
         rprint(f"[spring_green2]Project {ID} was created.[/spring_green2]")
         logger.info(f"Project '{ID}' was created by {self.username}.")
+        auditEvent(self.username, "create-project", ID, new=PrName)
         return project
     
             
-    def add_member_to_project(self, prID : str, username : str) -> None:  
+    @lockedChange([("projects", "prID"), ("users", "username")])
+    @groupCommit
+    def add_member_to_project(self, prID : str, username : str) -> bool:  
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
             if username != self.username:
                 if username not in self.projects[prID]["Members"]:
@@ -465,15 +814,20 @@ class User():
                 
                     rprint(f"[spring_green2]User {username} is now a member of {prID}.[/spring_green2]")
                     logger.info(f"'{username}' was added to Project '{prID}' by '{self.username}'.")
+                    auditEvent(self.username, "add-member", prID, new=username)
+                    return True
                 else:
                     rprint(f"[deep_pink2]User {username} is already a member of {prID}.[/deep_pink2]")
             else:
                 rprint("[deep_pink2]You are already the admin![/deep_pink2]")
         else:
             rprint("[deep_pink2]You do not have permission to add members to this project.[/deep_pink2]")
+        return False
 
         
-    def remove_user_from_project(self , prID : str, username : str) -> None:
+    @lockedChange([("projects", "prID"), ("users", "username")])
+    @groupCommit
+    def remove_user_from_project(self , prID : str, username : str) -> bool:
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
             if username != self.username:   
                 if username in self.projects[prID]["Members"]:
@@ -483,6 +837,7 @@ class User():
                     self.saveUser()
                     rprint(f"[spring_green2]User {username} was removed from project {prID}.[/spring_green2]")
                     logger.info(f"'{username}' was removed from Project '{prID}' by '{self.username}'.")
+                    auditEvent(self.username, "remove-member", prID, old=username)
                     
                     removed_user = User.loadUser(username)
                     removed_user.assignedProjects.remove(prID) 
@@ -491,178 +846,173 @@ class User():
                     pr = Project.loadProject(prID)
                     pr.members.remove(username)
                     pr.saveProject(prID)                   
+                    return True
                 else:
                     rprint(f"[deep_pink2]User {username} is not a member of {prID}.[/deep_pink2]")
             else:
                 rprint("[deep_pink2]You are the admin! cannot do that.[/deep_pink2]")
         else:
             rprint("[deep_pink2]You do not have permission to remove members from this project.[/deep_pink2]")
+        return False
 
 
-    def delete_project(self , prID):
+    @lockedChange([("projects", "prID")])
+    @groupCommit
+    def delete_project(self , prID , answer : str) -> bool:
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            rprint("[turquoise4]Are you sure You wanna delete this project? You can't change your decision later!(yes or no)[/turquoise4]")
-            answer = input()
             if answer == "yes":
-                fpath = "projects/" + prID + ".json"
+                storage = getStorage()
 
                 task_ids = [task["taskID"] for task in self.projects[prID]["tasks"]]
 
                 del self.projects[prID]
                 self.saveUser()
-                if os.path.exists(fpath):
-                    os.remove(fpath)
+                if storage.exists("projects", prID):
                     rprint(f"[spring_green2]you successfuly deleted {prID}.[/spring_green2]")
                 else:
                     rprint(f"[deep_pink2]The {prID} file does not exist![/deep_pink2]")
-                # deleting the project's tasks in tasks folder
-                for task_id in task_ids:
-                    taskFpath = "tasks/" + str(task_id) + ".json"
-                    if os.path.exists(taskFpath):
-                        os.remove(taskFpath)
-                    else:
-                        continue
-            else:
-                return None
+                # the tasks on the board, their history and the project in its members' assigned projects go in the same commit
+                deleted = deleteProject(storage, prID, task_ids)
+                logger.info(f"Project '{prID}' was deleted with {deleted['tasks']} tasks by '{self.username}'.")
+                auditEvent(self.username, "delete-project", prID, old=deleted["tasks"])
+                return True
         else:
             rprint("[deep_pink2]You do not have permission to delete projects!![/deep_pink2]")
+        return False
 
             
-    def Retitle_Pr(self , prID : str , newTitle : str) -> None:
+    @lockedChange([("projects", "prID")])
+    @groupCommit
+    def Retitle_Pr(self , prID : str , newTitle : str) -> bool:
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
+            oldTitle = self.projects[prID]["ProjectName"]
             self.projects[prID]["ProjectName"] = newTitle
             self.saveUser()
             pr = Project.loadProject(prID)
             pr.title = newTitle
             pr.saveProject(prID)
             logger.info(f"The title of project '{prID}' was changed to '{newTitle}' by '{self.username}'.")
+            auditEvent(self.username, "retitle-project", prID, old=oldTitle, new=newTitle)
+            return True
         else:
             rprint("[deep_pink2]Only the admin of the project could do that![/deep_pink2]")
+            return False
 
 
-    def changeDescription(self , prID : str) -> None:
+    @lockedChange([("projects", "prID")])
+    @groupCommit
+    def changeDescription(self , prID : str , newDescrp : str) -> bool:
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
             pr = Project.loadProject(prID)
-            rprint("[turquoise4]Enter the new description or press enter to CLEAR it:[/turquoise4]")
-            newDescrp = input()
+            auditEvent(self.username, "change-description", prID, old=pr.description, new=newDescrp)
             pr.description = newDescrp
             pr.saveProject(pr.projectID)
+            return True
+        else:
+            rprint("[deep_pink2]Only the admin of the project could do that![/deep_pink2]")
+            return False
 
     
 
-    def createTask(self , prID):
+    @lockedChange([("projects", "prID")])
+    @groupCommit
+    def createTask(self , prID , answer : str , taskTitle : str = None , taskDescription : str = None , priority : str = None , status : str = None , createdDT : str = None , deadlineDT : str = None):
 
         pr = Project.loadProject(prID)
         taskID = generate_unique_id()
-        while(True):
-            rprint("[turquoise4]1.generate a default task?\n 2.create your own task?\n Enter (1 or 2):[/turquoise4]")
-            answer = input()           
-            if answer != "1" and answer != "2":
-                rprint("[deep_pink2]Invalid input , try Again![/deep_pink2]")
+        #to quickly create a default task
+        if answer == "1":
+            task = Task(taskID)
+        # to create a task with the values the user entered
+        elif answer == "2":
+            task = Task(taskID , taskTitle , taskDescription , Priority[priority.upper()] , Status[status.upper()] , createdDT , deadlineDT)
+        else:
+            rprint("[deep_pink2]Invalid input , try Again![/deep_pink2]")
+            return None
 
-            else:
-                #to quickly create a default task
-                if answer == "1":
-                    task = Task(taskID)
-                    self.projects[prID]["tasks"].append({"taskID" : taskID , "taskTitle" : task.taskTitle})
-                    self.saveUser()
-                    pr.add_task(task)
-                    pr.saveProject(prID)
-                    task.saveTask()
-                    task.saveHistory(f"The {task.taskID} was created by {self.username}.")
-                    return task
-                # to create a task with user input
-                if answer == "2":
-                    rprint("[turquoise4]Enter a title for your task or press enter to leave it empty:[/turquoise4]")
-                    taskTitle = input()
-                    rprint("[turquoise4]description to your task or press enter to leave it empty:[/turquoise4]")
-                    taskDescription = input()
-                    createdDT = Task.get_valid_datetime("Start")
-                    deadlineDT = Task.get_valid_datetime("Deadline" , createdDT)
-                    priority = Task.get_priority()
-                    status = Task.get_status()
-
-                    task = Task(taskID , taskTitle , taskDescription , priority , status , createdDT , deadlineDT)
-                    self.projects[prID]["tasks"].append({"taskID" : taskID , "taskTitle" : task.taskTitle})
-                    self.saveUser()
-                    pr.add_task(task)
-                    pr.saveProject(prID)
-                    task.saveTask()
-                    task.saveHistory(f"The {task.taskID} was created by {self.username}.")
-                    return task
-                break
+        self.projects[prID]["tasks"].append({"taskID" : taskID , "taskTitle" : task.taskTitle})
+        self.saveUser()
+        pr.add_task(task)
+        pr.saveProject(prID)
+        task.saveTask()
+        indexTask(task, prID)
+        task.saveHistory(f"The {task.taskID} was created by {self.username}.")
+        auditEvent(self.username, "create-task", prID, taskID, new=task.taskTitle)
+        return task
         
 
 
-    def change_priority(self , prID : str , taskID : str) -> None:
+    @lockedChange([("projects", "prID"), ("tasks", "taskID")])
+    @groupCommit
+    def change_priority(self , prID : str , taskID : str , priority : str) -> bool:
         project = Project.loadProject(prID)
         task = Task.loadTask(taskID)
         curPriority = task.Priority
 
-        if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            project.remv_task(task)
-            task.Priority = task.get_priority().value
-            task.saveTask()
-            project.add_task(task)
-            project.saveProject(project.projectID)
-            task.saveHistory(f"{self.username} changed this task's priority from {curPriority} to {task.Priority}.")
-            logger.info(f"The priority of '{taskID}' task from the '{prID}' project was changed from '{curPriority}' to '{task.Priority}' by '{self.username}'.")
-        elif self.username in task.Assignees:
-            project.tasks[task.Status.value][task.Priority.value].remove({"taskID" : task.taskID , "taskTitle" : task.taskTitle})
-            task.Priority = task.get_priority().value
+        if (prID in self.projects and self.projects[prID]["Admin"] == self.username) or self.username in task.Assignees:
+            task.Priority = Priority[priority.upper()].value
             task.saveTask()
-            project.add_task(task)
+            project.move_task(task.taskID, task.Status, task.Priority)
             project.saveProject(project.projectID)
             task.saveHistory(f"{self.username} changed this task's priority from {curPriority} to {task.Priority}.")
             logger.info(f"The priority of '{taskID}' task from the '{prID}' project was changed from '{curPriority}' to '{task.Priority}' by '{self.username}'.")
+            auditEvent(self.username, "change-priority", prID, taskID, curPriority, task.Priority)
+            return True
         else:
             rprint("[deep_pink2]You don't have the ability to do so[/deep_pink2]")
+            return False
 
 
-    def change_status(self , prID : str , taskID : str) -> None:
+    @lockedChange([("projects", "prID"), ("tasks", "taskID")])
+    @groupCommit
+    def change_status(self , prID : str , taskID : str , status : str) -> bool:
         project = Project.loadProject(prID)
         task = Task.loadTask(taskID)
         curStatus = task.Status
 
-        if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            project.remv_task(task)
-            task.Status = task.get_status().value
-            task.saveTask()
-            project.add_task(task)
-            project.saveProject(project.projectID)
-            task.saveHistory(f"{self.username} changed this task's priority from {curStatus} to {task.Status}.")
-            logger.info(f"The status of '{taskID}' task from the '{prID}' project was changed from '{curStatus}' to '{task.Status}' by '{self.username}'.")
-        elif self.username in task.Assignees:
-            project.remv_task(task)
-            task.Status = task.get_status().value
+        if (prID in self.projects and self.projects[prID]["Admin"] == self.username) or self.username in task.Assignees:
+            task.Status = Status[status.upper()].value
             task.saveTask()
-            project.add_task(task)
+            project.move_task(task.taskID, task.Status, task.Priority)
             project.saveProject(project.projectID)
             task.saveHistory(f"{self.username} changed this task's priority from {curStatus} to {task.Status}.")
             logger.info(f"The status of '{taskID}' task from the '{prID}' project was changed from '{curStatus}' to '{task.Status}' by '{self.username}'.")
+            auditEvent(self.username, "change-status", prID, taskID, curStatus, task.Status)
+            return True
         else:
             rprint("[deep_pink2]You don't have the ability to do so.[/deep_pink2]")
+            return False
 
 
-    def add_assignee_to_task(self , prID : str , taskId : str , username : str) -> None:
+    @retryOnConflict
+    @lockedChange(shared=[("projects", "prID")])
+    @groupCommit
+    def add_assignee_to_task(self , prID : str , taskId : str , username : str) -> bool:
         task = Task.loadTask(taskId)
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
             if username in self.projects[prID]["Members"] or username == self.username:
                 if username not in task.Assignees:
                     task.Assignees.append(username)
                     task.saveTask()
+                    getAssignmentIndex().assign(username, task.taskID, prID)
                     rprint(f"[spring_green2]the task was assigned to {username}[/spring_green2]")
                     task.saveHistory(f"the task was assigned to {username}")
                     logger.info(f"'{taskId}' task was assigned to '{username}' by '{self.username}' from '{prID}' project.")
+                    auditEvent(self.username, "add-assignee", prID, taskId, new=username)
+                    return True
                 else:
                     rprint("[deep_pink2]This user has already been assigned with the task[/deep_pink2]")
             else:
                 rprint("[deep_pink2]Only the members of the project can be assigned to task!![/deep_pink2]")
         else:
             rprint("[deep_pink2]Only admin of a project could do this![/deep_pink2]")
+        return False
 
 
-    def remove_assignee_from_task(self , prID : str , taskID : str , username : str) -> None:
+    @retryOnConflict
+    @lockedChange(shared=[("projects", "prID")])
+    @groupCommit
+    def remove_assignee_from_task(self , prID : str , taskID : str , username : str) -> bool:
         task = Task.loadTask(taskID)
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
             if username in self.projects[prID]["Members"] or username == self.username:
@@ -670,119 +1020,135 @@ class User():
 
                     task.Assignees.remove(username)
                     task.saveTask()
+                    getAssignmentIndex().unassign(username, task.taskID)
 
                     rprint(f"[spring_green2]{username} is not an assignee of the {task.taskTitle} anymore.[spring_green2]")
                     task.saveHistory(f"{username} was removed from this task's assignees.")
                     logger.info(f"'{username}' was removed from the task of '{taskID}' in the '{prID}' project by '{self.username}'.")
+                    auditEvent(self.username, "remove-assignee", prID, taskID, old=username)
+                    return True
                 else:
                     rprint(f"[deep_pink2]{task.taskTitle} was not assigned to {username}[/deep_pink2]")
             else:
                 rprint("[deep_pink2]Can't do that.the user is not a member of this project!![/deep_pink2]")
         else:
             rprint("[deep_pink2]Only admin of a project could do this![/deep_pink2]")
+        return False
 
     
-    def delTask(self , prID : str , taskID : str) -> None:
+    @lockedChange([("projects", "prID"), ("tasks", "taskID")])
+    @groupCommit
+    def delTask(self , prID : str , taskID : str) -> bool:
         prj = Project.loadProject(prID)
         task = Task.loadTask(taskID)
-        d = 0
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            for i in range(len(prj.tasks[task.Status][task.Priority])):
-                if prj.tasks[task.Status][task.Priority][i]["taskID"] == task.taskID:
-                    d += 1
-                    self.projects[prID]["tasks"].remove({"taskID" : taskID , "taskTitle" : task.taskTitle})
-                    del prj.tasks[task.Status][task.Priority][i]
-                    self.saveUser()
-                    prj.saveProject(prj.projectID)
-                    if os.path.exists("tasks/" + task.taskID + ".json"):
-                        os.remove("tasks/" + task.taskID + ".json")
-                        rprint("[deep_pink2]Task was deleted successfully![/deep_pink2]")
-                        logger.info(f"'{taskID}' task was removed from the '{prID}' project by '{self.username}'.")
-                    else:
-                        rprint("[deep_pink2]task file does not exist!![/deep_pink2]")
-
-            if (d == 0):
+            if prj.locate_task(task.taskID) is not None:
+                prj.remove_task(task.taskID)
+                self.projects[prID]["tasks"] = [entry for entry in self.projects[prID]["tasks"] if entry["taskID"] != taskID]
+                self.saveUser()
+                prj.saveProject(prj.projectID)
+                if getStorage().exists("tasks", task.taskID):
+                    getStorage().delete("tasks", task.taskID)
+                    getStorage().deleteHistory(task.taskID)
+                    for username in task.Assignees:
+                        getAssignmentIndex().unassign(username, task.taskID)
+                    unindexTasks([task.taskID])
+                    rprint("[deep_pink2]Task was deleted successfully![/deep_pink2]")
+                    logger.info(f"'{taskID}' task was removed from the '{prID}' project by '{self.username}'.")
+                    auditEvent(self.username, "delete-task", prID, taskID, old=task.taskTitle)
+                    return True
+                else:
+                    rprint("[deep_pink2]task file does not exist!![/deep_pink2]")
+            else:
                 rprint("[deep_pink2]the task does not belong to this project![/deep_pink2]")
         else:
             rprint("[deep_pink2]Only admin of a project could do this![/deep_pink2]")
+        return False
                 
     # func to add comments to a task    
-    def addComment(self , prID : str , taskID : str) -> None:
+    @retryOnConflict
+    @lockedChange(shared=[("projects", "prID")])
+    @groupCommit
+    def addComment(self , prID : str , taskID : str , newComment : str) -> bool:
         task = Task.loadTask(taskID)
-        if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            rprint("[turquoise4]Enter your comment:[/turquoise4]")
-            newComment = input()
-            task.comments.append(newComment)
-            task.saveHistory(f"{self.username} added a comment.")
-            task.saveTask()
-            logger.info(f"'{self.username}' added a comment to '{taskID}' task from '{prID}' project.")
-        elif self.username in task.Assignees:
-            rprint("[turquoise4]Enter your comment:[/turquoise4]")
-            newComment = input()
+        if (prID in self.projects and self.projects[prID]["Admin"] == self.username) or self.username in task.Assignees:
             task.comments.append(newComment)
             task.saveHistory(f"{self.username} added a comment.")
             task.saveTask()
+            indexTask(task, prID)
             logger.info(f"'{self.username}' added a comment to '{taskID}' task from '{prID}' project.")
+            auditEvent(self.username, "add-comment", prID, taskID, new=newComment)
+            return True
         else:
             rprint("[deep_pink2]Only the task's assignees could do that![/deep_pink2]")
+            return False
 
     # fun to clear the comments of a task
-    def clearComments(self , prID : str , taskID : str) -> None:
+    @lockedChange([("tasks", "taskID")], [("projects", "prID")])
+    @groupCommit
+    def clearComments(self , prID : str , taskID : str) -> bool:
         task = Task.loadTask(taskID)
-        if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            task.comments.clear()
-            task.saveHistory(f"{self.username} cleared the comments.")
-            task.saveTask()
-            logger.info(f"'{self.username}' removed the '{taskID}' task comments from the '{prID}' project.")
-        elif self.username in task.Assignees:
+        if (prID in self.projects and self.projects[prID]["Admin"] == self.username) or self.username in task.Assignees:
+            auditEvent(self.username, "clear-comments", prID, taskID, old=list(task.comments))
             task.comments.clear()
             task.saveHistory(f"{self.username} cleared the comments.")
             task.saveTask()
+            indexTask(task, prID)
             logger.info(f"'{self.username}' removed the '{taskID}' task comments from the '{prID}' project.")
+            return True
         else:
             rprint("[deep_pink2]Only the task's assignees could do that![/deep_pink2]")
+            return False
             
 
-    def change_task_title(self , prID : str , taskID : str) -> None:
+    @lockedChange([("projects", "prID"), ("tasks", "taskID")])
+    @groupCommit
+    def change_task_title(self , prID : str , taskID : str , newTiltle : str) -> bool:
         task = Task.loadTask(taskID)
         project = Project.loadProject(prID)
 
         oldTaskTitle = task.taskTitle
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            rprint("[turquoise4]Enter a new title:[/turquoise4]")
-            newTiltle = input()
-            project.remv_task(task)
             task.taskTitle = newTiltle
             task.saveTask()
-            project.add_task(task)
+            indexTask(task, prID)
+            project.retitle_task(task.taskID, newTiltle)
             project.saveProject(prID)
             task.saveHistory(f"{self.username} changed the task's title to {newTiltle}.")
             logger.info(f"'{self.username}' changed the title of '{taskID}' task from '{prID}' project from '{oldTaskTitle}' to '{task.taskTitle}'")
+            auditEvent(self.username, "retitle-task", prID, taskID, oldTaskTitle, task.taskTitle)
+            return True
         else:
             rprint("[deep_pink2]Only the admin could do that![/deep_pink2]")
+            return False
 
 
 
-    def change_task_deadline(self , prID : str , taskID : str) -> None:
+    @lockedChange([("tasks", "taskID")], [("projects", "prID")])
+    @groupCommit
+    def change_task_deadline(self , prID : str , taskID : str , newddline : str) -> bool:
         task = Task.loadTask(taskID)
 
         oldTaskDeadline = task.deadlineDT
         if prID in self.projects and self.projects[prID]["Admin"] == self.username:
-            newddline = Task.get_valid_datetime("Deadline" , task.createdDT)
+            newddline = datetime.strptime(newddline , "%Y-%m-%dT%H:%M:%S").strftime("%Y-%m-%dT%H:%M:%S")
             task.deadlineDT = newddline
             task.saveTask()
             task.saveHistory(f"{self.username} changed the task's deadline to {newddline}.")
             logger.info(f"'{self.username}' changed the deadline of '{taskID}' task of '{prID}' project from '{oldTaskDeadline}' to '{task.deadlineDT}'.")
+            auditEvent(self.username, "change-deadline", prID, taskID, oldTaskDeadline, task.deadlineDT)
+            return True
         else:
             rprint("[deep_pink2]Only the admin could do that![/deep_pink2]")
+            return False
 
     # func to check the existence of projects assigned to a user. it might have been deleted!
+    @lockedChange()
     def refresh(self):
         d = 0
         for i in range(len(self.assignedProjects)):
             prID = self.assignedProjects[i - d]
-            fpath = "projects/" + prID + ".json"
-            if os.path.exists(fpath):
+            if getStorage().exists("projects", prID):
                 continue
             else:
                 rprint(f"[spring_green2]The {prID} appear to be deleted by its admin![/spring_green2]")
@@ -793,16 +1159,10 @@ class User():
 
 
     def showProject(self , prID : str):
-        filename = "projects/" + prID + ".json"
-
-        if not os.path.exists(filename):
+        if not getStorage().exists("projects", prID):
             rprint("[deep_pink2]Project not found![/deep_pink2]")
             return None
 
-        with open(filename, 'r') as jsonFile:
-            data = json.load(jsonFile)
-
-
         if (prID in self.projects and self.projects[prID]["Admin"] == self.username) or (prID in self.assignedProjects):
             self.createTable(prID)
         else:
@@ -822,21 +1182,76 @@ class User():
         listOfProj = self.assignedProjects
         makeTable(listOfProj, "PROJECT ID")
 
+    # func to get the tasks assigned to the user in every project, only the assigned tasks are read
+    def assignedTasks(self) -> list:
+        tasks = []
+        for taskID, prID in getAssignmentIndex().tasksOf(self.username).items():
+            data = getStorage().load("tasks", taskID)
+            # a task deleted by a process that did not keep the index up to date
+            if data is None or self.username not in data["Assignees"]:
+                continue
+            tasks.append({"projectID" : prID, "taskID" : taskID, "taskTitle" : data["taskTitle"], "Status" : data["Status"],
+                          "Priority" : data["Priority"], "deadlineDT" : data["deadlineDT"]})
+        return sorted(tasks, key=lambda task : task["deadlineDT"])
+
+    # func to find the tasks that match a query in the projects the user can see, best match first
+    def searchTasks(self, query : str) -> list:
+        results = []
+        for match in getSearchIndex().search(query, list(self.projects) + self.assignedProjects):
+            data = getStorage().load("tasks", match["taskID"])
+            if data is not None:
+                results.append(dict(match, taskTitle=data["taskTitle"], Status=data["Status"], Priority=data["Priority"]))
+        return results
+
+    def showSearch(self, query : str = None) -> None:
+        if query is None:
+            rprint("[turquoise4]Enter the words to look for in the titles, descriptions and comments of the tasks:[/turquoise4]")
+            query = input()
+        results = self.searchTasks(query)
+        if not results:
+            rprint("[deep_pink2]No task matches your search.[/deep_pink2]")
+            return
+
+        newTable = Table()
+        newTable.add_column("ROWS", style="cyan3")
+        for column in ["PROJECT ID", "TASK TITLE", "STATUS", "PRIORITY", "TASK ID"]:
+            newTable.add_column(column, style="chartreuse2")
+        for i, task in enumerate(results, 1):
+            newTable.add_row(str(i), task["projectID"], task["taskTitle"], task["Status"], task["Priority"], task["taskID"])
+
+        console = Console()
+        print()
+        console.print(newTable)
+        print()
+
+    def listOfAssignedTasks(self) -> None:
+        tasks = self.assignedTasks()
+        if not tasks:
+            rprint("[deep_pink2]No task is assigned to you.[/deep_pink2]")
+            return
+
+        newTable = Table()
+        newTable.add_column("ROWS", style="cyan3")
+        for column in ["PROJECT ID", "TASK TITLE", "STATUS", "PRIORITY", "DEADLINE", "TASK ID"]:
+            newTable.add_column(column, style="chartreuse2")
+        for i, task in enumerate(tasks, 1):
+            newTable.add_row(str(i), task["projectID"], task["taskTitle"], task["Status"], task["Priority"], task["deadlineDT"].replace("T", " "), task["taskID"])
+
+        console = Console()
+        print()
+        console.print(newTable)
+        print()
+
 
     @staticmethod
     def showTask(taskID : str):
        
-        historyFile = "tasks/History/history-" + taskID + ".txt"
-
         task = Task.loadTask(taskID) 
 
-        if not os.path.exists(historyFile):
+        if getStorage().historySize(taskID) is None:
             rprint("[deep_pink2]History not found![/deep_pink2]")
             return None
 
-        with open(historyFile, 'r') as f:
-            history = f.readlines()
-
 
         rprint("[light_coral]************************************************************************************************************************[/light_coral]")
         rprint("[turquoise4]Task information:[/turquoise4]")
@@ -862,8 +1277,7 @@ class User():
 
         rprint("[turquoise4]History:[/turquoise4]")
         print()
-        for line in history:
-            rprint(f"[gold1]{line}[/gold1]")
+        showHistory(taskID)
         
         rprint("[light_coral]************************************************************************************************************************[/light_coral]")
 
@@ -873,51 +1287,8 @@ class User():
     def createTable(self, prID ) -> None:
         
         project = Project.loadProject(prID)
-
-        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-        main_table = Table(title=projTitle)
-        main_table.add_column("BACKLOG", style="orange_red1")
-        main_table.add_column("TODO", style="hot_pink3")
-        main_table.add_column("DOING", style="orange1")
-        main_table.add_column("DONE", style="cyan3")
-        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-        def create_nested_table(priority, task_list):
-            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                
-            nested_table.add_column("ROWS")
-            nested_table.add_column("TASK ID")
-            nested_table.add_column("TASK TITLE")
-            
-            i = 1
-            for task in task_list:
-                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                i += 1
-
-            return nested_table
-
-        tasks = project.tasks
-
-        rows_data = {key: [] for key in tasks.keys()}
-
-        for status, priorities in tasks.items():
-            for priority, task_list in priorities.items():
-                if task_list:
-                    nested_table = create_nested_table(priority, task_list)
-                    rows_data[status].append(nested_table)
-
-        max_rows = max(len(rows) for rows in rows_data.values())
-
-        for i in range(max_rows):
-            row = []
-            for status in tasks.keys():
-                if i < len(rows_data[status]):
-                    nested_table = rows_data[status][i]
-                    row.append(nested_table)
-                else:
-                    row.append("")
-            main_table.add_row(*row)
+        board = BoardRenderer()
+        main_table = board.render(project)
 
         def getStatusAndPrioAndRow():
             rprint("[turquoise4]Enter the task status:[/turquoise4]")
@@ -927,9 +1298,30 @@ class User():
             rprint("[turquoise4]Enter the desired task row number:[/turquoise4]")
             row = int(input())
 
-            task_id = tasks[s][p][row - 1]["taskID"] 
+            task_id = project.tasks[s][p][row - 1]["taskID"] 
 
             return task_id
+
+        # the values of a new task are asked before the project is locked by createTask
+        def getNewTask():
+            while(True):
+                rprint("[turquoise4]1.generate a default task?\n 2.create your own task?\n Enter (1 or 2):[/turquoise4]")
+                answer = input()
+                if answer == "1":
+                    return ("1",)
+                if answer == "2":
+                    break
+                rprint("[deep_pink2]Invalid input , try Again![/deep_pink2]")
+
+            rprint("[turquoise4]Enter a title for your task or press enter to leave it empty:[/turquoise4]")
+            taskTitle = input()
+            rprint("[turquoise4]description to your task or press enter to leave it empty:[/turquoise4]")
+            taskDescription = input()
+            createdDT = Task.get_valid_datetime("Start")
+            deadlineDT = Task.get_valid_datetime("Deadline" , createdDT)
+            priority = Task.get_priority().name
+            status = Task.get_status().name
+            return ("2", taskTitle, taskDescription, priority, status, createdDT, deadlineDT)
         
 
         while True:
@@ -940,6 +1332,10 @@ class User():
             rprint("[bright_white]1)[/bright_white][hot_pink3]View members of this project[/hot_pink3]")
             rprint("[bright_white]2)[/bright_white][hot_pink3]View actions related to tasks[/hot_pink3]")
             rprint("[bright_white]3)[/bright_white][hot_pink3]Back[/hot_pink3]")
+            if board.page_count(project) > 1:
+                rprint("[bright_white]4)[/bright_white][hot_pink3]Next page of the board[/hot_pink3]")
+                rprint("[bright_white]5)[/bright_white][hot_pink3]Previous page of the board[/hot_pink3]")
+                rprint("[bright_white]6)[/bright_white][hot_pink3]Jump to a page of the board[/hot_pink3]")
 
             answe = input()
 
@@ -954,53 +1350,10 @@ class User():
                     inp = input()
 
                     if inp == "1": 
-                        task = self.createTask(prID)
+                        task = self.createTask(prID, *getNewTask())
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "2":
                         try:
                             task_id = getStatusAndPrioAndRow() 
@@ -1012,111 +1365,29 @@ class User():
                         try:
                             task_id = getStatusAndPrioAndRow()
         
-                            self.change_priority(prID , task_id)
+                            priority = Task.get_priority().name
+
+                            self.change_priority(prID , task_id , priority)
                         except Exception:
                             rprint("[deep_pink2]Something went wrong, try again.[/deep_pink2]")
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "4":
 
                         try:
                             task_id = getStatusAndPrioAndRow() 
         
-                            self.change_status(prID , task_id)
+                            status = Task.get_status().name
+
+                            self.change_status(prID , task_id , status)
                         except Exception:
                             rprint("[deep_pink2]Something went wrong, try again.[/deep_pink2]")
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "5":
                         try:
                             task_id = getStatusAndPrioAndRow() 
@@ -1130,50 +1401,7 @@ class User():
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "6":
 
                         try:
@@ -1188,215 +1416,48 @@ class User():
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "7":
                         try:
                             task_id = getStatusAndPrioAndRow() 
-                            self.change_task_deadline(prID, task_id)
+                            newDeadline = Task.get_valid_datetime("Deadline" , Task.loadTask(task_id).createdDT)
+                            self.change_task_deadline(prID, task_id, newDeadline)
                         except Exception:
                             rprint("[deep_pink2]Something went wrong, try again.[/deep_pink2]")
 
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                         
                     elif inp == "8":
                         try:
                             task_id = getStatusAndPrioAndRow() 
-                            self.change_task_title(prID, task_id)
+                            rprint("[turquoise4]Enter a new title:[/turquoise4]")
+                            newTitle = input()
+                            self.change_task_title(prID, task_id, newTitle)
                         except Exception:
                             rprint("[deep_pink2]Something went wrong, try again.[/deep_pink2]")
 
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "9":
                         try:
                             task_id = getStatusAndPrioAndRow() 
                             commentTask = Task.loadTask(task_id)
+                            rprint("[turquoise4]Enter your comment:[/turquoise4]")
+                            newComment = input()
 
-                            self.addComment(prID, commentTask.taskID)
+                            self.addComment(prID, commentTask.taskID, newComment)
                         except Exception:
                             rprint("[deep_pink2]Something went wrong, try again.[/deep_pink2]")
 
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                        
                     elif inp == "10":
                         try:
@@ -1410,50 +1471,7 @@ class User():
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "11":
                         try:
                             task_id = getStatusAndPrioAndRow() 
@@ -1465,50 +1483,7 @@ class User():
                         
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "12":
 
                         try:
@@ -1520,109 +1495,34 @@ class User():
 
                         project = Project.loadProject(prID)
 
-                        projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                        main_table = Table(title=projTitle)
-                        main_table.add_column("BACKLOG", style="orange_red1")
-                        main_table.add_column("TODO", style="hot_pink3")
-                        main_table.add_column("DOING", style="orange1")
-                        main_table.add_column("DONE", style="cyan3")
-                        main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                        def create_nested_table(priority, task_list):
-                            nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                                
-                            nested_table.add_column("ROWS")
-                            nested_table.add_column("TASK ID")
-                            nested_table.add_column("TASK TITLE")
-                            
-                            i = 1
-                            for task in task_list:
-                                nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                                i += 1
-
-                            return nested_table
-
-                        tasks = project.tasks
-
-                        rows_data = {key: [] for key in tasks.keys()}
-
-                        for status, priorities in tasks.items():
-                            for priority, task_list in priorities.items():
-                                if task_list:
-                                    nested_table = create_nested_table(priority, task_list)
-                                    rows_data[status].append(nested_table)
-
-                        max_rows = max(len(rows) for rows in rows_data.values())
-
-                        for i in range(max_rows):
-                            row = []
-                            for status in tasks.keys():
-                                if i < len(rows_data[status]):
-                                    nested_table = rows_data[status][i]
-                                    row.append(nested_table)
-                                else:
-                                    row.append("")
-                            main_table.add_row(*row)
+                        main_table = board.render(project)
                     elif inp == "13":
                         break
                     else:
                         rprint("[deep_pink2]Invalid answer, try again.[/deep_pink2]")
             elif answe == "3":
-                project = Project.loadProject(prID)
-
-                projTitle = f"project : '{project.projectID}', admin : '{project.admin}'"
-                main_table = Table(title=projTitle)
-                main_table.add_column("BACKLOG", style="orange_red1")
-                main_table.add_column("TODO", style="hot_pink3")
-                main_table.add_column("DOING", style="orange1")
-                main_table.add_column("DONE", style="cyan3")
-                main_table.add_column("ARCHIVED", style="spring_green3")
-
-
-                def create_nested_table(priority, task_list):
-                    nested_table = Table(title=priority, show_header=True, header_style="bright_white")
-                        
-                    nested_table.add_column("ROWS")
-                    nested_table.add_column("TASK ID")
-                    nested_table.add_column("TASK TITLE")
-                    
-                    i = 1
-                    for task in task_list:
-                        nested_table.add_row(str(i), task["taskID"], task["taskTitle"])
-                        i += 1
-
-                    return nested_table
-
-                tasks = project.tasks
-
-                rows_data = {key: [] for key in tasks.keys()}
-
-                for status, priorities in tasks.items():
-                    for priority, task_list in priorities.items():
-                        if task_list:
-                            nested_table = create_nested_table(priority, task_list)
-                            rows_data[status].append(nested_table)
-
-                max_rows = max(len(rows) for rows in rows_data.values())
-
-                for i in range(max_rows):
-                    row = []
-                    for status in tasks.keys():
-                        if i < len(rows_data[status]):
-                            nested_table = rows_data[status][i]
-                            row.append(nested_table)
-                        else:
-                            row.append("")
-                    main_table.add_row(*row)
-
-
                 if prID in self.projects:
                     self.listOfCreatedProject()
                 elif prID in self.assignedProjects:
                     self.listOfAssignedProject()
 
                 break
+            elif answe in ["4", "5", "6"] and board.page_count(project) > 1:
+                if answe == "4":
+                    page = board.page + 1
+                elif answe == "5":
+                    page = board.page - 1
+                else:
+                    rprint(f"[turquoise4]Enter a page number between 1 and {board.page_count(project)}:[/turquoise4]")
+                    try:
+                        page = int(input()) - 1
+                    except ValueError:
+                        page = -1
+
+                if board.jump_to(project, page):
+                    main_table = board.render(project)
+                else:
+                    rprint("[deep_pink2]There is no such page.[/deep_pink2]")
             else:
                 rprint("[deep_pink2]Invalid answer, try again.[/deep_pink2]")
                 
@@ -1673,25 +1573,6 @@ def checkEmailValidity(email : str) -> bool:
         return False
 
 
-def checkPresenceValue(dictionary : dict, key : str, email : str) -> bool:
-    """
-    A function to check the presence of email with binary search algorithm.
-    """
-    sortedItems = sorted(dictionary.items(), key=lambda item: item[1][key])
-    values = [item[1][key] for item in sortedItems]
-    left = 0
-    right = len(values) - 1
-    while left <= right:
-        mid = (left + right) // 2
-        if values[mid] == email:
-            return True
-        elif values[mid] < email:
-            left = mid + 1
-        else:
-            right = mid - 1
-    return False
-
-
 def createNewUser() -> Type[User]:
     """
     A function to create new users.
@@ -1705,19 +1586,15 @@ def createNewUser() -> Type[User]:
 
     hashedPassword = hashPassword(password)
 
-    try:
-        with open('users.json') as f:
-            users = json.load(f)
-    except FileNotFoundError:
-        with open('users.json', 'w') as f:
-            users = {}
+    storage = getStorage()
+    emailIndex = getEmailIndex()
 
     while(True):
         if not checkUsernameValidity(username):
             rprint("[deep_pink2]Invalid username, try again.[/deep_pink2]")
             rprint("[turquoise4]Enter your new username:[/turquoise4]")
             username = input()
-        elif checkPresenceUsername(users, username):
+        elif storage.exists("accounts", username):
             rprint("[deep_pink2]ERROR! Duplicate username, try another username.[/deep_pink2]")
             rprint("[turquoise4]Enter your new username:[/turquoise4]")
             username = input()
@@ -1725,7 +1602,7 @@ def createNewUser() -> Type[User]:
             rprint("[deep_pink2]Invalid email address, try again.[/deep_pink2]")
             rprint("[turquoise4]Enter your new email:[/turquoise4]")
             email = input()
-        elif checkPresenceValue(users, "email",email):
+        elif emailIndex.contains(email):
             rprint("[deep_pink2]ERROR! The email is duplicate, try another email.[/deep_pink2]")
             rprint("[turquoise4]Enter your new email:[/turquoise4]")
             email = input()
@@ -1734,13 +1611,34 @@ def createNewUser() -> Type[User]:
 
     newUser = {"username" : username, "password" : hashedPassword, "email" : email, "activityStatus" : "active", "loginStatus" : "logged in"}
     
-    users[username] = newUser
-
-    with open('users.json', 'w') as f:
-        json.dump(users, f, indent=4)
-
     user = User(username, email, hashedPassword)
-    user.saveUser()
+    emailTaken = False
+    with storage.lock([("accounts", username), ("users", username)]):
+        # the username may have been taken by another signup while this one was typed
+        taken = storage.exists("accounts", username)
+        if not taken:
+            # so may the email, taking it is what decides which signup gets it
+            emailTaken = not emailIndex.add(email, username)
+        if not taken and not emailTaken:
+            # a user imported from another tool before signing up keeps the projects it was given
+            placeholder = storage.load("users", username)
+            if placeholder is not None:
+                user.projects = placeholder["Projects"]
+                user.assignedProjects = placeholder["assignedProjects"]
+
+            try:
+                with storage.transaction():
+                    storage.save("accounts", username, newUser)
+                    user.saveUser()
+            except Exception:
+                emailIndex.remove(email)
+                raise
+    if taken:
+        rprint("[deep_pink2]ERROR! Duplicate username, try again.[/deep_pink2]")
+        return createNewUser()
+    if emailTaken:
+        rprint("[deep_pink2]ERROR! The email is duplicate, try again.[/deep_pink2]")
+        return createNewUser()
 
     logger.info(f"'{username}' has successfully created an account.")
 
@@ -1760,15 +1658,11 @@ def CheckUserInformation() -> Type[User]:
 
     hashedPassword = hashPassword(password)
 
-    try:
-        with open('users.json') as f:
-            users = json.load(f)
-    except FileNotFoundError:
-        rprint("[deep_pink2]Failed attempt.[/deep_pink2]")
-        exit()
+    storage = getStorage()
     
     while(True):
-        if not checkPresenceUsername(users, username):
+        account = storage.load("accounts", username)
+        if account is None:
             rprint("[deep_pink2]Invalid username, try again.[/deep_pink2]")
             rprint("[turquoise4]Please enter your username correctly or type [yellow2]quit[/yellow2] to exit:[/turquoise4]")
             newInput = input()
@@ -1776,7 +1670,7 @@ def CheckUserInformation() -> Type[User]:
                 exit()
             else:
                 username = newInput
-        elif users[username]["password"] != hashedPassword:
+        elif account["password"] != hashedPassword:
             rprint("[deep_pink2]Password is wrong, try again.[/deep_pink2]")
             rprint("[turquoise4]Please enter your password correctly or type [yellow2]quit[/yellow2] to exit:[/turquoise4]")
             newInput = input()
@@ -1785,13 +1679,13 @@ def CheckUserInformation() -> Type[User]:
             else:
                 password = newInput
                 hashedPassword = hashPassword(password)
-        elif users[username]["activityStatus"] == "inactive":
+        elif account["activityStatus"] == "inactive":
             rprint("[deep_pink2]Your account is inactive, login is not possible.[/deep_pink2]")
             exit()
         else:
             break
 
-    users[username]["loginStatus"] = "logged in"
+    account["loginStatus"] = "logged in"
 
     user = User.loadUser(username)
 
@@ -1938,12 +1832,15 @@ def projectActions(user):
 
             check = False
 
+            answer = None
             if prID in user.projects:
                 check = True
+                rprint("[turquoise4]Are you sure You wanna delete this project? You can't change your decision later!(yes or no)[/turquoise4]")
+                answer = input()
             elif prID in user.assignedProjects:
                 check = False
 
-            user.delete_project(prID)
+            user.delete_project(prID, answer)
 
             if check:
                 user.listOfCreatedProject()
@@ -1968,8 +1865,10 @@ def printOptionOfUser() -> None:
     rprint("[bright_white]1)[/bright_white][hot_pink3]Create a new project[/hot_pink3]")
     rprint("[bright_white]2)[/bright_white][hot_pink3]View the list of projects created by you[/hot_pink3]")
     rprint("[bright_white]3)[/bright_white][hot_pink3]View the list of projects assigned to you[/hot_pink3]")
-    rprint("[bright_white]4)[/bright_white][hot_pink3]Clear the screen[/hot_pink3]")
-    rprint("[bright_white]5)[/bright_white][hot_pink3]Quit[/hot_pink3]")
+    rprint("[bright_white]4)[/bright_white][hot_pink3]View the tasks assigned to you[/hot_pink3]")
+    rprint("[bright_white]5)[/bright_white][hot_pink3]Search the tasks[/hot_pink3]")
+    rprint("[bright_white]6)[/bright_white][hot_pink3]Clear the screen[/hot_pink3]")
+    rprint("[bright_white]7)[/bright_white][hot_pink3]Quit[/hot_pink3]")
 
 
 
@@ -1981,7 +1880,15 @@ def userOptions(user : Type[User]) -> None:
 
     while(True):
         if answ == "1":
-            project = user.createProject()
+            rprint("[turquoise4]Enter an ID for your project:[/turquoise4]")
+            ID = input()
+            rprint("[turquoise4]Enter a title for the project:[/turquoise4]")
+            PrName = input()
+            project = user.createProject(ID, PrName)
+            while project is None:
+                rprint("[turquoise4]Please Try again with another ID:[/turquoise4]")
+                ID = input()
+                project = user.createProject(ID, PrName)
 
             printOptionOfUser()
             answ = input()
@@ -2000,10 +1907,20 @@ def userOptions(user : Type[User]) -> None:
             printOptionOfUser()
             answ = input()
         elif answ == "4":
-            os.system('cls')
+            user.listOfAssignedTasks()
+
             printOptionOfUser()
             answ = input()
         elif answ == "5":
+            user.showSearch()
+
+            printOptionOfUser()
+            answ = input()
+        elif answ == "6":
+            os.system('cls')
+            printOptionOfUser()
+            answ = input()
+        elif answ == "7":
             rprint("[orange_red1]Come back soon dear.[/orange_red1]")
             exit()
         else:
@@ -2021,6 +1938,25 @@ def printOptionOfAdmin() -> None:
     rprint("[bright_white]3)[/bright_white][hot_pink3]Quit[/hot_pink3]")
 
 
+# func to ban or unban a user, the account and the user are changed together while both are locked
+def setActivityStatus(username : str, status : str) -> bool:
+    storage = getStorage()
+    with storage.lock([("accounts", username), ("users", username)]):
+        account = storage.load("accounts", username)
+        if account is None:
+            return False
+        newUser = storage.load("users", username)
+        if newUser is None:
+            raise FileNotFoundError(username)
+
+        account["activityStatus"] = status
+        newUser["activityStatus"] = status
+        with storage.transaction():
+            storage.save("accounts", username, account)
+            storage.save("users", username, newUser)
+    return True
+
+
 def adminOptions() -> None:
     printOptionOfAdmin()
 
@@ -2031,23 +1967,7 @@ def adminOptions() -> None:
             rprint("[turquoise4]Enter the username:[/turquoise4]")
             username = input()
             try:
-                with open('users.json') as f:
-                    users = json.load(f)
-
-                if checkPresenceUsername(users, username):
-                    users[username]["activityStatus"] = "inactive"
-                    with open('users.json', 'w') as f:
-                        json.dump(users, f, indent=4)
-
-                    filename = "users/" + username + ".json"
-                    with open(filename) as f:
-                        newUser = json.load(f)
-
-                    newUser["activityStatus"] = "inactive"
-
-                    with open(filename, 'w') as f:
-                        json.dump(newUser, f, indent=4)
-
+                if setActivityStatus(username, "inactive"):
                     logger.info(f"'{username}' was banned by the admin.")
                     rprint("[spring_green1]User successfully banned.[/spring_green1]")
                     printOptionOfAdmin()
@@ -2062,23 +1982,7 @@ def adminOptions() -> None:
             rprint("[turquoise4]Enter the username:[/turquoise4]")
             username = input()
             try:
-                with open('users.json') as f:
-                    users = json.load(f)
-
-                if checkPresenceUsername(users, username):
-                    users[username]["activityStatus"] = "active"
-                    with open('users.json', 'w') as f:
-                        json.dump(users, f, indent=4)
-
-                    filename = "users/" + username + ".json"
-                    with open(filename) as f:
-                        newUser = json.load(f)
-
-                    newUser["activityStatus"] = "active"
-
-                    with open(filename, 'w') as f:
-                        json.dump(newUser, f, indent=4)
-
+                if setActivityStatus(username, "active"):
                     logger.info(f"'{username}' was unbanned by the admin.")
                     rprint("[spring_green1]User successfully unbanned.[/spring_green1]")
                     printOptionOfAdmin()
@@ -2146,7 +2050,6 @@ def start() -> None:
 # func to create the folders and files that the app need in case they don't exist.
 def createFilesFolders():
     folders = ['users', 'projects', 'tasks', 'tasks/History']
-    file_path = os.path.join('projectsID.json')
 
     for folder in folders:
         path = os.path.join(folder)
@@ -2154,13 +2057,203 @@ def createFilesFolders():
             os.makedirs(path)
             rprint(f"[spring_green2]Created folder: {path}[/spring_green2]")
 
-    if not os.path.exists(file_path):
-        with open(file_path, 'w') as f:
-            json.dump({}, f) #it creates empty json file
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Batch mode
+
+BATCH_SIZE = 500
+
+
+def batchLogin(username : str, password : str) -> Type[User]:
+    """
+    A function to log a user in without prompts, it returns None when the login is not possible.
+    """
+    account = getStorage().load("accounts", username)
+    if account is None or account["password"] != hashPassword(password):
+        rprint("[deep_pink2]Invalid username or password.[/deep_pink2]")
+        return None
+    if account["activityStatus"] == "inactive":
+        rprint("[deep_pink2]Your account is inactive, login is not possible.[/deep_pink2]")
+        return None
+
+    logger.info(f"'{username}' has successfully logged in.")
+    return User.loadUser(username)
+
+
+def checkDatetime(value : str) -> str:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S").strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class BatchRunner:
+    """
+    A class to apply a script of operations for a logged in user without any prompt.
+
+    The script is read as json lines like {"op": "change-status", "projectID": "P1", "taskID": "...", "status": "DONE"}.
+    Consecutive operations on the same project are applied in one unit of work (at most BATCH_SIZE of them), so
+    their writes are committed together. An operation that fails is undone on its own and does not stop the script.
+    When another process changed a document of the batch before it was committed, the operations of the batch are
+    applied again with a commit each.
+    A task created with a "ref" can be used by the next operations as "taskID": "@<ref>".
+    """
+    def __init__(self, user : Type[User], out = None):
+        self.user = user
+        self.out = out if out is not None else sys.stdout
+        self.refs = {}
+        self.counts = {"ok" : 0, "failed" : 0}
+        self.operations = {
+            "create-project" : lambda op: self.user.createProject(op["projectID"], op.get("title", "")),
+            "add-member" : lambda op: self.user.add_member_to_project(op["projectID"], op["username"]),
+            "remove-member" : lambda op: self.user.remove_user_from_project(op["projectID"], op["username"]),
+            "retitle-project" : lambda op: self.user.Retitle_Pr(op["projectID"], op["title"]),
+            "describe-project" : lambda op: self.user.changeDescription(op["projectID"], op.get("description", "")),
+            "delete-project" : lambda op: self.user.delete_project(op["projectID"], "yes"),
+            "create-task" : self.createTask,
+            "change-priority" : lambda op: self.user.change_priority(op["projectID"], self.taskID(op), op["priority"]),
+            "change-status" : lambda op: self.user.change_status(op["projectID"], self.taskID(op), op["status"]),
+            "assign" : lambda op: self.user.add_assignee_to_task(op["projectID"], self.taskID(op), op["username"]),
+            "unassign" : lambda op: self.user.remove_assignee_from_task(op["projectID"], self.taskID(op), op["username"]),
+            "delete-task" : lambda op: self.user.delTask(op["projectID"], self.taskID(op)),
+            "comment" : lambda op: self.user.addComment(op["projectID"], self.taskID(op), op["comment"]),
+            "clear-comments" : lambda op: self.user.clearComments(op["projectID"], self.taskID(op)),
+            "retitle-task" : lambda op: self.user.change_task_title(op["projectID"], self.taskID(op), op["title"]),
+            "change-deadline" : lambda op: self.user.change_task_deadline(op["projectID"], self.taskID(op), op["deadline"]),
+        }
+
+    def taskID(self, op : dict) -> str:
+        taskID = op["taskID"]
+        if taskID.startswith("@"):
+            return self.refs[taskID[1:]]
+        return taskID
+
+    def createTask(self, op : dict) -> Type[Task]:
+        createdDT = checkDatetime(op["start"]) if "start" in op else datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        if "deadline" in op:
+            deadlineDT = checkDatetime(op["deadline"])
+        else:
+            deadlineDT = (datetime.strptime(createdDT, "%Y-%m-%dT%H:%M:%S") + timedelta(hours=24)).strftime("%Y-%m-%dT%H:%M:%S")
+
+        task = self.user.createTask(op["projectID"], "2", op.get("title", "noTitle"), op.get("description", ""),
+                                    op.get("priority", "LOW"), op.get("status", "BACKLOG"), createdDT, deadlineDT)
+        if "ref" in op:
+            self.refs[op["ref"]] = task.taskID
+        return task
+
+    # func to apply one operation, what it prints becomes the message of its result
+    def apply(self, number : int, op : dict) -> dict:
+        result = {"line" : number, "op" : op.get("op"), "ok" : False}
+        captured = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(captured), getStorage().savepoint():
+                if "invalid" in op:
+                    raise ValueError("The line is not valid json.")
+                if op.get("op") not in self.operations:
+                    raise ValueError(f"Unknown operation '{op.get('op')}'.")
+                outcome = self.operations[op["op"]](op)
+            result["ok"] = bool(outcome)
+            if isinstance(outcome, Task):
+                result["taskID"] = outcome.taskID
+        except KeyError as e:
+            result["error"] = f"Missing or unknown value: {e}"
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        if result.get("error") is not None:
+            # the user object may hold changes of the operation that were undone
+            self.user = User.loadUser(self.user.username)
+        result["message"] = " ".join(line.strip() for line in captured.getvalue().splitlines() if line.strip())
+        return result
+
+    # func to apply operations in one unit of work and commit them together
+    def commit(self, batch : list) -> list:
+        results = []
+        try:
+            with getStorage().transaction():
+                for number, op in batch:
+                    results.append(self.apply(number, op))
+        except Exception:
+            self.user = User.loadUser(self.user.username)
+            raise
+        return results
+
+    def flush(self, batch : list) -> None:
+        try:
+            results = self.commit(batch)
+        except VersionConflict as conflict:
+            # another process changed one of the documents, the operations are applied again one commit each so that edit fails one of them at most
+            logger.debug(f"The batch from line {batch[0][0]} is committed one operation at a time: {conflict}")
+            results = []
+            for number, op in batch:
+                try:
+                    results.extend(self.commit([(number, op)]))
+                except Exception as e:
+                    results.append({"line" : number, "op" : op.get("op"), "ok" : False, "error" : f"The operation could not be committed: {e}"})
+        except Exception as e:
+            results = [{"line" : number, "op" : op.get("op"), "ok" : False, "error" : f"The batch could not be committed: {e}"} for number, op in batch]
+
+        for result in results:
+            self.counts["ok" if result["ok"] else "failed"] += 1
+            self.out.write(json.dumps(result) + "\n")
+        self.out.flush()
+
+    def run(self, lines) -> dict:
+        """
+        A function to apply every operation of a script in order and count the results.
+        """
+        start = time.perf_counter()
+        batch = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                op = json.loads(line)
+            except ValueError:
+                op = {"op" : None, "invalid" : line.strip()}
+
+            if batch and (len(batch) >= BATCH_SIZE or batch[-1][1].get("projectID") != op.get("projectID")):
+                self.flush(batch)
+                batch = []
+            batch.append((number, op))
+        if batch:
+            self.flush(batch)
+
+        seconds = time.perf_counter() - start
+        total = self.counts["ok"] + self.counts["failed"]
+        return {"ok" : self.counts["ok"], "failed" : self.counts["failed"], "seconds" : seconds, "rate" : total / seconds if seconds else 0}
+
+
+def batchActions(argv : list) -> None:
+    parser = argparse.ArgumentParser(prog='main.py --batch', description='Apply a script of operations without prompts')
+    parser.add_argument('script', help='File with one json operation per line, - reads them from stdin')
+    parser.add_argument('--username', required=True, help='Username to run the operations as')
+    parser.add_argument('--password', required=True, help='Password of the user')
+    args = parser.parse_args(argv)
+
+    console = Console(stderr=True)
+    with contextlib.redirect_stdout(sys.stderr):
+        user = batchLogin(args.username, args.password)
+    if user is None:
+        sys.exit(1)
+
+    if args.script == "-":
+        summary = BatchRunner(user).run(sys.stdin)
+    else:
+        with open(args.script, 'r') as script:
+            summary = BatchRunner(user).run(script)
+
+    console.print(f"[spring_green1]{summary['ok']} operations succeeded and {summary['failed']} failed in {summary['seconds']:.2f}s ({summary['rate']:.0f} operations/s).[/spring_green1]")
+    if summary["failed"]:
+        sys.exit(1)
 
 
 #***********************************************************************************************************************************************************
 #***********************************************************************************************************************************************************
 if __name__ == "__main__":
-    createFilesFolders()
-    start()
\ No newline at end of file
+    # the batch mode is only chosen by name, any other argument still starts the menus
+    if len(sys.argv) > 1 and sys.argv[1] in ("--batch", "batch"):
+        with contextlib.redirect_stdout(sys.stderr):
+            createFilesFolders()
+        batchActions(sys.argv[2:])
+    else:
+        createFilesFolders()
+        start()
\ No newline at end of file
@@ -5,6 +5,15 @@ import os
 import glob
 import shutil
 from rich import print as rprint
+from rich.console import Console
+from rich.table import Table
+from storage import CODECS, JsonStorage, LogStorage, getStorage
+from trello import importTrello
+from archive import exportProject, importProject
+from audit import getAuditLog
+from cascade import GC_GRACE_SECONDS, collectGarbage
+
+CONVERT_BATCH = 500
 
 def hashPassword(password : str) -> None:
     """
@@ -40,15 +49,21 @@ def deleteDir(newDir) -> None:
         shutil.rmtree(newDir)
         rprint(f"'{newDir}' [spring_green1]deleted successfully.[/spring_green1]")
     except FileNotFoundError as e:
-        rprint("[deep_pink2]There are no files to delete.[/deep_pink2]")
-        exit()
+        rprint(f"[deep_pink2]There are no files to delete in '{newDir}'.[/deep_pink2]")
 
 
 def adminActions() -> None:
     parser = argparse.ArgumentParser(description='Manager script')
-    parser.add_argument('action', choices=['create-admin', 'purge-data'], help='Action to perform')
-    parser.add_argument('--username', help='Username for admin')
+    parser.add_argument('action', choices=['create-admin', 'purge-data', 'compact', 'convert', 'import-trello', 'export-project', 'import-project', 'audit', 'daemon', 'migrate-layout', 'gc'], help='Action to perform')
+    parser.add_argument('--username', help='Username for admin, the user an import belongs to or the actor of the audit events')
     parser.add_argument('--password', help='Password for admin')
+    parser.add_argument('--codec', choices=list(CODECS), default='compact', help='Format to rewrite the stored documents in')
+    parser.add_argument('--file', help='Trello board export or project archive to read, or the archive to write')
+    parser.add_argument('--project-id', help='ID of the project to export, or to import a Trello board or an archive into')
+    parser.add_argument('--since', help='First day ("%%Y-%%m-%%d") or time ("%%Y-%%m-%%d %%H:%%M:%%S") of the audit events to show')
+    parser.add_argument('--until', help='Last day or time of the audit events to show')
+    parser.add_argument('--event', help='Only show the audit events of this action, e.g. change-status')
+    parser.add_argument('--grace', type=int, default=GC_GRACE_SECONDS, help='Seconds an orphan must have been found for before gc reclaims it, 0 when the app is not in use')
     args = parser.parse_args()
 
     if args.action == 'create-admin':
@@ -68,15 +83,120 @@ def adminActions() -> None:
             if message == "yes":
                 deleteFilesWithExtension("json")
                 deleteFilesWithExtension("log")
+                deleteFilesWithExtension("db")
+                deleteFilesWithExtension("db-wal")
+                deleteFilesWithExtension("db-shm")
                 deleteDir("users")
                 deleteDir("tasks")
                 deleteDir("projects")
+                deleteDir("emails")
+                deleteDir("accounts")
+                deleteDir("audit")
+                deleteDir("wal")
+                deleteDir("locks")
+                deleteDir("gc")
+                deleteDir("assignments")
+                deleteDir("search")
                 break
             elif message == "no":
                 break
             else:
                 rprint("[deep_pink2]Unacceptable answer, please answer [yellow2]yes[/yellow2] or [yellow2]no[/yellow2].[/deep_pink2]") 
 
+    if args.action == 'compact':
+        if not os.path.isdir("wal"):
+            rprint("[deep_pink2]There is no log to compact.[/deep_pink2]")
+            return
+
+        storage = LogStorage()
+        result = storage.compact()
+        storage.close()
+        rprint(f"[spring_green1]The log was compacted: {result['segmentBytes']} bytes of log were replaced by a {result['snapshotBytes']} bytes snapshot and {result['documents']} documents were rewritten.[/spring_green1]")
+
+    if args.action == 'convert':
+        os.environ["TRELLOMIZE_CODEC"] = args.codec
+        storage = getStorage()
+        if isinstance(storage, LogStorage):
+            rprint("[deep_pink2]The log backend always writes json lines, there is nothing to convert.[/deep_pink2]")
+            return
+
+        converted = 0
+        for kind in ["accounts", "users", "projects", "tasks", "emails", "assignments"]:
+            keys = storage.keys(kind)
+            # rewrite the documents in batches so one commit never holds the whole data set
+            for start in range(0, len(keys), CONVERT_BATCH):
+                with storage.transaction():
+                    for key in keys[start:start + CONVERT_BATCH]:
+                        storage.save(kind, key, storage.load(kind, key))
+            converted += len(keys)
+        storage.close()
+        rprint(f"[spring_green1]{converted} documents were rewritten with the {args.codec} codec.[/spring_green1]")
+
+    if args.action == 'migrate-layout':
+        storage = getStorage()
+        if not isinstance(storage, JsonStorage):
+            rprint("[deep_pink2]Only the json backend keeps its documents in folders, there is nothing to migrate.[/deep_pink2]")
+            return
+
+        # the app can keep running, every record is locked while it is moved
+        counts = storage.migrateLayout()
+        rprint(f"[spring_green1]{counts['users']} users, {counts['tasks']} tasks and {counts['history']} histories were moved to their shards.[/spring_green1]")
+
+    if args.action == 'gc':
+        storage = getStorage()
+        counts = collectGarbage(storage, args.grace)
+        storage.close()
+        rprint(f"[spring_green1]{counts['tasks']} orphan tasks, {counts['history']} orphan histories and {counts['memberships']} memberships of deleted projects were reclaimed.[/spring_green1]")
+        if counts["pending"]:
+            rprint(f"[turquoise4]{counts['pending']} more orphans were found and are reclaimed by a gc run in {args.grace} seconds or later.[/turquoise4]")
+
+    if args.action == 'import-trello':
+        if not args.file or not args.project_id or not args.username:
+            rprint("[deep_pink2]import-trello needs --file, --project-id and the --username of the project admin.[/deep_pink2]")
+            return
+
+        counts = importTrello(args.file, args.project_id, args.username)
+        if counts is not None:
+            rprint(f"[spring_green1]{counts['tasks']} cards and {counts['comments']} comments were imported into project '{args.project_id}'.[/spring_green1]")
+
+    if args.action == 'export-project':
+        if not args.file or not args.project_id:
+            rprint("[deep_pink2]export-project needs --project-id and the --file to write.[/deep_pink2]")
+            return
+
+        counts = exportProject(args.project_id, args.file)
+        if counts is not None:
+            rprint(f"[spring_green1]Project '{args.project_id}' was exported to {args.file} with {counts['tasks']} tasks and {counts['history']} history records.[/spring_green1]")
+
+    if args.action == 'import-project':
+        if not args.file:
+            rprint("[deep_pink2]import-project needs the --file of the archive.[/deep_pink2]")
+            return
+
+        counts = importProject(args.file, args.project_id, args.username)
+        if counts is not None:
+            rprint(f"[spring_green1]{counts['tasks']} tasks and {counts['history']} history records were imported from {args.file}.[/spring_green1]")
+
+    if args.action == 'audit':
+        table = Table(title="Audit trail")
+        for column in ["TIME", "ACTOR", "ACTION", "PROJECT", "TASK", "OLD", "NEW"]:
+            table.add_column(column, style="cyan3" if column in ["TIME", "ACTOR"] else "chartreuse2")
+
+        count = 0
+        for event in getAuditLog().query(args.username, args.project_id, args.since, args.until, args.event):
+            table.add_row(*[str(event[key]) if event[key] is not None else "" for key in ["time", "actor", "action", "project", "task", "old", "new"]])
+            count += 1
+
+        if count == 0:
+            rprint("[deep_pink2]No audit events match.[/deep_pink2]")
+        else:
+            Console().print(table)
+
+    if args.action == 'daemon':
+        # Unix sockets are not available everywhere, so the daemon is only imported when it is started
+        from daemon import serveDaemon
+        serveDaemon()
+
 
 if __name__ == "__main__":
     adminActions()
\ No newline at end of file
@@ -0,0 +1,270 @@
+import heapq
+import json
+import marshal
+import math
+import os
+import re
+from collections import Counter
+from storage import Storage, getStorage, lockFile
+
+SEARCH_RESULTS = 20
+# the log of changes is folded into a new snapshot once it grows past this size
+SEARCH_COMPACT_BYTES = int(os.environ.get("TRELLOMIZE_SEARCH_COMPACT_BYTES", 8 * 1024 * 1024))
+TOKEN = re.compile(r"\w+")
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Full-text search
+#
+#The title, the description and the comments of every task are kept in an inverted index in the search folder. Changes
+#are appended to a log by whichever process commits them, and the index is only read into memory by the first search of
+#a process, from the last snapshot plus the changes logged after it.
+
+def tokenize(text : str) -> list:
+    return [token for token in TOKEN.findall(text.casefold()) if len(token) <= 40]
+
+
+def taskTerms(title : str, description : str, comments : list) -> Counter:
+    """
+    A function to count the terms of a task, the words of the title count twice so a match in the title ranks higher.
+    """
+    terms = Counter(tokenize(title or "") * 2)
+    terms.update(tokenize(description or ""))
+    for comment in comments:
+        terms.update(tokenize(comment))
+    return terms
+
+
+class SearchIndex:
+    """
+    A class to rank the tasks that match a query with BM25, among the tasks of the projects a user can see.
+
+    The postings are kept per term and per project (term -> project -> task -> count), so a query only goes through
+    the matches in the projects it is scoped to. Every change is a json line in changes.log, appended under a lock
+    on the log. A loaded index catches up with the lines appended since it last looked, and the process that finds
+    the log past SEARCH_COMPACT_BYTES writes the whole index to snapshot.bin (with marshal) and empties the log.
+    When there is no snapshot yet, the first search builds the index from the tasks on the boards of the projects.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, storage : Storage):
+        self.storage = storage
+        self.root = os.path.join(getattr(storage, "root", "."), "search")
+        self.loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        # taskID -> [projectID, length, terms]
+        self.docs = {}
+        self.postings = {}
+        self.frequencies = {}
+        self.totalLength = 0
+        self.offset = 0
+        self.snapshot = None
+
+    def _logPath(self) -> str:
+        return os.path.join(self.root, "changes.log")
+
+    def _snapshotPath(self) -> str:
+        return os.path.join(self.root, "snapshot.bin")
+
+    def _snapshotStat(self):
+        try:
+            stat = os.stat(self._snapshotPath())
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _openLog(self):
+        os.makedirs(self.root, exist_ok=True)
+        return open(self._logPath(), 'a+b')
+
+    def _append(self, changes : list) -> None:
+        lines = b"".join(json.dumps(change, separators=(',', ':'), ensure_ascii=False).encode() + b"\n" for change in changes)
+        with self._openLog() as log, lockFile(log):
+            # a line torn by a crash is ended first, so it is skipped instead of swallowing the next change
+            size = log.seek(0, os.SEEK_END)
+            if size:
+                log.seek(size - 1)
+                if log.read(1) != b"\n":
+                    lines = b"\n" + lines
+            log.write(lines)
+
+    def update(self, tasks : list) -> None:
+        """
+        A function to log the new terms of tasks given as (taskID, projectID, terms).
+        """
+        if tasks:
+            self._append([{"taskID" : taskID, "projectID" : prID, "terms" : terms} for taskID, prID, terms in tasks])
+
+    def remove(self, taskIDs : list) -> None:
+        if taskIDs:
+            self._append([{"taskID" : taskID, "deleted" : True} for taskID in taskIDs])
+
+    def _apply(self, change : dict) -> None:
+        taskID = change["taskID"]
+        old = self.docs.pop(taskID, None)
+        if old is not None:
+            prID, length, terms = old
+            self.totalLength -= length
+            for term in terms:
+                tasks = self.postings[term][prID]
+                del tasks[taskID]
+                if not tasks:
+                    del self.postings[term][prID]
+                    if not self.postings[term]:
+                        del self.postings[term]
+                self.frequencies[term] -= 1
+                if not self.frequencies[term]:
+                    del self.frequencies[term]
+        if change.get("deleted"):
+            return
+
+        prID, terms = change["projectID"], change["terms"]
+        length = sum(terms.values())
+        self.docs[taskID] = [prID, length, list(terms)]
+        self.totalLength += length
+        for term, count in terms.items():
+            self.postings.setdefault(term, {}).setdefault(prID, {})[taskID] = count
+            self.frequencies[term] = self.frequencies.get(term, 0) + 1
+
+    # func to read the changes logged since the last read, reading the snapshot again when another process wrote a new one
+    def _catchUp(self, log) -> None:
+        snapshot = self._snapshotStat()
+        if snapshot != self.snapshot:
+            self._reset()
+            with open(self._snapshotPath(), 'rb') as file:
+                state = marshal.loads(file.read())
+            self.docs, self.postings, self.frequencies, self.totalLength = state["docs"], state["postings"], state["frequencies"], state["totalLength"]
+            self.snapshot = snapshot
+
+        log.seek(self.offset)
+        for line in log:
+            if not line.endswith(b"\n"):
+                break
+            self.offset += len(line)
+            try:
+                change = json.loads(line)
+            except ValueError:
+                continue
+            self._apply(change)
+
+    def _writeSnapshot(self, log) -> None:
+        state = {"docs" : self.docs, "postings" : self.postings, "frequencies" : self.frequencies, "totalLength" : self.totalLength}
+        tmpPath = f"{self._snapshotPath()}.{os.getpid()}.tmp"
+        with open(tmpPath, 'wb') as file:
+            marshal.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmpPath, self._snapshotPath())
+        log.truncate(0)
+        self.offset = 0
+        self.snapshot = self._snapshotStat()
+
+    def rebuild(self) -> int:
+        """
+        A function to build the index from the tasks on the boards of all the projects and write it as a new snapshot.
+        """
+        with self._openLog() as log:
+            # the changes logged from here on may be missing from what is read below, they are applied again at the end
+            start = log.seek(0, os.SEEK_END)
+            self._reset()
+            for prID in self.storage.keys("projects"):
+                project = self.storage.load("projects", prID)
+                for cell in project["tasks"].values():
+                    for rows in cell.values():
+                        for row in rows:
+                            task = self.storage.load("tasks", row["taskID"])
+                            if task is not None:
+                                self._apply({"taskID" : row["taskID"], "projectID" : prID, "terms" : taskTerms(task["taskTitle"], task["taskDescription"], task["Comments"])})
+
+            with lockFile(log):
+                self.offset = start
+                self.snapshot = self._snapshotStat()
+                self._catchUp(log)
+                self._writeSnapshot(log)
+        self.loaded = True
+        return len(self.docs)
+
+    # func to load the index the first time it is used and to bring it up to date afterwards
+    def refresh(self) -> None:
+        if not self.loaded:
+            if self._snapshotStat() is None:
+                self.rebuild()
+                return
+            self.loaded = True
+
+        try:
+            if self._snapshotStat() == self.snapshot and os.path.getsize(self._logPath()) == self.offset:
+                return
+        except FileNotFoundError:
+            pass
+        with self._openLog() as log, lockFile(log):
+            self._catchUp(log)
+            if self.offset >= SEARCH_COMPACT_BYTES:
+                self._writeSnapshot(log)
+
+    def search(self, query : str, projectIDs : list, limit : int = SEARCH_RESULTS) -> list:
+        """
+        A function to get the best matches of a query among the tasks of the given projects, best first.
+        """
+        self.refresh()
+        count = len(self.docs)
+        if not count:
+            return []
+        average = self.totalLength / count
+
+        scores = {}
+        for term in set(tokenize(query)):
+            byProject = self.postings.get(term)
+            if byProject is None:
+                continue
+            frequency = self.frequencies[term]
+            idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for prID in projectIDs:
+                for taskID, tf in byProject.get(prID, {}).items():
+                    norm = self.K1 * (1 - self.B + self.B * self.docs[taskID][1] / average)
+                    scores[taskID] = scores.get(taskID, 0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item : item[1])
+        return [{"taskID" : taskID, "projectID" : self.docs[taskID][0], "score" : round(score, 3)} for taskID, score in best]
+
+
+_searchIndex = None
+
+
+def getSearchIndex() -> SearchIndex:
+    """
+    A function to get the search index kept next to the storage in use.
+    """
+    global _searchIndex
+    if _searchIndex is None or _searchIndex.storage is not getStorage():
+        _searchIndex = SearchIndex(getStorage())
+    return _searchIndex
+
+
+def indexTask(task, prID : str) -> None:
+    """
+    A function to index the text of a task as it is now, once the change is committed.
+    """
+    indexTasks([(task.taskID, prID, task.taskTitle, task.Description, task.comments)])
+
+
+def indexTasks(tasks : list, storage : Storage = None) -> None:
+    """
+    A function to index many tasks given as (taskID, projectID, title, description, comments) with one write, once they are committed.
+    """
+    storage = storage or getStorage()
+    changes = [(taskID, prID, dict(taskTerms(title, description, comments))) for taskID, prID, title, description, comments in tasks]
+    storage.afterCommit(lambda : SearchIndex(storage).update(changes))
+
+
+def unindexTasks(taskIDs : list, storage : Storage = None) -> None:
+    """
+    A function to take tasks out of the index once their deletion is committed.
+    """
+    storage = storage or getStorage()
+    taskIDs = list(taskIDs)
+    storage.afterCommit(lambda : SearchIndex(storage).remove(taskIDs))
@@ -0,0 +1,1829 @@
+import base64
+import bisect
+import functools
+import glob
+import hashlib
+import json
+import marshal
+import os
+import re
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+#Storage backends
+#
+#Every document of the app (users, projects, tasks, the accounts registry and the project IDs) is identified by a kind and a key
+#and is read and written through one of the classes below. The backend is chosen with the TRELLOMIZE_STORAGE environment variable.
+
+class Codec:
+    """
+    A base class for the formats the documents are written in.
+    """
+    name = None
+
+    def encode(self, kind : str, data) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, kind : str, raw : bytes):
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """
+    A class to write documents as indented json, the format the app always used.
+    """
+    name = "json"
+
+    def encode(self, kind : str, data) -> bytes:
+        return json.dumps(data, indent=4).encode()
+
+    def decode(self, kind : str, raw : bytes):
+        return json.loads(raw)
+
+
+class CompactJsonCodec(JsonCodec):
+    """
+    A class to write documents as json without any whitespace.
+    """
+    name = "compact"
+
+    def encode(self, kind : str, data) -> bytes:
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+class BinaryCodec(Codec):
+    """
+    A class to write documents with marshal, with the statuses and priorities stored as small ints.
+
+    The board of a project becomes nested lists indexed by status and priority whose cells hold (taskID, title)
+    pairs. Every binary document starts with MAGIC, so it can be told apart from json when it is read back.
+    """
+    name = "binary"
+    MAGIC = b"TRMB\x01"
+    # the same order as the Status and Priority enums in main.py
+    STATUSES = ["BACKLOG", "TODO", "DOING", "DONE", "ARCHIVED"]
+    PRIORITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+    def encode(self, kind : str, data) -> bytes:
+        if kind == "tasks":
+            data = dict(data)
+            data["Priority"] = self.PRIORITIES.index(data["Priority"])
+            data["Status"] = self.STATUSES.index(data["Status"])
+        elif kind == "projects":
+            data = dict(data)
+            data["tasks"] = [[[(entry["taskID"], entry["taskTitle"]) for entry in data["tasks"][status][priority]]
+                              for priority in self.PRIORITIES] for status in self.STATUSES]
+        return self.MAGIC + marshal.dumps(data)
+
+    def decode(self, kind : str, raw : bytes):
+        data = marshal.loads(raw[len(self.MAGIC):])
+        if kind == "tasks":
+            data["Priority"] = self.PRIORITIES[data["Priority"]]
+            data["Status"] = self.STATUSES[data["Status"]]
+        elif kind == "projects":
+            data["tasks"] = {status : {priority : [{"taskID" : taskID, "taskTitle" : title} for taskID, title in data["tasks"][s][p]]
+                                       for p, priority in enumerate(self.PRIORITIES)} for s, status in enumerate(self.STATUSES)}
+        return data
+
+
+CODECS = {codec.name : codec for codec in [JsonCodec(), CompactJsonCodec(), BinaryCodec()]}
+
+
+def getCodec(name : str = None) -> Codec:
+    """
+    A function to get the codec chosen with TRELLOMIZE_CODEC (compact json by default).
+    """
+    name = name or os.environ.get("TRELLOMIZE_CODEC", "compact")
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}', choose one of: {', '.join(CODECS)}.")
+    return CODECS[name]
+
+
+def decodeDocument(kind : str, raw):
+    """
+    A function to read a document written with any of the codecs.
+    """
+    if isinstance(raw, bytes) and raw.startswith(BinaryCodec.MAGIC):
+        return CODECS["binary"].decode(kind, raw)
+    return json.loads(raw)
+
+
+HISTORY_PAGE_SIZE = 10
+
+
+def historyRecord(note : str, time : str = None) -> dict:
+    """
+    A function to build the record of a history entry, stamped with the current time unless a time is given.
+    """
+    if time is None:
+        time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {"time" : time, "note" : note}
+
+
+def asHistoryRecord(entry) -> dict:
+    """
+    A function to read a history entry, the entries written before records existed are "[time] : note" lines.
+    """
+    if isinstance(entry, dict):
+        return entry
+    match = re.match(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] : (.*)$", entry)
+    if match is None:
+        return {"time" : "", "note" : entry}
+    return {"time" : match.group(1), "note" : match.group(2)}
+
+
+def inTimeRange(record : dict, since : str, until : str) -> bool:
+    return (since is None or record["time"] >= since) and (until is None or record["time"] <= until)
+
+
+def copyDocument(data):
+    """
+    A function to copy a document, they only hold json values so marshal copies them much faster than deepcopy.
+    """
+    return marshal.loads(marshal.dumps(data))
+
+
+# a save that does not check the version of the stored document
+ANY_VERSION = "any"
+
+
+class VersionConflict(RuntimeError):
+    """
+    A class for the error raised when a document was saved by someone else since it was loaded.
+    """
+    def __init__(self, kind : str, key : str, expected, found):
+        super().__init__(f"'{key}' of {kind} is at version {found}, the change was made to version {expected}.")
+        self.kind = kind
+        self.key = key
+        self.expected = expected
+        self.found = found
+
+
+class UnitOfWork:
+    """
+    A class to collect the changes of one operation so they can be flushed together.
+    """
+    def __init__(self):
+        self.documents = {}
+        self.history = {}
+        # (kind, key) -> the version a document must still have in the storage for the changes to be committed
+        self.expected = {}
+        # the records locked while the changes were made, they are released once the changes are committed
+        self.locks = []
+        self.callbacks = []
+        # the callbacks that undo what was done outside the unit of work (like a reserved key) when it is not committed
+        self.rollbacks = []
+
+    def save(self, kind : str, key : str, data, expected = ANY_VERSION) -> None:
+        self.documents[(kind, key)] = copyDocument(data)
+        # a document saved twice must still have the version it had before the first save
+        if expected != ANY_VERSION:
+            self.expected.setdefault((kind, key), expected)
+
+    def delete(self, kind : str, key : str) -> None:
+        self.documents[(kind, key)] = None
+
+    # history changes are kept as [mode, records] where mode is "append", "clear" or "delete"
+    def appendHistory(self, taskID : str, record : dict) -> None:
+        change = self.history.setdefault(taskID, ["append", []])
+        if change[0] == "delete":
+            change[0] = "clear"
+        change[1].append(record)
+
+    def clearHistory(self, taskID : str) -> None:
+        self.history[taskID] = ["clear", []]
+
+    def deleteHistory(self, taskID : str) -> None:
+        self.history[taskID] = ["delete", []]
+
+    def isEmpty(self) -> bool:
+        return not self.documents and not self.history
+
+    # func to remember the changes collected so far, so the ones made after it can be undone
+    def snapshot(self) -> tuple:
+        return (dict(self.documents), {taskID : [mode, list(records)] for taskID, (mode, records) in self.history.items()},
+                dict(self.expected), len(self.callbacks), len(self.rollbacks))
+
+    # func to undo the changes made since a snapshot, the rollbacks added since then are returned to be run
+    def restore(self, state : tuple) -> list:
+        self.documents, self.history, self.expected, callbacks, rollbacks = state
+        del self.callbacks[callbacks:]
+        undone = self.rollbacks[rollbacks:]
+        del self.rollbacks[rollbacks:]
+        return undone
+
+
+class IdentityMap:
+    """
+    A bounded LRU map that hands out the same object for a document as long as the stored version did not change.
+    """
+    PENDING = "pending"
+
+    def __init__(self, capacity : int = 1024):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind : str, key : str, version):
+        entry = self.entries.get((kind, key))
+        if entry is None or version is None or entry[0] != version:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end((kind, key))
+        self.hits += 1
+        return entry[1]
+
+    def put(self, kind : str, key : str, version, obj) -> None:
+        if version is None:
+            self.entries.pop((kind, key), None)
+            return
+
+        self.entries[(kind, key)] = (version, obj)
+        self.entries.move_to_end((kind, key))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, kind : str, key : str) -> None:
+        self.entries.pop((kind, key), None)
+
+    # func to give the objects saved inside a unit of work the version they got when it was committed
+    def settle(self, unit : "UnitOfWork", storage : "Storage", committed : bool) -> None:
+        # objects changed by a unit of work that failed no longer match what is stored, so none of them is kept
+        if not committed:
+            self.entries.clear()
+            return
+
+        for kind, key in unit.documents:
+            entry = self.entries.get((kind, key))
+            if entry is not None and entry[0] == self.PENDING:
+                self.put(kind, key, storage.version(kind, key), entry[1])
+
+    def stats(self) -> dict:
+        return {"size" : len(self.entries), "capacity" : self.capacity, "hits" : self.hits, "misses" : self.misses, "evictions" : self.evictions}
+
+
+LOCK_TIMEOUT = float(os.environ.get("TRELLOMIZE_LOCK_TIMEOUT", 30))
+
+
+class LockTimeout(RuntimeError):
+    """
+    A class for the error raised when a record stays locked by someone else for longer than the lock timeout.
+    """
+
+
+def waitForLock(fd : int, operation : int) -> None:
+    try:
+        fcntl.flock(fd, operation)
+    finally:
+        os.close(fd)
+
+
+class RecordLocks:
+    """
+    A class to take advisory locks on single records, with one lock file per record under <root>/locks.
+
+    A change only locks the users, projects and tasks it reads and writes, so changes to unrelated records go on in
+    parallel in any number of processes. A record is locked shared by the changes that only need it to stay as it is,
+    and exclusive by the ones that change it. The records of one call are locked in sorted order so that two changes
+    never wait on each other, and a thread can lock again a record it already holds. The time spent waiting for a
+    lock is counted for every kind of record.
+    """
+    def __init__(self, root : str = ".", timeout : float = LOCK_TIMEOUT):
+        self.root = os.path.join(root, "locks")
+        self.timeout = timeout
+        self.local = threading.local()
+        self.counters = {}
+        self.countersLock = threading.Lock()
+
+    def _path(self, kind : str, key : str) -> str:
+        return os.path.join(self.root, kind, hashlib.md5(key.encode()).hexdigest()[:2], key + ".lock")
+
+    def _held(self) -> dict:
+        if not hasattr(self.local, "held"):
+            self.local.held = {}
+        return self.local.held
+
+    def _count(self, kind : str, waited : float, contended : bool, timedOut : bool = False) -> None:
+        with self.countersLock:
+            counter = self.counters.setdefault(kind, {"locks" : 0, "contended" : 0, "timeouts" : 0, "waitSeconds" : 0.0, "maxWaitSeconds" : 0.0})
+            counter["locks"] += not timedOut
+            counter["contended"] += contended
+            counter["timeouts"] += timedOut
+            counter["waitSeconds"] += waited
+            counter["maxWaitSeconds"] = max(counter["maxWaitSeconds"], waited)
+
+    # func to lock an open lock file, a lock that is taken waits in the kernel on a duplicate of the file from another thread
+    def _flock(self, kind : str, key : str, file, operation : int) -> None:
+        try:
+            fcntl.flock(file, operation | fcntl.LOCK_NB)
+            self._count(kind, 0.0, False)
+            return
+        except BlockingIOError:
+            pass
+
+        # the duplicate shares the lock of the file, when the wait is given up the file is closed and the lock goes
+        # away with the duplicate as soon as it is granted
+        duplicate = os.dup(file.fileno())
+        waiter = threading.Thread(target=waitForLock, args=(duplicate, operation), daemon=True)
+        start = time.perf_counter()
+        waiter.start()
+        waiter.join(self.timeout)
+        waited = time.perf_counter() - start
+        if waiter.is_alive():
+            self._count(kind, waited, True, True)
+            raise LockTimeout(f"The {kind[:-1] if kind.endswith('s') else kind} '{key}' is being changed by someone else, try again later.")
+        self._count(kind, waited, True)
+
+    def acquire(self, records : list, shared : list = ()) -> list:
+        """
+        A function to lock (kind, key) records exclusive and shared, it gives back the records to release.
+        """
+        if fcntl is None:
+            return []
+
+        wanted = {(kind, key) : True for kind, key in shared}
+        wanted.update({(kind, key) : False for kind, key in records})
+        held = self._held()
+        taken = []
+        try:
+            for kind, key in sorted(wanted):
+                entry = held.get((kind, key))
+                if entry is None:
+                    path = self._path(kind, key)
+                    try:
+                        file = open(path, 'a')
+                    except FileNotFoundError:
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        file = open(path, 'a')
+                    try:
+                        self._flock(kind, key, file, fcntl.LOCK_SH if wanted[(kind, key)] else fcntl.LOCK_EX)
+                    except BaseException:
+                        file.close()
+                        raise
+                    held[(kind, key)] = entry = [file, 0, wanted[(kind, key)]]
+                elif entry[2] and not wanted[(kind, key)]:
+                    # a shared lock held by this thread becomes exclusive and stays so until it is released
+                    self._flock(kind, key, entry[0], fcntl.LOCK_EX)
+                    entry[2] = False
+                entry[1] += 1
+                taken.append((kind, key))
+        except BaseException:
+            self.release(taken)
+            raise
+        return taken
+
+    def release(self, records : list) -> None:
+        held = self._held()
+        for record in records:
+            entry = held[record]
+            entry[1] -= 1
+            if entry[1] == 0:
+                fcntl.flock(entry[0], fcntl.LOCK_UN)
+                entry[0].close()
+                del held[record]
+
+    def stats(self) -> dict:
+        with self.countersLock:
+            return {kind : dict(counter) for kind, counter in self.counters.items()}
+
+
+class Storage:
+    """
+    A base class for the places where users, projects and tasks are kept.
+    """
+    # True when documents can be loaded from several threads at once
+    parallelReads = False
+
+    def __init__(self):
+        self._unit = None
+        self.identityMap = IdentityMap(int(os.environ.get("TRELLOMIZE_CACHE_SIZE", 1024)))
+        self._recordLocks = None
+
+    # a unit of work groups every change made inside it into a single commit
+    @contextmanager
+    def transaction(self):
+        if self._unit is not None:
+            yield self
+            return
+
+        unit = self._unit = UnitOfWork()
+        committed = False
+        try:
+            yield self
+            self._unit = None
+            if not unit.isEmpty():
+                self._commit(unit)
+            committed = True
+        finally:
+            self._unit = None
+            self.identityMap.settle(unit, self, committed)
+            if unit.locks:
+                self.recordLocks().release(unit.locks)
+            if not committed:
+                for callback in reversed(unit.rollbacks):
+                    callback()
+        for callback in unit.callbacks:
+            callback()
+
+    def inTransaction(self) -> bool:
+        return self._unit is not None
+
+    # func to run something once the changes made so far are committed, right away when there is no transaction
+    def afterCommit(self, callback) -> None:
+        if self._unit is None:
+            callback()
+        else:
+            self._unit.callbacks.append(callback)
+
+    # func to run something if the changes made so far are not committed, without a transaction there is nothing to wait for
+    def afterRollback(self, callback) -> None:
+        if self._unit is not None:
+            self._unit.rollbacks.append(callback)
+
+    def recordLocks(self) -> RecordLocks:
+        if self._recordLocks is None:
+            self._recordLocks = RecordLocks(getattr(self, "root", "."))
+        return self._recordLocks
+
+    # func to lock records while they are read and changed, inside a transaction they stay locked until it is committed
+    @contextmanager
+    def lock(self, records : list, shared : list = ()):
+        locks = self.recordLocks()
+        taken = locks.acquire(records, shared)
+        if self._unit is not None:
+            self._unit.locks.extend(taken)
+            yield self
+            return
+        try:
+            yield self
+        finally:
+            locks.release(taken)
+
+    # a savepoint undoes the changes made inside it to the open unit of work when it raises, the rest of the unit is kept
+    @contextmanager
+    def savepoint(self):
+        if self._unit is None:
+            with self.transaction():
+                yield self
+            return
+
+        state = self._unit.snapshot()
+        try:
+            yield self
+        except BaseException:
+            for callback in reversed(self._unit.restore(state)):
+                callback()
+            # the cached objects may hold changes that were just undone
+            self.identityMap.entries.clear()
+            raise
+
+    def _change(self) -> UnitOfWork:
+        return self._unit if self._unit is not None else UnitOfWork()
+
+    def _flush(self, unit : UnitOfWork) -> None:
+        if unit is not self._unit:
+            self._commit(unit)
+
+    # func to commit a unit of work once the documents it expects are checked, they stay locked until it is written
+    def _commit(self, unit : UnitOfWork) -> None:
+        if not unit.expected:
+            self.commit(unit)
+            return
+
+        with self.lock(list(unit.expected)):
+            for (kind, key), expected in unit.expected.items():
+                stored = self._load(kind, key)
+                found = None if stored is None else stored.get("version", 0)
+                if found != expected:
+                    raise VersionConflict(kind, key, expected, found)
+            self.commit(unit)
+
+    def load(self, kind : str, key : str) -> dict:
+        if self._unit is not None and (kind, key) in self._unit.documents:
+            return copyDocument(self._unit.documents[(kind, key)])
+        return self._load(kind, key)
+
+    # func to save a document, with an expected version it is only written if the stored one still has that version
+    def save(self, kind : str, key : str, data, expected = ANY_VERSION) -> None:
+        unit = self._change()
+        unit.save(kind, key, data, expected)
+        self._flush(unit)
+
+    def delete(self, kind : str, key : str) -> None:
+        unit = self._change()
+        unit.delete(kind, key)
+        self.identityMap.discard(kind, key)
+        self._flush(unit)
+
+    # func to create a document only if it does not exist yet, it is never delayed by a unit of work
+    def reserve(self, kind : str, key : str, data = True) -> bool:
+        if self._unit is not None and (kind, key) in self._unit.documents and self._unit.documents[(kind, key)] is not None:
+            return False
+        return self._reserve(kind, key, data)
+
+    def _reserve(self, kind : str, key : str, data) -> bool:
+        if self._exists(kind, key):
+            return False
+        self.commit(self._single(kind, key, data))
+        return True
+
+    # func to give back a key taken with reserve(), it is committed right away like the reservation
+    def release(self, kind : str, key : str) -> None:
+        self.commit(self._single(kind, key, None))
+
+    def _single(self, kind : str, key : str, data) -> UnitOfWork:
+        unit = UnitOfWork()
+        unit.save(kind, key, data)
+        return unit
+
+    # the version changes every time a document is written, it is None for a missing document
+    def version(self, kind : str, key : str):
+        if self._unit is not None and (kind, key) in self._unit.documents:
+            return IdentityMap.PENDING
+        return self._version(kind, key)
+
+    def exists(self, kind : str, key : str) -> bool:
+        if self._unit is not None and (kind, key) in self._unit.documents:
+            return self._unit.documents[(kind, key)] is not None
+        return self._exists(kind, key)
+
+    def keys(self, kind : str) -> list:
+        keys = self._keys(kind)
+        if self._unit is None:
+            return keys
+
+        pending = {key : data for (pKind, key), data in self._unit.documents.items() if pKind == kind}
+        keys = [key for key in keys if key not in pending]
+        return keys + [key for key, data in pending.items() if data is not None]
+
+    def loadAll(self, kind : str) -> dict:
+        return {key : self.load(kind, key) for key in self.keys(kind)}
+
+    def appendHistory(self, taskID : str, note : str, time : str = None) -> None:
+        unit = self._change()
+        unit.appendHistory(taskID, historyRecord(note, time))
+        self._flush(unit)
+
+    def historySize(self, taskID : str) -> int:
+        if self._unit is not None and taskID in self._unit.history:
+            records = self._pendingHistory(taskID)
+            return None if records is None else len(records)
+        return self._historySize(taskID)
+
+    def readHistory(self, taskID : str, start : int = 0, stop : int = None) -> list:
+        """
+        A function to read the history records of a task from position start up to stop, negative positions count from the end.
+        """
+        if self._unit is not None and taskID in self._unit.history:
+            records = self._pendingHistory(taskID)
+            return None if records is None else records[start:stop]
+
+        size = self._historySize(taskID)
+        if size is None:
+            return None
+        start, stop, _ = slice(start, stop).indices(size)
+        return self._readHistory(taskID, start, stop) if start < stop else []
+
+    def readHistoryPage(self, taskID : str, page : int, pageSize : int = HISTORY_PAGE_SIZE) -> list:
+        return self.readHistory(taskID, page * pageSize, (page + 1) * pageSize)
+
+    def readHistoryBetween(self, taskID : str, since : str = None, until : str = None) -> list:
+        """
+        A function to read the history records of a task stamped between two times ("%Y-%m-%d %H:%M:%S"), both included.
+        """
+        if self._unit is not None and taskID in self._unit.history:
+            records = self._pendingHistory(taskID)
+            return None if records is None else [record for record in records if inTimeRange(record, since, until)]
+        return self._readHistoryBetween(taskID, since, until)
+
+    # func to read the history of a task as the open unit of work would leave it
+    def _pendingHistory(self, taskID : str) -> list:
+        mode, records = self._unit.history[taskID]
+        if mode == "delete":
+            return None
+        if mode == "clear":
+            return list(records)
+        size = self._historySize(taskID)
+        return (self._readHistory(taskID, 0, size) if size else []) + records
+
+    def clearHistory(self, taskID : str) -> None:
+        unit = self._change()
+        unit.clearHistory(taskID)
+        self._flush(unit)
+
+    def deleteHistory(self, taskID : str) -> None:
+        unit = self._change()
+        unit.deleteHistory(taskID)
+        self._flush(unit)
+
+    # func to get the IDs of the tasks that have a stored history, the changes of an open unit of work are not included
+    def historyKeys(self) -> list:
+        return self._historyKeys()
+
+    def _load(self, kind : str, key : str) -> dict:
+        raise NotImplementedError
+
+    def _exists(self, kind : str, key : str) -> bool:
+        return self._load(kind, key) is not None
+
+    def _keys(self, kind : str) -> list:
+        raise NotImplementedError
+
+    def _version(self, kind : str, key : str):
+        raise NotImplementedError
+
+    def _historySize(self, taskID : str) -> int:
+        raise NotImplementedError
+
+    def _historyKeys(self) -> list:
+        raise NotImplementedError
+
+    def _readHistory(self, taskID : str, start : int, stop : int) -> list:
+        raise NotImplementedError
+
+    def _readHistoryBetween(self, taskID : str, since : str, until : str) -> list:
+        size = self._historySize(taskID)
+        if size is None:
+            return None
+        return [record for record in self._readHistory(taskID, 0, size) if inTimeRange(record, since, until)]
+
+    def commit(self, unit : UnitOfWork) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class ProjectIDRegistry:
+    """
+    A class to keep the taken project IDs in an append-only file with an in-memory set in front of it.
+
+    The set only has to catch up with the lines other processes appended since the last read. A reservation checks
+    and appends under an exclusive lock on the file, so two processes cannot take the same ID. An ID whose project
+    was never committed is given back with a line that has RELEASED before the ID. The IDs of the old projectsID.json
+    file are still honoured.
+    """
+    # a project ID read from a prompt cannot hold a NUL, so a line that starts with one is a release
+    RELEASED = "\0"
+
+    def __init__(self, root : str = "."):
+        self.path = os.path.join(root, "projectsID.log")
+        self.ids = set()
+        self.offset = 0
+
+        try:
+            with open(os.path.join(root, "projectsID.json"), 'r') as file:
+                self.ids.update(json.load(file))
+        except FileNotFoundError:
+            pass
+
+    # func to read the IDs appended since the last read
+    def _catchUp(self) -> None:
+        try:
+            if os.path.getsize(self.path) == self.offset:
+                return
+        except FileNotFoundError:
+            return
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                entry = line[:-1].decode()
+                if entry.startswith(self.RELEASED):
+                    self.ids.discard(entry[len(self.RELEASED):])
+                else:
+                    self.ids.add(entry)
+                self.offset += len(line)
+
+    # func to check an ID, the lines appended since the last read may have taken or given it back
+    def contains(self, projectID : str) -> bool:
+        self._catchUp()
+        return projectID in self.ids
+
+    def reserve(self, projectID : str) -> bool:
+        with open(self.path, 'ab') as file:
+            with lockFile(file):
+                self._catchUp()
+                if projectID in self.ids:
+                    return False
+                self._append(file, projectID)
+                self.ids.add(projectID)
+        return True
+
+    def release(self, projectID : str) -> None:
+        with open(self.path, 'ab') as file:
+            with lockFile(file):
+                self._catchUp()
+                if projectID not in self.ids:
+                    return
+                self._append(file, self.RELEASED + projectID)
+                self.ids.discard(projectID)
+
+    # func to append a line to the locked file, a line torn by a crash is dropped before anything is appended after it
+    def _append(self, file, entry : str) -> None:
+        if os.path.getsize(self.path) != self.offset:
+            file.truncate(self.offset)
+        file.write(entry.encode() + b"\n")
+        file.flush()
+        os.fsync(file.fileno())
+        self.offset += len(entry.encode()) + 1
+
+    def keys(self) -> list:
+        self._catchUp()
+        return list(self.ids)
+
+
+class JsonStorage(Storage):
+    """
+    A class to keep the documents in the original layout of json files.
+
+    Users, projects and tasks get one file each in their folder and any other kind of document is kept the same way
+    in a folder named after the kind. The kinds in SHARDED_KINDS are spread over levels of SHARDS subfolders by a hash
+    of their key, so no folder grows past a few thousand entries: accounts/<xx>/<user>.json, users/<xx>/<xx>/<user>.json
+    and tasks/<xx>/<xx>/<taskID>.json. The project IDs are kept by a ProjectIDRegistry.
+
+    The history of a task is kept in tasks/History/<xx>/<xx>/<taskID> as json lines split into segments of at most
+    HISTORY_SEGMENT_BYTES, with an index that keeps the position of the first record and the time range of every
+    segment. A page or a time range of the history only reads the segments it falls in.
+
+    Users, tasks and histories used to be kept flat in their folder. As long as some are left there they are still
+    found, and migrateLayout() moves them to their shards while the app is in use.
+    """
+    DOC_DIRS = {"users" : "users", "projects" : "projects", "tasks" : "tasks"}
+    # kind -> the number of levels of subfolders its documents are spread over
+    SHARDED_KINDS = {"accounts" : 1, "users" : 2, "tasks" : 2, "assignments" : 1}
+    HISTORY_SHARD_LEVELS = 2
+    SHARDS = 256
+    # the accounts used to be kept together in this file, it is split into shards the first time the storage is opened
+    LEGACY_ACCOUNTS = "users.json"
+    HISTORY_SEGMENT_BYTES = 64 * 1024
+    parallelReads = True
+
+    def __init__(self, root : str = ".", codec : Codec = None):
+        super().__init__()
+        self.root = root
+        self.codec = codec or getCodec()
+        self.projectIDs = ProjectIDRegistry(root)
+        # area -> whether records from before the sharded layout are left in it, found the first time it is needed
+        self.flat = {}
+        self.recover()
+        self.migrateAccounts()
+
+    def _path(self, kind : str, key : str) -> str:
+        if kind in self.SHARDED_KINDS:
+            return os.path.join(self.root, self.DOC_DIRS.get(kind, kind), *self._shards(key, self.SHARDED_KINDS[kind]), key + ".json")
+        return os.path.join(self.root, self.DOC_DIRS.get(kind, kind), key + ".json")
+
+    def _flatPath(self, kind : str, key : str) -> str:
+        return os.path.join(self.root, self.DOC_DIRS.get(kind, kind), key + ".json")
+
+    # func to get the subfolders of a key, every level takes the next byte of its hash
+    def _shards(self, key : str, levels : int) -> list:
+        digest = int(hashlib.md5(key.encode()).hexdigest()[:8], 16)
+        return ["%02x" % ((digest >> (8 * level)) % self.SHARDS) for level in range(levels)]
+
+    def _isShard(self, name : str) -> bool:
+        return len(name) == 2 and all(char in "0123456789abcdef" for char in name)
+
+    # func to go through the records left flat in an area ("users", "tasks" or "history") as (key, path) pairs
+    def _flatEntries(self, area : str):
+        folder = os.path.join(self.root, "tasks", "History") if area == "history" else os.path.join(self.root, self.DOC_DIRS[area])
+        if not os.path.isdir(folder):
+            return
+        for entry in os.scandir(folder):
+            if area == "history":
+                if entry.is_dir() and not self._isShard(entry.name):
+                    yield entry.name, entry.path
+            elif entry.is_file() and entry.name.endswith(".json"):
+                yield entry.name[:-5], entry.path
+
+    def _hasFlat(self, area : str) -> bool:
+        if area not in self.flat:
+            self.flat[area] = next(self._flatEntries(area), None) is not None
+        return self.flat[area]
+
+    # func to get the paths a document may be at, a flat one is moved by migrateLayout() with a rename, so the
+    # sharded path is tried again after it
+    def _candidates(self, kind : str, key : str) -> list:
+        path = self._path(kind, key)
+        if kind in self.DOC_DIRS and kind in self.SHARDED_KINDS and self._hasFlat(kind):
+            return [path, self._flatPath(kind, key), path]
+        return [path]
+
+    def _legacyHistoryPath(self, taskID : str) -> str:
+        return os.path.join(self.root, "tasks", "History", "history-" + taskID + ".txt")
+
+    def _shardedHistoryFolder(self, taskID : str) -> str:
+        return os.path.join(self.root, "tasks", "History", *self._shards(taskID, self.HISTORY_SHARD_LEVELS), taskID)
+
+    # func to find the folder of the history of a task, it may still be flat in tasks/History/<taskID>
+    def _historyFolder(self, taskID : str) -> str:
+        folder = self._shardedHistoryFolder(taskID)
+        if self._hasFlat("history") and not os.path.isdir(folder):
+            flat = os.path.join(self.root, "tasks", "History", taskID)
+            if os.path.isdir(flat):
+                return flat
+        return folder
+
+    def _historyIndexPath(self, folder : str) -> str:
+        return os.path.join(folder, "index.json")
+
+    def _historySegmentPath(self, folder : str, number : int) -> str:
+        return os.path.join(folder, f"segment-{number:06d}.jsonl")
+
+    def migrateAccounts(self) -> int:
+        """
+        A function to move the accounts of the old users.json registry to their shards in a single commit.
+        """
+        legacyPath = os.path.join(self.root, self.LEGACY_ACCOUNTS)
+        try:
+            with open(legacyPath, 'rb') as jsonFile:
+                accounts = decodeDocument("accounts", jsonFile.read())
+        except FileNotFoundError:
+            return 0
+
+        # users.json stays the source of truth until every shard is on disk, so an interrupted migration is simply run again
+        for username, account in accounts.items():
+            path = self._path("accounts", username)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", 'wb') as jsonFile:
+                jsonFile.write(self.codec.encode("accounts", account))
+            os.replace(path + ".tmp", path)
+
+        # one sync for the whole registry instead of one fsync per account
+        if hasattr(os, "sync"):
+            os.sync()
+        else:
+            for username in accounts:
+                with open(self._path("accounts", username), 'r+b') as jsonFile:
+                    os.fsync(jsonFile.fileno())
+        os.remove(legacyPath)
+        fsyncDir(self.root)
+        return len(accounts)
+
+    def migrateLayout(self) -> dict:
+        """
+        A function to move the users, tasks and histories left flat in their folders to their shards.
+
+        Every record is moved with a rename while it is locked, so the app can keep running: until the rename it is
+        read from its flat path and after it from its shard. The old text histories are turned into segments. The
+        folders are scanned again until a pass finds nothing left to move.
+        """
+        counts = {"users" : 0, "tasks" : 0, "history" : 0}
+        moved = True
+        while moved:
+            moved = False
+            for area, kind in [("users", "users"), ("tasks", "tasks"), ("history", "tasks")]:
+                for key, flatPath in list(self._flatEntries(area)):
+                    target = self._shardedHistoryFolder(key) if area == "history" else self._path(kind, key)
+                    with self.lock([(kind, key)]):
+                        if not os.path.exists(flatPath):
+                            continue
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        if os.path.exists(target):
+                            # the record was written to its shard since it was left here
+                            shutil.rmtree(flatPath) if area == "history" else os.remove(flatPath)
+                        else:
+                            os.rename(flatPath, target)
+                    counts[area] += 1
+                    moved = True
+
+            for legacyPath in glob.glob(os.path.join(self.root, "tasks", "History", "history-*.txt")):
+                taskID = os.path.basename(legacyPath)[len("history-"):-len(".txt")]
+                unit = UnitOfWork()
+                unit.history[taskID] = ["append", []]
+                with self.lock([("tasks", taskID)]):
+                    self.commit(unit)
+                counts["history"] += 1
+                moved = True
+
+        if hasattr(os, "sync"):
+            os.sync()
+        for folder in ["users", "tasks", os.path.join("tasks", "History")]:
+            if os.path.isdir(os.path.join(self.root, folder)):
+                fsyncDir(os.path.join(self.root, folder))
+        self.flat = {}
+        return counts
+
+    def _load(self, kind : str, key : str) -> dict:
+        if kind == "projectIDs":
+            return True if self.projectIDs.contains(key) else None
+        for path in self._candidates(kind, key):
+            try:
+                with open(path, 'rb') as jsonFile:
+                    return decodeDocument(kind, jsonFile.read())
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _exists(self, kind : str, key : str) -> bool:
+        if kind == "projectIDs":
+            return self.projectIDs.contains(key)
+        return any(os.path.exists(path) for path in self._candidates(kind, key))
+
+    def _reserve(self, kind : str, key : str, data) -> bool:
+        if kind == "projectIDs":
+            return self.projectIDs.reserve(key)
+        if len(self._candidates(kind, key)) > 1 and os.path.exists(self._flatPath(kind, key)):
+            return False
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'wb') as jsonFile:
+            jsonFile.write(self.codec.encode(kind, data))
+        return True
+
+    def _version(self, kind : str, key : str):
+        if kind == "projectIDs":
+            return 1 if self.projectIDs.contains(key) else None
+        for path in self._candidates(kind, key):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return (stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def _keys(self, kind : str) -> list:
+        if kind == "projectIDs":
+            return self.projectIDs.keys()
+        folder = os.path.join(self.root, self.DOC_DIRS.get(kind, kind))
+        if not os.path.isdir(folder):
+            return []
+        folders = [folder]
+        for _ in range(self.SHARDED_KINDS.get(kind, 0)):
+            folders = [entry.path for folder in folders for entry in os.scandir(folder) if entry.is_dir() and self._isShard(entry.name)]
+        keys = [entry.name[:-5] for folder in folders for entry in os.scandir(folder) if entry.is_file() and entry.name.endswith(".json")]
+        if kind in self.DOC_DIRS and kind in self.SHARDED_KINDS and self._hasFlat(kind):
+            # a document that is being moved can be seen in both places
+            keys = list(dict.fromkeys(keys + [key for key, path in self._flatEntries(kind)]))
+        return keys
+
+    # func to read the index of the history of a task, with the folder it was read from
+    def _historyIndex(self, taskID : str) -> tuple:
+        folder = self._historyFolder(taskID)
+        sharded = self._shardedHistoryFolder(taskID)
+        # a flat history may have been moved to its shard by migrateLayout() since its folder was found
+        for path in [folder] if folder == sharded else [folder, sharded]:
+            try:
+                with open(self._historyIndexPath(path), 'rb') as file:
+                    return path, json.loads(file.read())
+            except FileNotFoundError:
+                continue
+        return sharded, None
+
+    # func to read the history kept as a text file before segments existed, it is turned into segments on the next write
+    def _readLegacyHistory(self, taskID : str) -> list:
+        try:
+            with open(self._legacyHistoryPath(taskID), "r") as file:
+                return [asHistoryRecord(line.rstrip("\n")) for line in file]
+        except FileNotFoundError:
+            return None
+
+    # func to read the records of one segment, the index tells how many of its lines are committed
+    def _readHistorySegment(self, taskID : str, folder : str, number : int, segment : dict, start : int = 0, stop : int = None) -> list:
+        try:
+            file = open(self._historySegmentPath(folder, number), 'rb')
+        except FileNotFoundError:
+            # the folder was moved to its shard after its index was read
+            file = open(self._historySegmentPath(self._shardedHistoryFolder(taskID), number), 'rb')
+        with file:
+            lines = file.read().splitlines()[:segment["count"]]
+        return [json.loads(line) for line in lines[start:stop]]
+
+    def _historyKeys(self) -> list:
+        root = os.path.join(self.root, "tasks", "History")
+        if not os.path.isdir(root):
+            return []
+        shards = [root]
+        for _ in range(self.HISTORY_SHARD_LEVELS):
+            shards = [entry.path for shard in shards for entry in os.scandir(shard) if entry.is_dir() and self._isShard(entry.name)]
+        folders = [entry.path for shard in shards for entry in os.scandir(shard) if entry.is_dir()]
+        if self._hasFlat("history"):
+            folders += [path for taskID, path in self._flatEntries("history")]
+        # the folder of a deleted history is left behind empty
+        keys = [os.path.basename(folder) for folder in folders if os.path.exists(self._historyIndexPath(folder))]
+        keys += [os.path.basename(path)[len("history-"):-len(".txt")] for path in glob.glob(os.path.join(root, "history-*.txt"))]
+        return list(dict.fromkeys(keys))
+
+    def _historySize(self, taskID : str) -> int:
+        folder, index = self._historyIndex(taskID)
+        if index is None:
+            legacy = self._readLegacyHistory(taskID)
+            return None if legacy is None else len(legacy)
+        segments = index["segments"]
+        return segments[-1]["first"] + segments[-1]["count"] if segments else 0
+
+    def _readHistory(self, taskID : str, start : int, stop : int) -> list:
+        folder, index = self._historyIndex(taskID)
+        if index is None:
+            return (self._readLegacyHistory(taskID) or [])[start:stop]
+
+        records = []
+        for number, segment in enumerate(index["segments"]):
+            first = segment["first"]
+            if first + segment["count"] <= start or first >= stop:
+                continue
+            records.extend(self._readHistorySegment(taskID, folder, number, segment, max(start - first, 0), stop - first))
+        return records
+
+    def _readHistoryBetween(self, taskID : str, since : str, until : str) -> list:
+        folder, index = self._historyIndex(taskID)
+        if index is None:
+            return super()._readHistoryBetween(taskID, since, until)
+
+        records = []
+        for number, segment in enumerate(index["segments"]):
+            if (since is not None and segment["until"] < since) or (until is not None and segment["since"] > until):
+                continue
+            records.extend(record for record in self._readHistorySegment(taskID, folder, number, segment) if inTimeRange(record, since, until))
+        return records
+
+    # func to turn a unit of work into the files that have to be written, deleted or appended to
+    def commit(self, unit : UnitOfWork) -> None:
+        files = {}
+        appends = []
+
+        for (kind, key), data in unit.documents.items():
+            if kind == "projectIDs":
+                if data is None:
+                    self.projectIDs.release(key)
+                else:
+                    self.projectIDs.reserve(key)
+            else:
+                files[self._path(kind, key)] = None if data is None else self.codec.encode(kind, data)
+                flatPath = self._flatPath(kind, key)
+                if kind in self.DOC_DIRS and kind in self.SHARDED_KINDS and self._hasFlat(kind) and os.path.exists(flatPath):
+                    files[flatPath] = None
+
+        for taskID, (mode, records) in unit.history.items():
+            self._commitHistory(taskID, mode, records, files, appends)
+
+        self._groupCommit(files, appends)
+
+    # func to turn the history changes of a task into segments to write or append to and a new index
+    def _commitHistory(self, taskID : str, mode : str, records : list, files : dict, appends : list) -> None:
+        folder, index = self._historyIndex(taskID)
+        sharded = self._shardedHistoryFolder(taskID)
+        indexPath = self._historyIndexPath(sharded)
+
+        legacyPath = self._legacyHistoryPath(taskID)
+        if os.path.exists(legacyPath):
+            if mode == "append" and index is None:
+                records = self._readLegacyHistory(taskID) + records
+            files[legacyPath] = None
+
+        # a history still in the flat layout is written again into its shard
+        moved = index is not None and folder != sharded
+        if moved:
+            if mode == "append":
+                records = self._readHistory(taskID, 0, self._historySize(taskID)) + records
+            for number in range(len(index["segments"])):
+                files[self._historySegmentPath(folder, number)] = None
+            files[self._historyIndexPath(folder)] = None
+            index = None
+
+        if index is not None and mode != "append":
+            for number in range(len(index["segments"])):
+                files[self._historySegmentPath(sharded, number)] = None
+            files[indexPath] = None
+            index = None
+        if mode == "delete":
+            return
+
+        if index is None:
+            index = {"segments" : []}
+        segments = index["segments"]
+        texts = {}
+        for record in records:
+            line = json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n"
+            size = len(line.encode())
+            if not segments or (segments[-1]["count"] and segments[-1]["bytes"] + size > self.HISTORY_SEGMENT_BYTES):
+                first = segments[-1]["first"] + segments[-1]["count"] if segments else 0
+                segments.append({"first" : first, "count" : 0, "bytes" : 0, "since" : record["time"], "until" : record["time"]})
+            segment = segments[-1]
+            segment["count"] += 1
+            segment["bytes"] += size
+            segment["since"] = min(segment["since"], record["time"])
+            segment["until"] = max(segment["until"], record["time"])
+            texts[len(segments) - 1] = texts.get(len(segments) - 1, "") + line
+
+        for number, text in texts.items():
+            path = self._historySegmentPath(sharded, number)
+            # a segment that is deleted or moved by this commit is written again from scratch
+            if path in files or moved:
+                files[path] = text.encode()
+            else:
+                appends.append([path, text])
+        files[indexPath] = json.dumps(index, separators=(',', ':')).encode()
+
+    def _groupCommit(self, files : dict, appends : list) -> None:
+        """
+        A function to write a set of files so that either all of them or none of them survive a crash.
+
+        A commit with more than one effect first makes a journal of the new contents, the deletes and the appends
+        durable, with one fsync of the journal and one of the root folder. The files are then written in place
+        without an fsync of their own, since the journal could write them again, and one sync makes them and their
+        folders durable before the journal is removed. If the process dies after the journal was written, recover()
+        applies it again the next time the storage is opened. A commit with a single effect needs no journal.
+        """
+        journal = {"writes" : [], "deletes" : [], "appends" : []}
+
+        for path, content in files.items():
+            if content is None:
+                # a record that was never written has nothing to delete
+                if os.path.exists(path):
+                    journal["deletes"].append(path)
+                continue
+            journal["writes"].append([path, base64.b64encode(content).decode("ascii")])
+
+        for path, text in appends:
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            journal["appends"].append([path, size, text])
+
+        effects = len(journal["writes"]) + len(journal["deletes"]) + len(journal["appends"])
+        if effects <= 1:
+            self._applyJournal(journal, recovering=False, journaled=False)
+            return
+
+        journalPath = os.path.join(self.root, f"journal-{os.getpid()}-{threading.get_ident()}.json")
+        journalFile = open(journalPath + ".tmp", 'w')
+        # the journal stays locked until it is removed, so recover() in another process leaves it alone
+        if fcntl is not None:
+            fcntl.flock(journalFile, fcntl.LOCK_EX)
+        json.dump(journal, journalFile)
+        journalFile.flush()
+        os.fsync(journalFile.fileno())
+        os.replace(journalPath + ".tmp", journalPath)
+        fsyncDir(self.root)
+
+        try:
+            self._applyJournal(journal, recovering=False)
+            os.remove(journalPath)
+        finally:
+            journalFile.close()
+
+    # func to apply the effects of a commit, without a journal behind them each one is made durable before it is done
+    def _applyJournal(self, journal : dict, recovering : bool, journaled : bool = True) -> None:
+        folders = set()
+        changed = []
+
+        # a journal left by an earlier version renames files that were made durable before it
+        for tmpPath, path in journal.get("renames", []):
+            if os.path.exists(tmpPath):
+                os.replace(tmpPath, path)
+            folders.add(os.path.dirname(path))
+
+        for path, content in journal.get("writes", []):
+            tmpPath = f"{path}.{os.getpid()}.tmp"
+            try:
+                file = open(tmpPath, 'wb')
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(tmpPath), exist_ok=True)
+                file = open(tmpPath, 'wb')
+            with file:
+                file.write(base64.b64decode(content))
+                if not journaled:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(tmpPath, path)
+            changed.append(path)
+            folders.add(os.path.dirname(path))
+
+        for path in journal["deletes"]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # the record was never written or the delete was already replayed, its folder may not even exist
+                continue
+            folders.add(os.path.dirname(path))
+
+        for path, size, text in journal["appends"]:
+            with open(path, "a") as file:
+                # a replayed append first drops whatever part of it reached the disk before the crash
+                if recovering:
+                    file.truncate(size)
+                file.write(text)
+                file.flush()
+                if not journaled:
+                    os.fsync(file.fileno())
+            changed.append(path)
+            folders.add(os.path.dirname(path))
+
+        if journaled:
+            # one sync covers every file and folder of the commit instead of an fsync of each
+            if hasattr(os, "sync"):
+                os.sync()
+                return
+            for path in changed:
+                with open(path, 'ab') as file:
+                    os.fsync(file.fileno())
+        for folder in folders:
+            if os.path.isdir(folder):
+                fsyncDir(folder)
+
+    # func to finish the commits that were interrupted by a crash
+    def recover(self) -> None:
+        for journalPath in glob.glob(os.path.join(self.root, "journal-*.json")):
+            try:
+                file = open(journalPath, 'r')
+            except FileNotFoundError:
+                continue
+            with file:
+                if fcntl is not None:
+                    # a locked journal belongs to a commit that is still going on
+                    try:
+                        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    # a journal that was removed while this process waited for it was finished by its commit
+                    if os.fstat(file.fileno()).st_nlink == 0:
+                        continue
+                journal = json.load(file)
+                self._applyJournal(journal, recovering=True)
+                os.remove(journalPath)
+
+
+class SqliteStorage(Storage):
+    """
+    A class to keep the documents in an embedded sqlite database.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            data TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, key)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS meta (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            taskID TEXT NOT NULL,
+            note TEXT NOT NULL,
+            time TEXT NOT NULL DEFAULT ''
+        );
+
+        CREATE INDEX IF NOT EXISTS history_task ON history (taskID, id);
+    """
+
+    def __init__(self, root : str = ".", filename : str = "trellomize.db", codec : Codec = None):
+        super().__init__()
+        self.root = root
+        self.codec = codec or getCodec()
+        self.connection = sqlite3.connect(os.path.join(root, filename))
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(documents)")]
+        if "version" not in columns:
+            self.connection.execute("ALTER TABLE documents ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+        # the notes written before history records existed carry their time as a "[time] : " prefix
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(history)")]
+        if "time" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE history ADD COLUMN time TEXT NOT NULL DEFAULT ''")
+                rows = self.connection.execute("SELECT id, note FROM history").fetchall()
+                records = [(asHistoryRecord(note), rowID) for rowID, note in rows]
+                self.connection.executemany("UPDATE history SET time = ?, note = ? WHERE id = ?", [(record["time"], record["note"], rowID) for record, rowID in records])
+        self.connection.execute("CREATE INDEX IF NOT EXISTS history_time ON history (taskID, time)")
+
+    def _load(self, kind : str, key : str) -> dict:
+        row = self.connection.execute("SELECT data FROM documents WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        if row is None:
+            return None
+        return decodeDocument(kind, row[0])
+
+    def _exists(self, kind : str, key : str) -> bool:
+        row = self.connection.execute("SELECT 1 FROM documents WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return row is not None
+
+    def _keys(self, kind : str) -> list:
+        return [row[0] for row in self.connection.execute("SELECT key FROM documents WHERE kind = ?", (kind,))]
+
+    def _version(self, kind : str, key : str):
+        row = self.connection.execute("SELECT version FROM documents WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return None if row is None else row[0]
+
+    def _reserve(self, kind : str, key : str, data) -> bool:
+        try:
+            with self.connection:
+                self.connection.execute("INSERT INTO documents (kind, key, data) VALUES (?, ?, ?)", (kind, key, self.codec.encode(kind, data)))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def loadAll(self, kind : str) -> dict:
+        if self._unit is not None:
+            return super().loadAll(kind)
+        return {key : decodeDocument(kind, data) for key, data in self.connection.execute("SELECT key, data FROM documents WHERE kind = ?", (kind,))}
+
+    def _historyKeys(self) -> list:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT taskID FROM history")]
+
+    def _historySize(self, taskID : str) -> int:
+        size = self.connection.execute("SELECT COUNT(*) FROM history WHERE taskID = ?", (taskID,)).fetchone()[0]
+        if not size and not self.exists("tasks", taskID):
+            return None
+        return size
+
+    def _readHistory(self, taskID : str, start : int, stop : int) -> list:
+        rows = self.connection.execute("SELECT time, note FROM history WHERE taskID = ? ORDER BY id LIMIT ? OFFSET ?", (taskID, stop - start, start))
+        return [{"time" : time, "note" : note} for time, note in rows]
+
+    def _readHistoryBetween(self, taskID : str, since : str, until : str) -> list:
+        if self._historySize(taskID) is None:
+            return None
+        rows = self.connection.execute("SELECT time, note FROM history WHERE taskID = ? AND time >= ? AND time <= ? ORDER BY id",
+                                       (taskID, since or "", until or "\uffff"))
+        return [{"time" : time, "note" : note} for time, note in rows]
+
+    def commit(self, unit : UnitOfWork) -> None:
+        with self.connection:
+            # every commit gets the next number of a counter that never goes back, it is the version of what it writes
+            self.connection.execute("INSERT INTO meta (name, value) VALUES ('commits', 1) ON CONFLICT(name) DO UPDATE SET value = value + 1")
+            commitNumber = self.connection.execute("SELECT value FROM meta WHERE name = 'commits'").fetchone()[0]
+
+            for (kind, key), data in unit.documents.items():
+                if data is None:
+                    self.connection.execute("DELETE FROM documents WHERE kind = ? AND key = ?", (kind, key))
+                else:
+                    self.connection.execute("INSERT OR REPLACE INTO documents (kind, key, data, version) VALUES (?, ?, ?, ?)", (kind, key, self.codec.encode(kind, data), commitNumber))
+
+            for taskID, (mode, records) in unit.history.items():
+                if mode != "append":
+                    self.connection.execute("DELETE FROM history WHERE taskID = ?", (taskID,))
+                self.connection.executemany("INSERT INTO history (taskID, time, note) VALUES (?, ?, ?)", [(taskID, record["time"], record["note"]) for record in records])
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class LogStorage(Storage):
+    """
+    A class to keep the documents as an append-only log of changes with snapshots.
+
+    Every commit is appended to the current log segment as one line, so a write costs the size of the change and not
+    the size of the data. The whole state is kept in memory and rebuilt at start-up from the last snapshot plus the
+    segments written after it. compact() writes a new snapshot, drops the old segments and rewrites the json
+    documents (the original layout) that changed since the previous compaction.
+
+    A log opened for the first time on a folder that already holds json documents starts from those documents, so
+    they are neither hidden nor overwritten by the first compaction.
+    """
+    COMPACT_AFTER_BYTES = 4 * 1024 * 1024
+    # the kinds of documents read from the json documents when the log is opened for the first time
+    IMPORTED_KINDS = ["accounts", "users", "projects", "tasks", "assignments", "emails", "projectIDs", "gc"]
+
+    def __init__(self, root : str = ".", materialize : bool = True):
+        super().__init__()
+        self.root = root
+        self.folder = os.path.join(root, "wal")
+        self.materialize = materialize
+        self.documents = {}
+        self.history = {}
+        self.versions = {}
+        self.commits = 0
+        self._dirty = UnitOfWork()
+        self._lock = threading.Lock()
+        self._compactLock = threading.Lock()
+        self._reserveLock = threading.Lock()
+        self._compacting = None
+
+        os.makedirs(self.folder, exist_ok=True)
+        self._lockFile = open(os.path.join(self.folder, "LOCK"), 'w')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lockFile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RuntimeError(f"The log in '{self.folder}' is already opened by another process.")
+
+        if not os.path.exists(self._snapshotPath()):
+            self._importJson()
+        self.segment = self._loadSnapshot()
+        for number in self._segments():
+            if number >= self.segment:
+                self._replay(number)
+                self.segment = number
+        self._logFile = open(self._segmentPath(self.segment), 'a')
+        self._appended = self._logFile.tell()
+
+    def _segmentPath(self, number : int) -> str:
+        return os.path.join(self.folder, f"segment-{number:06d}.log")
+
+    def _snapshotPath(self) -> str:
+        return os.path.join(self.folder, "snapshot.json")
+
+    def _segments(self) -> list:
+        return sorted(int(name[8:14]) for name in os.listdir(self.folder) if name.startswith("segment-") and name.endswith(".log"))
+
+    # func to take the json documents and histories already in the folder as the state the segments start from
+    def _importJson(self) -> None:
+        source = JsonStorage(self.root)
+        for kind in self.IMPORTED_KINDS:
+            documents = source.loadAll(kind)
+            if documents:
+                self.documents[kind] = documents
+        for taskID in source.historyKeys():
+            records = source.readHistory(taskID)
+            if records is not None:
+                self.history[taskID] = records
+
+        # the segments written before the first snapshot were made on top of the json documents
+        self._writeSnapshot(json.dumps({"segment" : 1, "documents" : self.documents, "history" : self.history,
+                                        "commits" : 0, "versions" : {}}, separators=(',', ':')))
+
+    def _writeSnapshot(self, snapshot : str) -> None:
+        snapshotPath = self._snapshotPath()
+        with open(snapshotPath + ".tmp", 'w') as file:
+            file.write(snapshot)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(snapshotPath + ".tmp", snapshotPath)
+        fsyncDir(self.folder)
+
+    def _loadSnapshot(self) -> int:
+        try:
+            with open(self._snapshotPath(), 'r') as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            return 1
+
+        self.documents = snapshot["documents"]
+        self.history = {taskID : [asHistoryRecord(entry) for entry in entries] for taskID, entries in snapshot["history"].items()}
+        # the versions go on from where they were, so a document changed after a restart never gets a version it had before
+        self.commits = snapshot.get("commits", 0)
+        self.versions = {(kind, key) : version for kind, versions in snapshot.get("versions", {}).items() for key, version in versions.items()}
+        return snapshot["segment"]
+
+    # func to apply the commits of a segment, a torn last line left by a crash is cut off
+    def _replay(self, number : int) -> None:
+        path = self._segmentPath(number)
+        goodSize = 0
+        with open(path, 'rb') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record["changes"])
+                goodSize += len(line)
+
+        if goodSize != os.path.getsize(path):
+            with open(path, 'r+b') as file:
+                file.truncate(goodSize)
+
+    # func to apply changes to the state and remember them for the next materialization
+    def _apply(self, changes : list) -> None:
+        self.commits += 1
+        for change in changes:
+            if change["op"] == "history":
+                self._dirty.history[change["taskID"]] = None
+            else:
+                self._dirty.documents[(change["kind"], change["key"])] = change.get("data")
+
+            if change["op"] == "save":
+                self.documents.setdefault(change["kind"], {})[change["key"]] = change["data"]
+                self.versions[(change["kind"], change["key"])] = self.commits
+            elif change["op"] == "delete":
+                self.documents.get(change["kind"], {}).pop(change["key"], None)
+                self.versions.pop((change["kind"], change["key"]), None)
+            elif change["mode"] == "append":
+                self.history.setdefault(change["taskID"], []).extend(asHistoryRecord(entry) for entry in change["notes"])
+            elif change["mode"] == "clear":
+                self.history[change["taskID"]] = [asHistoryRecord(entry) for entry in change["notes"]]
+            else:
+                self.history.pop(change["taskID"], None)
+
+    def _load(self, kind : str, key : str) -> dict:
+        data = self.documents.get(kind, {}).get(key)
+        return copyDocument(data)
+
+    def _exists(self, kind : str, key : str) -> bool:
+        return key in self.documents.get(kind, {})
+
+    def _keys(self, kind : str) -> list:
+        return list(self.documents.get(kind, {}))
+
+    def _reserve(self, kind : str, key : str, data) -> bool:
+        with self._reserveLock:
+            return super()._reserve(kind, key, data)
+
+    def _version(self, kind : str, key : str):
+        if key not in self.documents.get(kind, {}):
+            return None
+        return self.versions.get((kind, key), 0)
+
+    def _historySize(self, taskID : str) -> int:
+        records = self.history.get(taskID)
+        return None if records is None else len(records)
+
+    def _historyKeys(self) -> list:
+        return list(self.history)
+
+    def _readHistory(self, taskID : str, start : int, stop : int) -> list:
+        return copyDocument(self.history[taskID][start:stop])
+
+    # func to find the records of a time range with a binary search, the records of a task are kept in time order
+    def _readHistoryBetween(self, taskID : str, since : str, until : str) -> list:
+        records = self.history.get(taskID)
+        if records is None:
+            return None
+        start = 0 if since is None else bisect.bisect_left(records, since, key=lambda record: record["time"])
+        stop = len(records) if until is None else bisect.bisect_right(records, until, key=lambda record: record["time"])
+        return copyDocument(records[start:stop])
+
+    def commit(self, unit : UnitOfWork) -> None:
+        changes = []
+        for (kind, key), data in unit.documents.items():
+            if data is None:
+                changes.append({"op" : "delete", "kind" : kind, "key" : key})
+            else:
+                changes.append({"op" : "save", "kind" : kind, "key" : key, "data" : data})
+        for taskID, (mode, records) in unit.history.items():
+            changes.append({"op" : "history", "mode" : mode, "taskID" : taskID, "notes" : records})
+
+        line = json.dumps({"changes" : changes}, separators=(',', ':')) + "\n"
+        with self._lock:
+            self._logFile.write(line)
+            self._logFile.flush()
+            os.fsync(self._logFile.fileno())
+            self._appended += len(line)
+            self._apply(copyDocument(changes))
+
+            if self._appended >= self.COMPACT_AFTER_BYTES and self._compacting is None:
+                self._compacting = threading.Thread(target=self.compact, daemon=True)
+                self._compacting.start()
+
+    def compact(self) -> dict:
+        """
+        A function to write a snapshot of the state and drop the log segments it covers.
+        """
+        with self._compactLock:
+            try:
+                return self._compact()
+            finally:
+                self._compacting = None
+
+    def _compact(self) -> dict:
+        with self._lock:
+            oldSegment = self.segment
+            self.segment += 1
+            self._logFile.close()
+            self._logFile = open(self._segmentPath(self.segment), 'a')
+            self._appended = 0
+
+            # only the containers are copied while commits wait, the documents and records in them are replaced and
+            # never changed in place, so they are serialized once the lock is released
+            documents = {kind : dict(keys) for kind, keys in self.documents.items()}
+            history = {taskID : list(records) for taskID, records in self.history.items()}
+            currentVersions = dict(self.versions)
+            commits = self.commits
+            segment = self.segment
+            dirty = self._dirty
+            for taskID in dirty.history:
+                dirty.history[taskID] = ["clear", history[taskID]] if taskID in history else ["delete", []]
+            self._dirty = UnitOfWork()
+
+        versions = {}
+        for (kind, key), version in currentVersions.items():
+            versions.setdefault(kind, {})[key] = version
+        snapshot = json.dumps({"segment" : segment, "documents" : documents, "history" : history,
+                               "commits" : commits, "versions" : versions}, separators=(',', ':'))
+        self._writeSnapshot(snapshot)
+
+        removed = 0
+        for number in self._segments():
+            if number <= oldSegment:
+                removed += os.path.getsize(self._segmentPath(number))
+                os.remove(self._segmentPath(number))
+
+        if self.materialize and not dirty.isEmpty():
+            for folder in ['users', 'projects', 'tasks', 'tasks/History']:
+                os.makedirs(os.path.join(self.root, folder), exist_ok=True)
+            JsonStorage(self.root).commit(dirty)
+
+        return {"segmentBytes" : removed, "snapshotBytes" : len(snapshot), "documents" : len(dirty.documents)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._logFile.close()
+        self._lockFile.close()
+
+
+class RemoteStorage(Storage):
+    """
+    A class to use the storage of a running daemon (python manager.py daemon) through its Unix socket.
+
+    The daemon keeps every document in memory, so a client never parses the data files itself. Changes are still
+    collected in a unit of work on the client side and sent to the daemon as one commit. Every request is a json
+    line {"op", "args"} and gets a json line back with either a "result" or an "error".
+
+    The daemon tells the data folder it serves when a client connects. It is the root of the files the clients keep
+    next to the documents (locks, audit and search), wherever the socket is.
+    """
+    def __init__(self, path : str = None):
+        super().__init__()
+        self.path = path or os.environ.get("TRELLOMIZE_SOCKET", "trellomize.sock")
+        self._root = None
+        self._socket = None
+        self._file = None
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._connect()
+        return self._root
+
+    def _connect(self) -> None:
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(self.path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            self._socket.close()
+            self._socket = None
+            raise RuntimeError(f"No daemon is listening on '{self.path}', start one with: python manager.py daemon")
+        self._file = self._socket.makefile('rwb')
+        self._root = self._call("root")
+
+    def _call(self, op : str, *args):
+        if self._socket is None:
+            self._connect()
+        self._file.write(json.dumps({"op" : op, "args" : args}, separators=(',', ':')).encode() + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            self.close()
+            raise RuntimeError(f"The daemon on '{self.path}' closed the connection.")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def _load(self, kind : str, key : str) -> dict:
+        return self._call("load", kind, key)
+
+    def _exists(self, kind : str, key : str) -> bool:
+        return self._call("exists", kind, key)
+
+    def _keys(self, kind : str) -> list:
+        return self._call("keys", kind)
+
+    def _reserve(self, kind : str, key : str, data) -> bool:
+        return self._call("reserve", kind, key, data)
+
+    def _version(self, kind : str, key : str):
+        return self._call("version", kind, key)
+
+    def loadAll(self, kind : str) -> dict:
+        if self._unit is not None:
+            return super().loadAll(kind)
+        return self._call("loadAll", kind)
+
+    def _historySize(self, taskID : str) -> int:
+        return self._call("historySize", taskID)
+
+    def _historyKeys(self) -> list:
+        return self._call("historyKeys")
+
+    def _readHistory(self, taskID : str, start : int, stop : int) -> list:
+        return self._call("readHistory", taskID, start, stop)
+
+    def _readHistoryBetween(self, taskID : str, since : str, until : str) -> list:
+        return self._call("readHistoryBetween", taskID, since, until)
+
+    def commit(self, unit : UnitOfWork) -> None:
+        documents = [[kind, key, data] for (kind, key), data in unit.documents.items()]
+        history = [[taskID, mode, records] for taskID, (mode, records) in unit.history.items()]
+        self._call("commit", documents, history)
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = None
+            self._file = None
+
+
+#***********************************************************************************************************************************************************
+#***********************************************************************************************************************************************************
+def fsyncDir(folder : str) -> None:
+    """
+    A function to make the renames and deletions inside a folder durable.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(folder or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def lockFile(file):
+    """
+    A function to hold an exclusive advisory lock on an open file (there is no locking where fcntl is missing).
+    """
+    if fcntl is None:
+        yield file
+        return
+
+    fcntl.flock(file, fcntl.LOCK_EX)
+    try:
+        yield file
+    finally:
+        fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def groupCommit(func):
+    """
+    A decorator to flush every document changed by a function in a single commit.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with getStorage().transaction():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+STORAGE_BACKENDS = {
+    "json" : JsonStorage,
+    "sqlite" : SqliteStorage,
+    "log" : LogStorage,
+    "daemon" : RemoteStorage
+}
+
+_storage = None
+
+
+def getStorage() -> Storage:
+    """
+    A function to get the storage backend chosen with TRELLOMIZE_STORAGE (json by default).
+    """
+    global _storage
+    if _storage is None:
+        backend = os.environ.get("TRELLOMIZE_STORAGE", "json")
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend '{backend}', choose one of: {', '.join(STORAGE_BACKENDS)}.")
+        _storage = STORAGE_BACKENDS[backend]()
+    return _storage
+
+
+def storageOpened() -> bool:
+    """
+    A function to tell whether the storage backend was already opened by this process.
+    """
+    return _storage is not None
+
+
+def setStorage(storage : Storage) -> None:
+    """
+    A function to replace the storage backend used by the app.
+    """
+    global _storage
+    _storage = storage
+
+
+def lockStats() -> dict:
+    """
+    A function to get how often the records of every kind were locked and how long this process waited for them.
+    """
+    return getStorage().recordLocks().stats()
+
+
+def cacheStats() -> dict:
+    """
+    A function to get the hit and miss counters of the identity map of the storage.
+    """
+    return getStorage().identityMap.stats()
@@ -0,0 +1,292 @@
+import json
+import os
+from datetime import datetime, timedelta
+from rich import print as rprint
+from main import Priority, Project, Status, Task, User, generate_unique_id, logger
+from storage import getStorage
+from audit import auditEvent
+from indexes import getAssignmentIndex
+from search import indexTasks
+
+IMPORT_BATCH = 500
+
+# list names that are taken as one of the statuses, any other open list goes to the backlog
+LIST_STATUSES = {
+    "backlog" : Status.BACKLOG,
+    "todo" : Status.TODO,
+    "to do" : Status.TODO,
+    "doing" : Status.DOING,
+    "in progress" : Status.DOING,
+    "done" : Status.DONE,
+    "archived" : Status.ARCHIVED,
+}
+
+# label names and, for labels without a name, label colors that are taken as one of the priorities
+LABEL_PRIORITIES = {
+    "low" : Priority.LOW,
+    "medium" : Priority.MEDIUM,
+    "high" : Priority.HIGH,
+    "critical" : Priority.CRITICAL,
+    "urgent" : Priority.CRITICAL,
+    "green" : Priority.LOW,
+    "yellow" : Priority.MEDIUM,
+    "orange" : Priority.HIGH,
+    "red" : Priority.CRITICAL,
+}
+PRIORITY_ORDER = [Priority.LOW, Priority.MEDIUM, Priority.HIGH, Priority.CRITICAL]
+
+
+class JsonStream:
+    """
+    A class to read a large json document piece by piece.
+
+    Only the top level object is walked: the value of each key can be decoded whole with value(), read one element
+    at a time with elements() when it is an array, or skipped. The buffer never holds more than one element plus a
+    chunk of the file, however large the document is.
+    """
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self._consumed = True
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char : str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of the buffer.")
+        self.pos += 1
+
+    def value(self):
+        self._consumed = True
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number that ends with the buffer may go on in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def elements(self):
+        self._consumed = True
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self._peek() == ",":
+                self.pos += 1
+            else:
+                self._expect("]")
+                return
+
+    def skip(self) -> None:
+        if self._peek() == "[":
+            for _ in self.elements():
+                pass
+        else:
+            self.value()
+
+    def keys(self):
+        """
+        A function to walk the keys of the top level object, a value the caller does not read is skipped.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            self._consumed = False
+            yield key
+            if not self._consumed:
+                self.skip()
+            if self._peek() == ",":
+                self.pos += 1
+            else:
+                self._expect("}")
+                return
+
+
+def readBoardInfo(path : str) -> dict:
+    """
+    A function to read the small parts of a Trello export: the board, its lists, labels and members.
+    """
+    info = {"name" : "", "desc" : "", "lists" : {}, "labels" : {}, "members" : {}}
+    with open(path, 'r', encoding="utf-8") as file:
+        stream = JsonStream(file)
+        for key in stream.keys():
+            if key in ["name", "desc"]:
+                info[key] = stream.value()
+            elif key == "lists":
+                for trelloList in stream.elements():
+                    status = Status.ARCHIVED if trelloList.get("closed") else LIST_STATUSES.get(trelloList["name"].strip().lower(), Status.BACKLOG)
+                    info["lists"][trelloList["id"]] = status
+            elif key == "labels":
+                for label in stream.elements():
+                    priority = LABEL_PRIORITIES.get((label.get("name") or "").strip().lower()) or LABEL_PRIORITIES.get(label.get("color") or "")
+                    if priority is not None:
+                        info["labels"][label["id"]] = priority
+            elif key == "members":
+                for member in stream.elements():
+                    info["members"][member["id"]] = member["username"]
+    return info
+
+
+def streamArray(path : str, name : str):
+    """
+    A function to go through the elements of one top level array of a Trello export.
+    """
+    with open(path, 'r', encoding="utf-8") as file:
+        stream = JsonStream(file)
+        for key in stream.keys():
+            if key == name:
+                yield from stream.elements()
+
+
+def trelloDatetime(value : str) -> str:
+    return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def cardToTask(card : dict, info : dict) -> Task:
+    status = Status.ARCHIVED if card.get("closed") else info["lists"].get(card.get("idList"), Status.BACKLOG)
+    priorities = [info["labels"][labelID] for labelID in card.get("idLabels", []) if labelID in info["labels"]]
+    priority = max(priorities, key=PRIORITY_ORDER.index) if priorities else Priority.LOW
+
+    createdDT = trelloDatetime(card["start"]) if card.get("start") else datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    deadlineDT = trelloDatetime(card["due"]) if card.get("due") else None
+    if deadlineDT is not None and deadlineDT < createdDT:
+        createdDT = (datetime.strptime(deadlineDT, "%Y-%m-%dT%H:%M:%S") - timedelta(hours=24)).strftime("%Y-%m-%dT%H:%M:%S")
+
+    task = Task(generate_unique_id(), card.get("name") or "noTitle", card.get("desc", ""), priority, status, createdDT, deadlineDT)
+    task.Assignees = [info["members"][memberID] for memberID in card.get("idMembers", []) if memberID in info["members"]]
+    return task
+
+
+def importTrello(path : str, projectID : str, admin : str) -> dict:
+    """
+    A function to turn a Trello board export into a project of the given admin.
+
+    The export is read three times as a stream: once for the lists, labels and members, once for the cards, which
+    become tasks, and once for the comments found in the actions. The writes are committed every IMPORT_BATCH
+    cards or comments, and the board of the project is saved once, after the last card. Until then the tasks
+    written so far are not on any board, like the tasks of an interrupted import that the garbage collection
+    reclaims, so its grace has to outlast an import. Apart from the board of the project itself, only the map
+    from card IDs to task IDs grows with the size of the export.
+    """
+    storage = getStorage()
+    adminUser = User.loadUser(admin)
+    if adminUser is None:
+        return None
+
+    # the export is read before the ID is taken, so a file that is not a board leaves the ID free
+    info = readBoardInfo(path)
+    if not storage.reserve("projectIDs", projectID):
+        rprint(f"[deep_pink2]The project ID '{projectID}' is already taken.[/deep_pink2]")
+        return None
+
+    project = Project(projectID, info["name"] or projectID, admin)
+    project.description = info["desc"]
+    members = sorted(set(username for username in info["members"].values() if username != admin))
+    project.members = members
+    adminUser.projects[projectID] = {"ProjectName" : project.title, "Admin" : admin, "Members" : list(members), "tasks" : []}
+    rprint(f"[turquoise4]Found {len(info['lists'])} lists, {len(info['labels'])} priority labels and {len(info['members'])} members.[/turquoise4]")
+
+    with storage.transaction():
+        # members that have no account yet get a user that keeps the project until they sign up
+        for username in members:
+            member = User.loadUser(username) if storage.exists("users", username) else User(username, "", "")
+            if projectID not in member.assignedProjects:
+                member.assignedProjects.append(projectID)
+            member.saveUser()
+        adminUser.saveUser()
+        project.saveProject(projectID)
+
+    counts = {"tasks" : 0, "comments" : 0}
+    taskIDs = {}
+
+    def commitBatch(batch : list) -> None:
+        assigned = {}
+        with storage.transaction():
+            for card, task in batch:
+                task.saveTask()
+                task.saveHistory(f"The {task.taskID} was imported from the Trello card {card['id']} by {admin}.")
+                for username in task.Assignees:
+                    assigned.setdefault(username, {})[task.taskID] = projectID
+            indexTasks([(task.taskID, projectID, task.taskTitle, task.Description, task.comments) for card, task in batch])
+            for username, tasks in assigned.items():
+                getAssignmentIndex().assignAll(username, tasks)
+
+    batch = []
+    for card in streamArray(path, "cards"):
+        task = cardToTask(card, info)
+        project.add_task(task)
+        adminUser.projects[projectID]["tasks"].append({"taskID" : task.taskID, "taskTitle" : task.taskTitle})
+        taskIDs[card["id"]] = task.taskID
+        batch.append((card, task))
+        counts["tasks"] += 1
+        if len(batch) >= IMPORT_BATCH:
+            commitBatch(batch)
+            batch = []
+            rprint(f"[turquoise4]Imported {counts['tasks']} cards...[/turquoise4]")
+    commitBatch(batch)
+    with storage.transaction():
+        project.saveProject(projectID)
+        adminUser.saveUser()
+
+    comments = []
+    def commitComments() -> None:
+        with storage.transaction():
+            touched = {}
+            for taskID, author, text in comments:
+                task = touched[taskID] = Task.loadTask(taskID)
+                # the actions of an export come newest first
+                task.comments.insert(0, f"{author}: {text}")
+                task.saveTask()
+            indexTasks([(task.taskID, projectID, task.taskTitle, task.Description, task.comments) for task in touched.values()])
+        comments.clear()
+
+    for action in streamArray(path, "actions"):
+        if action.get("type") != "commentCard":
+            continue
+        taskID = taskIDs.get(action.get("data", {}).get("card", {}).get("id"))
+        if taskID is None:
+            continue
+        comments.append((taskID, action.get("memberCreator", {}).get("username", "unknown"), action["data"].get("text", "")))
+        counts["comments"] += 1
+        if len(comments) >= IMPORT_BATCH:
+            commitComments()
+            rprint(f"[turquoise4]Imported {counts['comments']} comments...[/turquoise4]")
+    commitComments()
+
+    logger.info(f"The Trello board in '{os.path.basename(path)}' was imported into project '{projectID}' by '{admin}'.")
+    auditEvent(admin, "import-trello", projectID, new=counts["tasks"])
+    return counts
@@ -0,0 +1,78 @@
+import asyncio
+import base64
+import json
+import unittest
+from api import ApiServer, Request, TrellomizeApi
+from main import User, hashPassword
+from storage import getStorage
+from unitTestHelpers import StorageTestCase
+
+AUTH = {"authorization" : "Basic " + base64.b64encode(b"ali:pw").decode()}
+
+class testApi(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        for username in ["ali", "sara"]:
+            getStorage().save("accounts", username, {"username" : username, "password" : hashPassword("pw"), "email" : f"{username}@gmail.com", "activityStatus" : "active", "loginStatus" : "logged out"})
+            User(username, f"{username}@gmail.com", hashPassword("pw")).saveUser()
+        self.api = TrellomizeApi()
+
+    def call(self, method : str, target : str, body : dict = None, headers : dict = AUTH):
+        server = ApiServer(self.api)
+        return server.serve(Request(method, target, dict(headers), json.dumps(body).encode() if body is not None else b""))
+
+    def test_routes(self):
+        self.assertEqual(self.call("GET", "/projects", headers={}).status, 401)
+        self.assertEqual(self.call("POST", "/projects", {"projectID" : "P1", "title" : "board"}).status, 201)
+        self.assertEqual(self.call("POST", "/projects/P1/members", {"username" : "sara"}).status, 200)
+        for i in range(3):
+            response = self.call("POST", "/projects/P1/tasks", {"title" : f"task {i}", "status" : "TODO"})
+            self.assertEqual(response.status, 201)
+        taskID = response.data["taskID"]
+
+        page = self.call("GET", "/projects/P1/tasks?size=2&page=2").data
+        self.assertEqual((page["total"], [row["taskTitle"] for row in page["items"]]), (3, ["task 2"]))
+        self.assertEqual(self.call("PATCH", f"/projects/P1/tasks/{taskID}", {"status" : "DONE", "priority" : "HIGH"}).status, 200)
+        self.assertEqual(self.call("GET", f"/projects/P1/tasks?status=DONE").data["items"][0]["taskID"], taskID)
+        self.assertEqual(self.call("PATCH", f"/projects/P1/tasks/{taskID}", {"status" : "LATER", "title" : "kept"}).status, 400)
+        self.assertEqual(self.call("GET", f"/projects/P1/tasks/{taskID}").data["taskTitle"], "task 2", "A failed change keeps nothing.")
+
+        self.assertEqual(self.call("POST", f"/projects/P1/tasks/{taskID}/comments", {"comment" : "hello"}).status, 200)
+        self.assertEqual(self.call("GET", f"/projects/P1/tasks/{taskID}/comments").data["items"], ["hello"])
+        self.assertEqual(self.call("GET", f"/projects/P1/tasks/{taskID}/history?size=1").data["total"], 4)
+
+        sara = {"authorization" : "Basic " + base64.b64encode(b"sara:pw").decode()}
+        self.assertEqual(self.call("GET", "/projects/P1", headers=sara).status, 200)
+        self.assertEqual(self.call("DELETE", "/projects/P1", headers=sara).status, 403)
+        self.assertEqual(self.call("GET", "/projects/P2").status, 404)
+
+        self.assertEqual(self.call("POST", f"/projects/P1/tasks/{taskID}/assignees", {"username" : "sara"}).status, 200)
+        self.assertEqual([task["taskID"] for task in self.call("GET", "/tasks", headers=sara).data["items"]], [taskID])
+
+    def test_etag_keep_alive(self):
+        self.call("POST", "/projects", {"projectID" : "P1", "title" : "board"})
+
+        async def fetch():
+            server = await ApiServer(self.api).start("127.0.0.1", 0)
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+            statuses = []
+            etag = ""
+            for _ in range(2):
+                writer.write(f"GET /projects/P1 HTTP/1.1\r\nHost: localhost\r\nAuthorization: {AUTH['authorization']}\r\nIf-None-Match: {etag}\r\n\r\n".encode())
+                headers = {}
+                statuses.append(int((await reader.readline()).split()[1]))
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                await reader.readexactly(int(headers["content-length"]))
+                etag = headers["etag"]
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return statuses
+
+        self.assertEqual(asyncio.run(fetch()), [200, 304], "The second request reuses the connection and gets a 304.")
+
+
+if __name__ == "__main__":
+    unittest.main()
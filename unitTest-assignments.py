@@ -0,0 +1,47 @@
+import unittest
+from indexes import getAssignmentIndex
+from main import User, hashPassword
+from storage import getStorage
+from unitTestHelpers import StorageTestCase
+
+class testAssignmentIndex(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User("ali", "ali@gmail.com", hashPassword("pw"))
+        self.admin.saveUser()
+        User("sara", "sara@gmail.com", hashPassword("pw")).saveUser()
+        self.taskIDs = {}
+        for prID in ["P1", "P2"]:
+            self.admin.createProject(prID, "board")
+            self.admin.add_member_to_project(prID, "sara")
+            self.taskIDs[prID] = [self.admin.createTask(prID, "2", f"{prID} task {i}", "", "LOW", "TODO", "2024-05-01T10:00:00", f"2024-05-0{i + 2}T10:00:00").taskID for i in range(2)]
+
+    def test_maintained(self):
+        self.admin.add_assignee_to_task("P1", self.taskIDs["P1"][1], "sara")
+        self.admin.add_assignee_to_task("P2", self.taskIDs["P2"][0], "sara")
+        self.admin.add_assignee_to_task("P2", self.taskIDs["P2"][1], "ali")
+        sara = User.loadUser("sara")
+        self.assertEqual([(task["projectID"], task["taskTitle"]) for task in sara.assignedTasks()], [("P2", "P2 task 0"), ("P1", "P1 task 1")])
+
+        self.admin.remove_assignee_from_task("P1", self.taskIDs["P1"][1], "sara")
+        self.assertEqual(list(getAssignmentIndex().tasksOf("sara")), [self.taskIDs["P2"][0]])
+        self.admin.delTask("P2", self.taskIDs["P2"][0])
+        self.assertEqual(getAssignmentIndex().tasksOf("sara"), {})
+        self.admin.delete_project("P2", "yes")
+        self.assertEqual(getAssignmentIndex().tasksOf("ali"), {})
+
+    def test_rebuild(self):
+        self.admin.add_assignee_to_task("P1", self.taskIDs["P1"][0], "sara")
+        self.admin.add_assignee_to_task("P2", self.taskIDs["P2"][1], "sara")
+        storage = getStorage()
+        for key in storage.keys("assignments"):
+            storage.delete("assignments", key)
+
+        index = getAssignmentIndex()
+        index.checked = False
+        self.assertEqual(index.tasksOf("sara"), {self.taskIDs["P1"][0] : "P1", self.taskIDs["P2"][1] : "P2"})
+        self.assertEqual(index.tasksOf("ali"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
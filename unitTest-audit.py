@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+from audit import AuditLog
+from storage import JsonStorage
+
+class testAuditLog(unittest.TestCase):
+    def test_query(self):
+        with tempfile.TemporaryDirectory() as root:
+            audit = AuditLog(JsonStorage(root))
+            audit.record("ali", "create-project", "P1", new="board", time="2024-05-01 09:00:00")
+            audit.record("ali", "change-status", "P1", "t1", "TODO", "DONE", time="2024-05-02 10:00:00")
+            audit.record("sara", "add-comment", "P1", "t1", new="done?", time="2024-05-02 11:00:00")
+            audit.record("ali", "create-project", "P2", new="other", time="2024-05-03 12:00:00")
+
+            self.assertEqual(audit.days(), ["2024-05-01", "2024-05-02", "2024-05-03"])
+            self.assertEqual([event["action"] for event in audit.query(actor="ali", project="P1")], ["create-project", "change-status"])
+            self.assertEqual([event["actor"] for event in audit.query(since="2024-05-02", until="2024-05-02")], ["ali", "sara"])
+            self.assertEqual([event["project"] for event in audit.query(since="2024-05-02 10:30:00")], ["P1", "P2"])
+            self.assertEqual(list(audit.query(actor="ali", action="change-status"))[0]["old"], "TODO")
+
+            # the index of a day read by an earlier query catches up with the events recorded since
+            audit.record("sara", "create-project", "P3", new="third", time="2024-05-03 13:00:00")
+            self.assertEqual([event["project"] for event in audit.query(actor="sara")], ["P1", "P3"])
+            self.assertEqual(list(audit.query(project="P9")), [])
+
+            with open(os.path.join(root, "audit", "audit-2024-05-03.idx"), 'a') as f:
+                f.write('[120, 4')
+            self.assertEqual(len(list(audit.query(actor="ali"))), 3, "A partly written index line is skipped.")
+
+
+if __name__ == "__main__":
+    unittest.main()
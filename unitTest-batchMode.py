@@ -0,0 +1,80 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import unittest
+from main import BatchRunner, Project, User, hashPassword, batchLogin
+from storage import JsonStorage, getStorage
+from unitTestHelpers import StorageTestCase
+
+class testBatchMode(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        getStorage().save("accounts", "ali", {"username" : "ali", "password" : hashPassword("pw"), "email" : "ali@gmail.com", "activityStatus" : "active", "loginStatus" : "logged in"})
+        User("ali", "ali@gmail.com", hashPassword("pw")).saveUser()
+
+    def test_script(self):
+        user = batchLogin("ali", "pw")
+        self.assertIsNone(batchLogin("ali", "wrong"))
+
+        script = [
+            {"op" : "create-project", "projectID" : "P1", "title" : "board"},
+            {"op" : "create-task", "projectID" : "P1", "title" : "first", "ref" : "a"},
+            {"op" : "change-status", "projectID" : "P1", "taskID" : "@a", "status" : "DONE"},
+            {"op" : "change-status", "projectID" : "P1", "taskID" : "@a", "status" : "LATER"},
+            {"op" : "comment", "projectID" : "P1", "taskID" : "@a", "comment" : "looks good"},
+        ]
+        out = io.StringIO()
+        summary = BatchRunner(user, out).run(json.dumps(op) for op in script)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertEqual((summary["ok"], summary["failed"]), (4, 1))
+        self.assertFalse(results[3]["ok"], "An unknown status fails on its own.")
+        project = Project.loadProject("P1")
+        self.assertEqual(project.tasks["DONE"]["LOW"], [{"taskID" : results[1]["taskID"], "taskTitle" : "first"}])
+
+    def test_conflict_falls_back_to_single_commits(self):
+        user = batchLogin("ali", "pw")
+        user.createProject("P1", "board")
+        taskID = user.createTask("P1", "2", "first", "", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00").taskID
+        other = JsonStorage(self.root.name)
+
+        runner = BatchRunner(user, io.StringIO())
+        comment = runner.operations["comment"]
+        interfered = []
+
+        # another process comments on the task before the batch is committed, the first time only
+        def commentElsewhere(op):
+            outcome = comment(op)
+            if not interfered:
+                interfered.append(True)
+                data = other.load("tasks", taskID)
+                data["Comments"].append("elsewhere")
+                data["version"] += 1
+                other.save("tasks", taskID, data, data["version"] - 1)
+            return outcome
+
+        runner.operations["comment"] = commentElsewhere
+        script = [
+            {"op" : "comment", "projectID" : "P1", "taskID" : taskID, "comment" : "mine"},
+            {"op" : "retitle-project", "projectID" : "P1", "title" : "renamed"},
+        ]
+        summary = runner.run(json.dumps(op) for op in script)
+
+        self.assertEqual((summary["ok"], summary["failed"]), (2, 0))
+        self.assertEqual(getStorage().load("tasks", taskID)["Comments"], ["elsewhere", "mine"])
+        self.assertEqual(Project.loadProject("P1").title, "renamed")
+
+    def test_batch_argument(self):
+        main = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+        script = json.dumps({"op" : "create-project", "projectID" : "P1", "title" : "board"}) + "\n"
+        done = subprocess.run([sys.executable, main, "--batch", "-", "--username", "ali", "--password", "pw"], cwd=self.root.name,
+                              input=script, capture_output=True, text=True, env=dict(os.environ, TRELLOMIZE_STORAGE="json"))
+        self.assertEqual(done.returncode, 0, done.stderr)
+        self.assertTrue(json.loads(done.stdout.splitlines()[-1])["ok"])
+        self.assertIsNotNone(JsonStorage(self.root.name).load("projects", "P1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
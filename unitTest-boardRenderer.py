@@ -0,0 +1,47 @@
+import unittest
+from main import BoardRenderer, Project, Task, Priority, Status
+
+class testBoardRenderer(unittest.TestCase):
+    def test_cells(self):
+        project = Project("p1", "test", "ali")
+        for i in range(3):
+            project.add_task(Task(f"t{i}", f"task {i}"))
+        project.move_task("t2", Status.DONE.value, Priority.HIGH.value)
+
+        board = BoardRenderer()
+        board.render(project)
+        self.assertEqual(board.stats, {"built" : 2, "reused" : 0})
+
+        first = board.cell_table(project, "DONE", "HIGH")
+        project.retitle_task("t0", "renamed")
+        board.render(project)
+        self.assertEqual(board.stats["built"], 3, "Only the cell of the renamed task is built again.")
+        self.assertIs(board.cell_table(project, "DONE", "HIGH"), first)
+
+        # the same project read again with another process's change gets new cell versions
+        reread = Project("p1", "test", "ali")
+        reread.add_task(Task("t9", "from elsewhere"))
+        self.assertIsNot(board.cell_table(reread, "BACKLOG", "LOW"), board.cell_table(project, "BACKLOG", "LOW"))
+
+    def test_pages(self):
+        project = Project("p1", "test", "ali")
+        for i in range(25):
+            project.add_task(Task(f"t{i}", f"task {i}"))
+
+        board = BoardRenderer(pageSize=10)
+        self.assertEqual(board.page_count(project), 3)
+        self.assertTrue(board.jump_to(project, 2))
+        self.assertFalse(board.jump_to(project, 3))
+        board.render(project)
+        cell = board.cell_table(project, "BACKLOG", "LOW")
+        self.assertEqual(cell.row_count, 5)
+        self.assertEqual(cell.caption, "rows 21-25 of 25")
+
+        for i in range(10):
+            project.remove_task(f"t{i}")
+        board.render(project)
+        self.assertEqual(board.page, 1, "The board goes back to its last page when a page disappears.")
+
+
+if __name__ == "__main__":
+    unittest.main()
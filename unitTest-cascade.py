@@ -0,0 +1,53 @@
+import glob
+import os
+import unittest
+from cascade import collectGarbage, deleteProject
+from main import User, hashPassword
+from storage import JsonStorage, getStorage
+from unitTestHelpers import StorageTestCase
+
+class testCascade(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User("ali", "ali@gmail.com", hashPassword("pw"))
+        self.admin.saveUser()
+        User("sara", "sara@gmail.com", hashPassword("pw")).saveUser()
+        self.admin.createProject("P1", "board")
+        self.admin.add_member_to_project("P1", "sara")
+        self.taskIDs = [self.admin.createTask("P1", "2", f"task {i}", "", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00").taskID for i in range(3)]
+
+    def test_delete_project(self):
+        storage = getStorage()
+        self.assertEqual(sorted(storage.historyKeys()), sorted(self.taskIDs))
+        self.assertTrue(self.admin.delete_project("P1", "yes"))
+
+        self.assertFalse(storage.exists("projects", "P1"))
+        self.assertEqual(storage.keys("tasks"), [])
+        self.assertEqual(storage.historyKeys(), [])
+        self.assertEqual(User.loadUser("sara").assignedProjects, [])
+        self.assertNotIn("P1", User.loadUser("ali").projects)
+        self.assertEqual(collectGarbage(storage, 0), {"tasks" : 0, "history" : 0, "memberships" : 0, "pending" : 0})
+
+    def test_delete_never_written_task(self):
+        storage = getStorage()
+        self.assertEqual(deleteProject(storage, "P1", ["never-written-task"])["tasks"], 4)
+        self.assertEqual(glob.glob(os.path.join(self.root.name, "journal-*.json")), [])
+        self.assertEqual(JsonStorage(self.root.name).keys("tasks"), [])
+
+    def test_collect_orphans(self):
+        storage = getStorage()
+        # what a crash in the middle of the old delete could leave behind
+        storage.delete("projects", "P1")
+        storage.delete("tasks", self.taskIDs[0])
+        storage.save("tasks", "lost", {"taskID" : "lost"})
+
+        self.assertEqual(collectGarbage(storage), {"tasks" : 0, "history" : 0, "memberships" : 2, "pending" : 4})
+        self.assertEqual(User.loadUser("sara").assignedProjects, [])
+        counts = collectGarbage(storage, 0)
+        self.assertEqual(counts, {"tasks" : 3, "history" : 1, "memberships" : 0, "pending" : 0})
+        self.assertEqual(storage.keys("tasks"), [])
+        self.assertEqual(storage.historyKeys(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
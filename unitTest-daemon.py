@@ -0,0 +1,65 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from storage import JsonStorage, LogStorage, RemoteStorage
+from unitTestHelpers import makeFolders
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "The daemon needs Unix sockets.")
+class testDaemon(unittest.TestCase):
+    def test_clients(self):
+        from daemon import StorageServer
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "trellomize.sock")
+            storage = LogStorage(root, materialize=False)
+            server = StorageServer(path, storage)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            first, second = RemoteStorage(path), RemoteStorage(path)
+            try:
+                with first.transaction():
+                    first.save("tasks", "t1", {"taskID" : "t1", "taskTitle" : "first"})
+                    first.appendHistory("t1", "created", "2024-05-01 10:00:00")
+                    self.assertIsNone(second.load("tasks", "t1"), "Nothing is sent before the commit.")
+
+                self.assertEqual(second.load("tasks", "t1")["taskTitle"], "first")
+                self.assertEqual(second.readHistory("t1"), [{"time" : "2024-05-01 10:00:00", "note" : "created"}])
+                self.assertEqual(second.keys("tasks"), ["t1"])
+                self.assertTrue(second.reserve("projectIDs", "p1"))
+                self.assertFalse(first.reserve("projectIDs", "p1"))
+
+                version = first.version("tasks", "t1")
+                second.save("tasks", "t1", {"taskID" : "t1", "taskTitle" : "second"})
+                self.assertNotEqual(first.version("tasks", "t1"), version)
+                with self.assertRaises(RuntimeError):
+                    first._call("drop", "tasks")
+            finally:
+                first.close()
+                second.close()
+                server.shutdown()
+                server.server_close()
+                storage.close()
+
+    def test_existing_json_documents(self):
+        from daemon import StorageServer
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as sockets:
+            makeFolders(root)
+            JsonStorage(root).save("projects", "p1", {"projectID" : "p1", "title" : "board"})
+            path = os.path.join(sockets, "trellomize.sock")
+            storage = LogStorage(root)
+            server = StorageServer(path, storage)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            client = RemoteStorage(path)
+            try:
+                self.assertEqual(client.load("projects", "p1")["title"], "board")
+                # the files kept next to the documents go to the data folder of the daemon, not next to the socket
+                self.assertEqual(client.root, os.path.abspath(root))
+            finally:
+                client.close()
+                server.shutdown()
+                server.server_close()
+                storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
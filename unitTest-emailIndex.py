@@ -0,0 +1,28 @@
+import tempfile
+import unittest
+from indexes import EmailIndex
+from storage import SqliteStorage
+
+class testEmailIndex(unittest.TestCase):
+    def test_email_index(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = SqliteStorage(root)
+            storage.save("accounts", "ali", {"username" : "ali", "email" : "Ali@Gmail.com"})
+
+            emailIndex = EmailIndex(storage)
+            self.assertTrue(emailIndex.contains("ali@gmail.com"), "The index should be rebuilt from the accounts.")
+            self.assertFalse(emailIndex.contains("reza@gmail.com"))
+
+            self.assertTrue(emailIndex.add("reza@gmail.com", "reza"))
+            self.assertTrue(emailIndex.contains(" REZA@gmail.com"))
+            self.assertFalse(EmailIndex(storage).add("Reza@gmail.com", "sara"), "An email is only taken once, by whichever index asks first.")
+
+            self.assertFalse(emailIndex.change("reza@gmail.com", "ali@gmail.com", "reza"))
+            self.assertTrue(emailIndex.contains("reza@gmail.com"), "A change to a taken email keeps the old one.")
+            self.assertTrue(emailIndex.change("reza@gmail.com", "new@gmail.com", "reza"))
+            self.assertFalse(emailIndex.contains("reza@gmail.com"))
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import gzip
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from main import CustomFormatter, makeLogHandler, startLogListener
+
+class testLogging(unittest.TestCase):
+    def test_formatter(self):
+        formatter = CustomFormatter()
+        built = formatter.formatters[logging.INFO]
+        record = logging.LogRecord("root", logging.INFO, __file__, 1, "'%s' has successfully logged in.", ("ali",), None)
+        self.assertRegex(formatter.format(record), r"^INFO - .* - root\) 'ali' has successfully logged in\.$")
+        self.assertIs(formatter.formatters[logging.INFO], built)
+
+    def test_rotation(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "logfile.log")
+            logger = logging.getLogger("test.rotation")
+            # the records are only written to this log, not to the log of the app
+            logger.propagate = False
+            listener = startLogListener(logger, makeLogHandler(path, 200, 2, True))
+            for i in range(20):
+                logger.info("record %d", i)
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+            self.assertEqual(sorted(os.listdir(root)), ["logfile.log", "logfile.log.1.gz", "logfile.log.2.gz"])
+            lines = []
+            for backup in [".2.gz", ".1.gz"]:
+                with gzip.open(path + backup, 'rt') as f:
+                    lines += f.read().splitlines()
+            with open(path) as f:
+                lines += f.read().splitlines()
+            self.assertTrue(lines[-1].endswith("record 19"))
+            numbers = [int(line.split()[-1]) for line in lines]
+            self.assertEqual(numbers, list(range(numbers[0], 20)), "The kept files hold the newest records in order.")
+
+    def test_exit_leaves_storage_closed(self):
+        with tempfile.TemporaryDirectory() as root:
+            environment = dict(os.environ, TRELLOMIZE_STORAGE="log", PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+            subprocess.run([sys.executable, "-c", "import main"], cwd=root, env=environment, check=True)
+            self.assertFalse(os.path.exists(os.path.join(root, "wal")), "Importing main does not open the storage at exit.")
+            self.assertFalse(os.path.exists(os.path.join(root, "logfile.log")), "The log file is created by the first record.")
+
+
+if __name__ == "__main__":
+    unittest.main()
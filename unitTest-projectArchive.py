@@ -0,0 +1,44 @@
+import os
+import unittest
+from main import Project, Task, User, hashPassword
+from storage import getStorage
+from archive import exportProject, importProject, prefetch
+from unitTestHelpers import StorageTestCase
+
+class testProjectArchive(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        User("ali", "ali@gmail.com", hashPassword("pw")).saveUser()
+
+    def test_prefetch(self):
+        self.assertEqual(list(prefetch(lambda x : x * x, range(50), 3)), [x * x for x in range(50)])
+
+    def test_round_trip(self):
+        project = Project("P1", "board", "ali")
+        project.members = ["sara"]
+        for i in range(5):
+            task = Task(f"t{i}", f"task {i}")
+            task.comments = [f"ali: comment {i}"]
+            task.saveTask()
+            for j in range(3):
+                task.saveHistory(f"note {j}")
+            project.add_task(task)
+        project.saveProject("P1")
+
+        path = os.path.join(self.root.name, "P1.jsonl.gz")
+        self.assertEqual(exportProject("P1", path), {"tasks" : 5, "history" : 15})
+        self.assertIsNone(importProject(path), "The project ID is already taken.")
+        self.assertEqual(importProject(path, "P2"), {"tasks" : 5, "history" : 15})
+
+        copy = Project.loadProject("P2")
+        rows = copy.tasks["BACKLOG"]["LOW"]
+        self.assertEqual([row["taskTitle"] for row in rows], [f"task {i}" for i in range(5)])
+        self.assertNotIn(rows[0]["taskID"], [f"t{i}" for i in range(5)], "The copied tasks get new IDs.")
+        self.assertEqual(Task.loadTask(rows[0]["taskID"]).comments, ["ali: comment 0"])
+        self.assertEqual([record["note"] for record in getStorage().readHistory(rows[0]["taskID"])], ["note 0", "note 1", "note 2"])
+        self.assertEqual(User.loadUser("ali").projects["P2"]["tasks"], rows)
+        self.assertEqual(User.loadUser("sara").assignedProjects, ["P2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
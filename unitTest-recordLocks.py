@@ -0,0 +1,80 @@
+import multiprocessing
+import threading
+import unittest
+from main import Task, User, hashPassword
+from storage import JsonStorage, LockTimeout, RecordLocks, setStorage
+from unitTestHelpers import StorageTestCase
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def comment(root : str, username : str, taskID : str, count : int) -> None:
+    setStorage(JsonStorage(root))
+    user = User.loadUser(username)
+    for i in range(count):
+        user.addComment("P1", taskID, f"{username} {i}")
+
+
+@unittest.skipIf(fcntl is None, "The record locks need fcntl.")
+class testRecordLocks(StorageTestCase):
+    def test_no_lost_comments(self):
+        admin = User("ali", "ali@gmail.com", hashPassword("pw"))
+        admin.saveUser()
+        User("sara", "sara@gmail.com", hashPassword("pw")).saveUser()
+        admin.createProject("P1", "board")
+        admin.add_member_to_project("P1", "sara")
+        task = admin.createTask("P1", "2", "task", "", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00")
+        admin.add_assignee_to_task("P1", task.taskID, "sara")
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=comment, args=(self.root.name, username, task.taskID, 25)) for username in ["ali", "sara"]]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        setStorage(JsonStorage(self.root.name))
+        self.assertEqual(len(Task.loadTask(task.taskID).comments), 50, "No comment of either process is lost.")
+
+    def test_granularity(self):
+        first = RecordLocks(self.root.name, timeout=0.05)
+        second = RecordLocks(self.root.name, timeout=0.05)
+
+        taken = first.acquire([("projects", "P1")])
+        # an unrelated project is not held up, the same one is
+        second.release(second.acquire([("projects", "P2")]))
+        with self.assertRaises(LockTimeout):
+            second.acquire([("tasks", "t1"), ("projects", "P1")])
+        self.assertEqual(second.acquire([("tasks", "t1")]), [("tasks", "t1")], "A failed call keeps none of its locks.")
+        first.release(taken)
+
+        stats = second.stats()
+        self.assertEqual((stats["projects"]["locks"], stats["projects"]["timeouts"]), (1, 1))
+        self.assertGreaterEqual(stats["projects"]["waitSeconds"], 0.05)
+
+    def test_shared_and_reentrant(self):
+        first = RecordLocks(self.root.name, timeout=0.05)
+        second = RecordLocks(self.root.name, timeout=0.05)
+
+        taken = first.acquire([], [("projects", "P1")])
+        second.release(second.acquire([], [("projects", "P1")]))
+        with self.assertRaises(LockTimeout):
+            second.acquire([("projects", "P1")])
+
+        # the same thread locks a record it holds again and only lets it go with the last release
+        again = first.acquire([("tasks", "t1")], [("projects", "P1")])
+        first.release(taken)
+        errors = []
+        waiter = threading.Thread(target=lambda : errors.append(self.assertRaises(LockTimeout, second.acquire, [("projects", "P1")])))
+        waiter.start()
+        waiter.join()
+        self.assertEqual(len(errors), 1)
+        first.release(again)
+        second.release(second.acquire([("projects", "P1"), ("tasks", "t1")]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import unittest
+import search
+from main import User, hashPassword
+from search import SearchIndex, getSearchIndex
+from storage import getStorage
+from unitTestHelpers import StorageTestCase
+
+class testSearch(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ali = User("ali", "ali@gmail.com", hashPassword("pw"))
+        self.ali.saveUser()
+        self.sara = User("sara", "sara@gmail.com", hashPassword("pw"))
+        self.sara.saveUser()
+        self.ali.createProject("P1", "board")
+        self.sara.createProject("P2", "other board")
+        self.login = self.ali.createTask("P1", "2", "Fix the login page", "The login button does nothing", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00").taskID
+        self.report = self.ali.createTask("P1", "2", "Weekly report", "Mention the login fix", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00").taskID
+        self.hidden = self.sara.createTask("P2", "2", "Login for admins", "", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00").taskID
+
+    def test_ranked_and_scoped(self):
+        self.assertEqual([result["taskID"] for result in self.ali.searchTasks("login")], [self.login, self.report])
+        self.assertEqual([result["taskID"] for result in self.sara.searchTasks("LOGIN")], [self.hidden])
+        self.assertEqual([result["taskID"] for result in self.ali.searchTasks("button here")], [self.login])
+        self.assertEqual(self.ali.searchTasks("admins"), [])
+
+    def test_incremental(self):
+        self.assertEqual(self.ali.searchTasks("invoice"), [])
+        self.ali.addComment("P1", self.report, "attach the invoice")
+        self.assertEqual([result["taskID"] for result in self.ali.searchTasks("invoice")], [self.report])
+        self.ali.clearComments("P1", self.report)
+        self.assertEqual(self.ali.searchTasks("invoice"), [])
+
+        self.ali.change_task_title("P1", self.report, "Monthly summary")
+        self.assertEqual([result["taskTitle"] for result in self.ali.searchTasks("summary")], ["Monthly summary"])
+        self.ali.delTask("P1", self.login)
+        self.assertEqual([result["taskID"] for result in self.ali.searchTasks("login")], [self.report])
+        self.ali.delete_project("P1", "yes")
+        self.assertEqual(self.ali.searchTasks("summary"), [])
+
+    def test_persisted(self):
+        self.ali.searchTasks("login")
+        self.ali.addComment("P1", self.report, "attach the invoice")
+        # another process loads the snapshot and the changes logged after it
+        index = SearchIndex(getStorage())
+        self.assertEqual([result["taskID"] for result in index.search("invoice", ["P1"])], [self.report])
+
+        previous = search.SEARCH_COMPACT_BYTES
+        search.SEARCH_COMPACT_BYTES = 1
+        try:
+            self.ali.addComment("P1", self.login, "checked the invoice")
+            self.assertEqual(len(getSearchIndex().search("invoice", ["P1"])), 2)
+        finally:
+            search.SEARCH_COMPACT_BYTES = previous
+        self.assertEqual(os.path.getsize(os.path.join(self.root.name, "search", "changes.log")), 0)
+        self.assertEqual(len(index.search("invoice", ["P1"])), 2, "A new snapshot is read again.")
+
+        shutil.rmtree(os.path.join(self.root.name, "search"))
+        self.assertEqual(len(SearchIndex(getStorage()).search("invoice", ["P1"])), 2, "A missing index is built from the tasks.")
+
+
+if __name__ == "__main__":
+    unittest.main()
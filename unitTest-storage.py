@@ -0,0 +1,380 @@
+import base64
+import glob
+import json
+import os
+import tempfile
+import unittest
+from storage import CODECS, IdentityMap, JsonStorage, LogStorage, ProjectIDRegistry, SqliteStorage, decodeDocument
+from unitTestHelpers import makeFolders
+
+class testStorage(unittest.TestCase):
+    def checkBackend(self, storage):
+        storage.save("tasks", "t1", {"taskID" : "t1", "taskTitle" : "first"})
+        self.assertEqual(storage.load("tasks", "t1")["taskTitle"], "first")
+        self.assertTrue(storage.exists("tasks", "t1"))
+        self.assertEqual(storage.keys("tasks"), ["t1"])
+
+        storage.save("accounts", "ali", {"username" : "ali", "email" : "ali@gmail.com"})
+        self.assertEqual(storage.loadAll("accounts"), {"ali" : {"username" : "ali", "email" : "ali@gmail.com"}})
+
+        storage.appendHistory("t1", "created")
+        storage.appendHistory("t1", "renamed")
+        storage.appendHistory("t1", "closed", "2024-05-03 10:00:00")
+        self.assertEqual([record["note"] for record in storage.readHistory("t1")], ["created", "renamed", "closed"])
+        self.assertEqual(storage.readHistory("t1", -1), [{"time" : "2024-05-03 10:00:00", "note" : "closed"}])
+        self.assertEqual(storage.historySize("t1"), 3)
+
+        storage.delete("tasks", "t1")
+        self.assertIsNone(storage.load("tasks", "t1"))
+        self.assertFalse(storage.exists("tasks", "t1"))
+
+        # a commit may delete records that were never written next to the ones it writes
+        with storage.transaction():
+            storage.save("tasks", "t2", {"taskID" : "t2"})
+            storage.appendHistory("t2", "created")
+            storage.delete("tasks", "never")
+            storage.deleteHistory("never")
+            storage.delete("projects", "never")
+        self.assertEqual(storage.keys("tasks"), ["t2"])
+        self.assertEqual(storage.historySize("t2"), 1)
+        self.assertIsNone(storage.historySize("never"))
+
+    def test_json(self):
+        with tempfile.TemporaryDirectory() as root:
+            makeFolders(root)
+            self.checkBackend(JsonStorage(root))
+
+    def test_sqlite(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = SqliteStorage(root)
+            self.checkBackend(storage)
+            storage.close()
+
+    def test_log(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = LogStorage(root, materialize=False)
+            self.checkBackend(storage)
+            storage.close()
+
+
+class testAccountShards(unittest.TestCase):
+    def test_migration(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, "users.json"), 'w') as f:
+                f.write('{"ali": {"username": "ali", "activityStatus": "active"}, "sara": {"username": "sara", "activityStatus": "inactive"}}')
+            storage = JsonStorage(root)
+            self.assertFalse(os.path.exists(os.path.join(root, "users.json")))
+            self.assertEqual(sorted(storage.keys("accounts")), ["ali", "sara"])
+            self.assertEqual(storage.load("accounts", "sara")["activityStatus"], "inactive")
+            self.assertTrue(os.path.exists(os.path.join(root, "accounts", *storage._shards("ali", 1), "ali.json")))
+
+            storage.save("accounts", "reza", {"username" : "reza"})
+            self.assertEqual(len(storage.keys("accounts")), 3)
+            self.assertEqual(JsonStorage(root).migrateAccounts(), 0, "The registry is only split once.")
+
+
+class testShardedLayout(unittest.TestCase):
+    def test_migration(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "tasks", "History", "t1"))
+            os.makedirs(os.path.join(root, "users"))
+            with open(os.path.join(root, "users", "ali.json"), 'w') as f:
+                f.write('{"username": "ali"}')
+            with open(os.path.join(root, "tasks", "t1.json"), 'w') as f:
+                f.write('{"taskID": "t1", "version": 1}')
+            with open(os.path.join(root, "tasks", "History", "t1", "index.json"), 'w') as f:
+                f.write('{"segments": [{"first": 0, "count": 1, "bytes": 48, "since": "2024-05-01 09:00:00", "until": "2024-05-01 09:00:00"}]}')
+            with open(os.path.join(root, "tasks", "History", "t1", "segment-000000.jsonl"), 'w') as f:
+                f.write('{"time":"2024-05-01 09:00:00","note":"created"}\n')
+            with open(os.path.join(root, "tasks", "History", "history-t2.txt"), 'w') as f:
+                f.write("[2024-05-01 09:00:00] : created\n")
+
+            storage = JsonStorage(root)
+            storage.save("tasks", "t3", {"taskID" : "t3"})
+            self.assertEqual(storage.load("users", "ali"), {"username" : "ali"})
+            self.assertEqual(sorted(storage.keys("tasks")), ["t1", "t3"])
+            self.assertEqual(storage.readHistory("t1"), [{"time" : "2024-05-01 09:00:00", "note" : "created"}])
+            self.assertTrue(os.path.exists(os.path.join(root, "tasks", *storage._shards("t3", 2), "t3.json")))
+
+            self.assertEqual(storage.migrateLayout(), {"users" : 1, "tasks" : 1, "history" : 2})
+            self.assertEqual(sorted(entry.name for entry in os.scandir(os.path.join(root, "tasks")) if entry.is_file()), [])
+            self.assertEqual(sorted(os.listdir(os.path.join(root, "tasks", "History"))), sorted(set(storage._shards("t1", 2)[:1] + storage._shards("t2", 2)[:1])))
+            self.assertTrue(os.path.exists(os.path.join(root, "users", *storage._shards("ali", 2), "ali.json")))
+
+            storage = JsonStorage(root)
+            self.assertEqual(storage.load("tasks", "t1")["version"], 1)
+            self.assertEqual(sorted(storage.keys("tasks")), ["t1", "t3"])
+            storage.appendHistory("t1", "renamed")
+            self.assertEqual([record["note"] for record in storage.readHistory("t1")], ["created", "renamed"])
+            self.assertEqual([record["note"] for record in storage.readHistory("t2")], ["created"])
+            self.assertEqual(storage.migrateLayout(), {"users" : 0, "tasks" : 0, "history" : 0})
+
+    def test_flat_history_is_moved_on_write(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "tasks", "History", "t1"))
+            with open(os.path.join(root, "tasks", "History", "t1", "index.json"), 'w') as f:
+                f.write('{"segments": [{"first": 0, "count": 1, "bytes": 48, "since": "2024-05-01 09:00:00", "until": "2024-05-01 09:00:00"}]}')
+            with open(os.path.join(root, "tasks", "History", "t1", "segment-000000.jsonl"), 'w') as f:
+                f.write('{"time":"2024-05-01 09:00:00","note":"created"}\n')
+            storage = JsonStorage(root)
+            storage.appendHistory("t1", "renamed")
+            self.assertEqual(storage._historyFolder("t1"), storage._shardedHistoryFolder("t1"))
+            self.assertEqual(os.listdir(os.path.join(root, "tasks", "History", "t1")), [])
+            self.assertEqual([record["note"] for record in storage.readHistory("t1")], ["created", "renamed"])
+
+    def test_delete_never_written(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = JsonStorage(root)
+            with storage.transaction():
+                storage.save("tasks", "t1", {"taskID" : "t1"})
+                storage.appendHistory("t1", "created")
+                storage.delete("tasks", "never")
+                storage.deleteHistory("never")
+                storage.delete("users", "nobody")
+            self.assertEqual(glob.glob(os.path.join(root, "journal-*.json")), [])
+            self.assertEqual(JsonStorage(root).load("tasks", "t1"), {"taskID" : "t1"})
+
+    def test_recover_missing_folders(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = JsonStorage(root)
+            storage.save("tasks", "t1", {"taskID" : "t1"})
+            # a journal written before deletes of records that were never created were left out of it
+            with open(os.path.join(root, "journal-1-1.json"), 'w') as f:
+                json.dump({"renames" : [[storage._path("tasks", "t1") + ".1.tmp", storage._path("tasks", "t1")]],
+                           "deletes" : [storage._path("tasks", "never"), storage._historyIndexPath(storage._shardedHistoryFolder("never"))],
+                           "appends" : []}, f)
+            self.assertEqual(JsonStorage(root).load("tasks", "t1"), {"taskID" : "t1"})
+            self.assertEqual(glob.glob(os.path.join(root, "journal-*.json")), [])
+
+
+class testCodec(unittest.TestCase):
+    def test_round_trip(self):
+        task = {"taskID" : "t1", "taskTitle" : "first", "Priority" : "HIGH", "Status" : "DOING", "Assignees" : ["ali"]}
+        board = {status : {priority : [] for priority in ["LOW", "MEDIUM", "HIGH", "CRITICAL"]} for status in ["BACKLOG", "TODO", "DOING", "DONE", "ARCHIVED"]}
+        board["DOING"]["HIGH"].append({"taskID" : "t1", "taskTitle" : "first"})
+        project = {"projectID" : "p1", "tasks" : board}
+        for codec in CODECS.values():
+            self.assertEqual(decodeDocument("tasks", codec.encode("tasks", task)), task)
+            self.assertEqual(decodeDocument("projects", codec.encode("projects", project)), project)
+
+    def test_mixed_formats(self):
+        with tempfile.TemporaryDirectory() as root:
+            JsonStorage(root, codec=CODECS["json"]).save("tasks", "t1", {"taskTitle" : "old", "Priority" : "LOW", "Status" : "TODO"})
+            storage = JsonStorage(root, codec=CODECS["binary"])
+            self.assertEqual(storage.load("tasks", "t1")["taskTitle"], "old")
+            storage.save("tasks", "t2", {"taskTitle" : "new", "Priority" : "LOW", "Status" : "TODO"})
+            self.assertEqual(JsonStorage(root, codec=CODECS["json"]).load("tasks", "t2")["Status"], "TODO")
+
+
+class testHistory(unittest.TestCase):
+    def checkQueries(self, storage):
+        for i in range(60):
+            storage.appendHistory("t2", f"note {i}", f"2024-05-01 10:{i:02d}:00")
+        self.assertEqual(storage.historySize("t2"), 60)
+        self.assertEqual([record["note"] for record in storage.readHistory("t2", -3)], ["note 57", "note 58", "note 59"])
+        self.assertEqual([record["note"] for record in storage.readHistoryPage("t2", 2)], [f"note {i}" for i in range(20, 30)])
+        between = storage.readHistoryBetween("t2", "2024-05-01 10:15:00", "2024-05-01 10:17:00")
+        self.assertEqual([record["note"] for record in between], ["note 15", "note 16", "note 17"])
+
+    def test_segments(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "tasks", "History"))
+            with open(os.path.join(root, "tasks", "History", "history-t1.txt"), 'w') as f:
+                f.write("[2024-05-01 09:00:00] : created\n")
+            storage = JsonStorage(root)
+            storage.HISTORY_SEGMENT_BYTES = 256
+            self.assertEqual(storage.readHistory("t1"), [{"time" : "2024-05-01 09:00:00", "note" : "created"}])
+
+            storage.appendHistory("t1", "renamed")
+            self.assertEqual([record["note"] for record in storage.readHistory("t1")], ["created", "renamed"])
+            self.assertFalse(os.path.exists(os.path.join(root, "tasks", "History", "history-t1.txt")))
+
+            self.checkQueries(storage)
+            self.assertGreater(len(os.listdir(storage._historyFolder("t2"))), 3)
+            storage.clearHistory("t2")
+            self.assertEqual(storage.readHistory("t2"), [])
+            storage.deleteHistory("t2")
+            self.assertIsNone(storage.readHistory("t2"))
+
+    def test_backends(self):
+        with tempfile.TemporaryDirectory() as root:
+            for storage in [SqliteStorage(root), LogStorage(root, materialize=False)]:
+                storage.save("tasks", "t2", {"taskID" : "t2"})
+                self.checkQueries(storage)
+                storage.close()
+
+
+class testLogStorage(unittest.TestCase):
+    def test_replay_and_compact(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = LogStorage(root)
+            storage.save("projects", "p1", {"projectID" : "p1", "title" : "old"})
+            storage.save("projects", "p1", {"projectID" : "p1", "title" : "new"})
+            storage.appendHistory("t1", "created")
+            storage.close()
+
+            storage = LogStorage(root)
+            self.assertEqual(storage.load("projects", "p1")["title"], "new")
+            storage.compact()
+            storage.save("users", "ali", {"Username" : "ali"})
+            storage.close()
+
+            with open(os.path.join(root, "wal", "segment-000002.log"), 'a') as f:
+                f.write('{"changes": [{"op": "del')
+
+            storage = LogStorage(root)
+            self.assertEqual(storage.load("users", "ali"), {"Username" : "ali"})
+            self.assertEqual([record["note"] for record in storage.readHistory("t1")], ["created"])
+            self.assertTrue(os.path.exists(os.path.join(root, "projects", "p1.json")))
+            storage.close()
+
+    def test_versions_survive_compact(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = LogStorage(root, materialize=False)
+            storage.save("projects", "p1", {"title" : "first"})
+            storage.save("projects", "p2", {"title" : "other"})
+            storage.save("projects", "p2", {"title" : "other again"})
+            seen = storage.version("projects", "p2")
+            storage.compact()
+            storage.close()
+
+            storage = LogStorage(root, materialize=False)
+            self.assertEqual(storage.version("projects", "p2"), seen)
+            # a change after the restart never gets a version the document had before
+            storage.save("projects", "p1", {"title" : "changed"})
+            self.assertGreater(storage.version("projects", "p1"), seen)
+            storage.close()
+
+    def test_opens_json_documents(self):
+        with tempfile.TemporaryDirectory() as root:
+            makeFolders(root)
+            jsonStorage = JsonStorage(root)
+            jsonStorage.save("accounts", "ali", {"username" : "ali"})
+            jsonStorage.save("projects", "p1", {"projectID" : "p1", "title" : "board"})
+            jsonStorage.save("tasks", "t1", {"taskID" : "t1", "taskTitle" : "first"})
+            jsonStorage.appendHistory("t1", "created")
+            jsonStorage.reserve("projectIDs", "p1", True)
+
+            storage = LogStorage(root)
+            self.assertEqual(storage.load("projects", "p1")["title"], "board")
+            self.assertEqual(storage.keys("accounts"), ["ali"])
+            self.assertFalse(storage.reserve("projectIDs", "p1", True))
+            storage.save("tasks", "t1", {"taskID" : "t1", "taskTitle" : "renamed"})
+            storage.compact()
+            storage.close()
+
+            # the documents the log did not change are left as they were by the compaction
+            jsonStorage = JsonStorage(root)
+            self.assertEqual(jsonStorage.load("projects", "p1")["title"], "board")
+            self.assertEqual(jsonStorage.load("tasks", "t1")["taskTitle"], "renamed")
+            self.assertEqual([record["note"] for record in jsonStorage.readHistory("t1")], ["created"])
+
+            # once the log has a snapshot it is the source of the documents, the json files are not read again
+            jsonStorage.save("projects", "p2", {"projectID" : "p2"})
+            storage = LogStorage(root)
+            self.assertEqual(storage.load("tasks", "t1")["taskTitle"], "renamed")
+            self.assertIsNone(storage.load("projects", "p2"))
+            storage.close()
+
+
+class testUnitOfWork(unittest.TestCase):
+    def test_transaction(self):
+        with tempfile.TemporaryDirectory() as root:
+            makeFolders(root)
+            storage = JsonStorage(root)
+
+            with storage.transaction():
+                storage.save("projects", "p1", {"projectID" : "p1"})
+                storage.save("users", "ali", {"Username" : "ali"})
+                self.assertTrue(storage.exists("projects", "p1"))
+                self.assertFalse(os.path.exists(os.path.join(root, "projects", "p1.json")))
+            self.assertTrue(os.path.exists(os.path.join(root, "projects", "p1.json")))
+
+            with self.assertRaises(KeyError):
+                with storage.transaction():
+                    storage.delete("projects", "p1")
+                    raise KeyError("p1")
+            self.assertTrue(storage.exists("projects", "p1"))
+
+    def test_recover(self):
+        with tempfile.TemporaryDirectory() as root:
+            makeFolders(root)
+            tmpPath = os.path.join(root, "projects", "p1.json.1.tmp")
+            with open(tmpPath, 'w') as f:
+                f.write('{"projectID": "p1"}')
+            with open(os.path.join(root, "journal-1.json"), 'w') as f:
+                f.write('{"renames": [["%s", "%s"]], "deletes": [], "appends": []}' % (tmpPath, os.path.join(root, "projects", "p1.json")))
+
+            storage = JsonStorage(root)
+            self.assertEqual(storage.load("projects", "p1"), {"projectID" : "p1"})
+            self.assertFalse(os.path.exists(os.path.join(root, "journal-1.json")))
+
+    def test_recover_writes(self):
+        with tempfile.TemporaryDirectory() as root:
+            makeFolders(root)
+            storage = JsonStorage(root)
+            storage.appendHistory("t1", "created")
+            segmentPath = storage._historySegmentPath(storage._shardedHistoryFolder("t1"), 0)
+            size = os.path.getsize(segmentPath)
+            # the process stopped after its journal was durable and before the files were written
+            with open(os.path.join(root, "journal-1-1.json"), 'w') as f:
+                json.dump({"writes" : [[os.path.join(root, "projects", "p1.json"), base64.b64encode(b'{"projectID": "p1"}').decode("ascii")]],
+                           "deletes" : [], "appends" : [[segmentPath, size, '{"time":"2024-05-01 10:00:00","note":"renamed"}\n']]}, f)
+            with open(segmentPath, 'a') as f:
+                f.write('{"time":"2024-05')
+
+            storage = JsonStorage(root)
+            self.assertEqual(storage.load("projects", "p1"), {"projectID" : "p1"})
+            with open(segmentPath) as f:
+                self.assertEqual(f.read().splitlines()[-1], '{"time":"2024-05-01 10:00:00","note":"renamed"}')
+            self.assertEqual(glob.glob(os.path.join(root, "journal-*.json")), [])
+
+
+class testIdentityMap(unittest.TestCase):
+    def test_version(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = SqliteStorage(root)
+            storage.save("tasks", "t1", {"taskTitle" : "first"})
+            task = object()
+            storage.identityMap.put("tasks", "t1", storage.version("tasks", "t1"), task)
+            self.assertIs(storage.identityMap.get("tasks", "t1", storage.version("tasks", "t1")), task)
+
+            storage.save("tasks", "t1", {"taskTitle" : "second"})
+            self.assertIsNone(storage.identityMap.get("tasks", "t1", storage.version("tasks", "t1")))
+            self.assertEqual(storage.identityMap.stats()["hits"], 1)
+            storage.close()
+
+    def test_capacity(self):
+        identityMap = IdentityMap(2)
+        for key in ["a", "b", "c"]:
+            identityMap.put("tasks", key, 1, key)
+        self.assertIsNone(identityMap.get("tasks", "a", 1))
+        self.assertEqual(identityMap.get("tasks", "c", 1), "c")
+        self.assertEqual(identityMap.stats()["evictions"], 1)
+
+
+class testProjectIDRegistry(unittest.TestCase):
+    def test_reserve(self):
+        with tempfile.TemporaryDirectory() as root:
+            first = ProjectIDRegistry(root)
+            second = ProjectIDRegistry(root)
+            self.assertTrue(first.reserve("p1"))
+            self.assertFalse(second.reserve("p1"), "Another process already took this ID.")
+            self.assertTrue(second.contains("p1"))
+            self.assertTrue(second.reserve("p2"))
+            self.assertEqual(sorted(first.keys()), ["p1", "p2"])
+
+            second.release("p1")
+            self.assertFalse(first.contains("p1"), "The ID was given back by another process.")
+            self.assertTrue(first.reserve("p1"))
+
+    def test_sqlite_reserve(self):
+        with tempfile.TemporaryDirectory() as root:
+            storage = SqliteStorage(root)
+            self.assertTrue(storage.reserve("projectIDs", "p1"))
+            self.assertFalse(storage.reserve("projectIDs", "p1"))
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from main import Project, Task, Priority, Status
+
+class testTaskLocator(unittest.TestCase):
+    def test_locator(self):
+        project = Project("p1", "test", "ali")
+        for i in range(3):
+            project.add_task(Task(f"t{i}", f"task {i}"))
+        self.assertEqual(project.locate_task("t2"), ["BACKLOG", "LOW", 2])
+
+        project.remove_task("t0")
+        self.assertEqual(project.locate_task("t2"), ["BACKLOG", "LOW", 1], "The tasks below the removed one move up a row.")
+        self.assertEqual([row["taskID"] for row in project.tasks["BACKLOG"]["LOW"]], ["t1", "t2"], "The board keeps its order.")
+        self.assertIsNone(project.locate_task("t0"))
+
+        project.move_task("t1", Status.DONE.value, Priority.HIGH.value)
+        self.assertEqual(project.tasks["DONE"]["HIGH"], [{"taskID" : "t1", "taskTitle" : "task 1"}])
+        self.assertEqual(project.tasks["BACKLOG"]["LOW"], [{"taskID" : "t2", "taskTitle" : "task 2"}])
+
+        project.retitle_task("t1", "renamed")
+        project.build_locator()
+        self.assertEqual(project.locate_task("t1"), ["DONE", "HIGH", 0])
+        self.assertEqual(project.tasks["DONE"]["HIGH"][0]["taskTitle"], "renamed")
+
+
+if __name__ == "__main__":
+    unittest.main()
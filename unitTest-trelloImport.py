@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import unittest
+from main import Project, Task, User, hashPassword
+from storage import getStorage
+from trello import JsonStream, importTrello
+from unitTestHelpers import StorageTestCase
+
+class testTrelloImport(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        User("ali", "ali@gmail.com", hashPassword("pw")).saveUser()
+
+    def test_stream(self):
+        document = {"id" : 12345, "name" : "x" * 50, "cards" : [{"id" : i, "tags" : ["a", "b"]} for i in range(20)], "actions" : []}
+        stream = JsonStream(io.StringIO(json.dumps(document)))
+        stream.CHUNK_SIZE = 7
+        read = {}
+        for key in stream.keys():
+            if key == "cards":
+                read[key] = list(stream.elements())
+            elif key == "id":
+                read[key] = stream.value()
+        self.assertEqual(read, {"id" : 12345, "cards" : document["cards"]})
+
+    def test_import(self):
+        export = {
+            "name" : "board",
+            "desc" : "from trello",
+            "labels" : [{"id" : "l1", "name" : "", "color" : "red"}, {"id" : "l2", "name" : "Medium", "color" : "blue"}],
+            "lists" : [{"id" : "L1", "name" : "To Do"}, {"id" : "L2", "name" : "Done"}, {"id" : "L3", "name" : "Old", "closed" : True}],
+            "members" : [{"id" : "m1", "username" : "ali"}, {"id" : "m2", "username" : "sara"}],
+            "cards" : [
+                {"id" : "c1", "name" : "first", "idList" : "L1", "idLabels" : ["l2", "l1"], "idMembers" : ["m2"], "due" : "2030-01-01T10:00:00.000Z"},
+                {"id" : "c2", "name" : "second", "idList" : "L2", "idLabels" : []},
+                {"id" : "c3", "name" : "third", "idList" : "L3"},
+            ],
+            "actions" : [
+                {"type" : "commentCard", "data" : {"card" : {"id" : "c1"}, "text" : "newer"}, "memberCreator" : {"username" : "sara"}},
+                {"type" : "updateCard", "data" : {"card" : {"id" : "c1"}}},
+                {"type" : "commentCard", "data" : {"card" : {"id" : "c1"}, "text" : "older"}, "memberCreator" : {"username" : "ali"}},
+            ],
+        }
+        path = os.path.join(self.root.name, "export.json")
+        with open(path, 'w') as f:
+            json.dump(export, f)
+
+        self.assertEqual(importTrello(path, "P1", "ali"), {"tasks" : 3, "comments" : 2})
+        self.assertIsNone(importTrello(path, "P1", "ali"), "The project ID is already taken.")
+
+        project = Project.loadProject("P1")
+        self.assertEqual(project.members, ["sara"])
+        self.assertEqual([row["taskTitle"] for row in project.tasks["TODO"]["CRITICAL"]], ["first"])
+        self.assertEqual([row["taskTitle"] for row in project.tasks["DONE"]["LOW"]], ["second"])
+        self.assertEqual([row["taskTitle"] for row in project.tasks["ARCHIVED"]["LOW"]], ["third"])
+
+        task = Task.loadTask(project.tasks["TODO"]["CRITICAL"][0]["taskID"])
+        self.assertEqual(task.Assignees, ["sara"])
+        self.assertEqual(task.comments, ["ali: older", "sara: newer"])
+        self.assertEqual(User.loadUser("sara").assignedProjects, ["P1"])
+
+    def test_bad_export_keeps_id(self):
+        path = os.path.join(self.root.name, "export.json")
+        with open(path, 'w') as f:
+            f.write('{"name": "board", "lists": [')
+        with self.assertRaises(ValueError):
+            importTrello(path, "P1", "ali")
+        self.assertTrue(getStorage().reserve("projectIDs", "P1"), "A file that is not a board leaves the ID free.")
+
+
+if __name__ == "__main__":
+    unittest.main()
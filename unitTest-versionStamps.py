@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+from audit import getAuditLog
+from main import Task, User, hashPassword
+from storage import JsonStorage, VersionConflict, getStorage
+from unitTestHelpers import StorageTestCase
+
+class testVersionStamps(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User("ali", "ali@gmail.com", hashPassword("pw"))
+        self.admin.saveUser()
+        self.admin.createProject("P1", "board")
+        self.taskID = self.admin.createTask("P1", "2", "task", "", "LOW", "TODO", "2024-05-01T10:00:00", "2024-05-02T10:00:00").taskID
+        # another process that works on the same folder
+        self.other = JsonStorage(self.root.name)
+
+    def commentElsewhere(self, comment : str) -> None:
+        data = self.other.load("tasks", self.taskID)
+        data["Comments"].append(comment)
+        data["version"] += 1
+        self.other.save("tasks", self.taskID, data, data["version"] - 1)
+
+    def test_stale_save(self):
+        task = Task.loadTask(self.taskID)
+        self.assertEqual(task.version, 1)
+        self.commentElsewhere("elsewhere")
+
+        task.Description = "lost"
+        with self.assertRaises(VersionConflict):
+            task.saveTask()
+        stored = getStorage().load("tasks", self.taskID)
+        self.assertEqual((stored["version"], stored["Comments"], stored["taskDescription"]), (2, ["elsewhere"], ""))
+
+    def test_comment_merged(self):
+        original = Task.saveHistory
+        interfered = []
+
+        # the first time the comment is about to be saved another process comments first
+        def saveHistory(task, note):
+            if not interfered:
+                interfered.append(True)
+                self.commentElsewhere("elsewhere")
+            original(task, note)
+
+        Task.saveHistory = saveHistory
+        try:
+            # the comment is passed in once, running the change again never asks for it
+            with mock.patch("builtins.input", side_effect=AssertionError("prompted again")):
+                self.assertTrue(self.admin.addComment("P1", self.taskID, "mine"))
+        finally:
+            Task.saveHistory = original
+
+        stored = getStorage().load("tasks", self.taskID)
+        self.assertEqual((stored["version"], stored["Comments"]), (3, ["elsewhere", "mine"]))
+        self.assertEqual(len(list(getAuditLog().query(action="add-comment"))), 1, "The attempt that was run again left no event.")
+
+        with self.assertRaises(VersionConflict):
+            # a transaction opened by the caller is not run again
+            with getStorage().transaction():
+                self.admin.addComment("P1", self.taskID, "batched")
+                self.commentElsewhere("elsewhere again")
+        self.assertEqual(getStorage().load("tasks", self.taskID)["Comments"], ["elsewhere", "mine", "elsewhere again"])
+
+    def test_unversioned_document(self):
+        data = self.other.load("tasks", self.taskID)
+        del data["version"]
+        self.other.save("tasks", self.taskID, data)
+
+        task = Task.loadTask(self.taskID)
+        self.assertEqual(task.version, 0)
+        task.saveTask()
+        self.assertEqual(getStorage().load("tasks", self.taskID)["version"], 1)
+
+    def test_failed_create_gives_back_id(self):
+        with mock.patch.object(User, "saveUser", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.admin.createProject("P2", "lost")
+        self.assertIsNone(getStorage().load("projects", "P2"))
+        self.assertFalse(self.other.exists("projectIDs", "P2"), "The ID of a project that was not committed is free again.")
+        self.assertIsNotNone(self.admin.createProject("P2", "board"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+import storage
+from main import LOG_FILE, makeLogHandler, setLogHandler
+from storage import JsonStorage, setStorage
+
+# the folders createFilesFolders makes for the json storage
+FOLDERS = ['users', 'projects', 'tasks', 'tasks/History']
+
+
+def makeFolders(root : str) -> None:
+    """
+    A function to lay out the folders of a json storage in an empty folder.
+    """
+    for folder in FOLDERS:
+        os.makedirs(os.path.join(root, folder))
+
+
+class StorageTestCase(unittest.TestCase):
+    """
+    A class for the tests that run the app on a json storage of their own, in a temporary folder.
+
+    The storage in use before the test is put back afterwards. It is taken as it is, so a test never opens the
+    default storage in the working folder just to remember it. The log is written to the temporary folder as well.
+    """
+    def setUp(self):
+        self.previous = storage._storage
+        self.root = tempfile.TemporaryDirectory()
+        makeFolders(self.root.name)
+        setStorage(JsonStorage(self.root.name))
+        self.logHandler = setLogHandler(makeLogHandler(os.path.join(self.root.name, LOG_FILE)))
+
+    def tearDown(self):
+        setLogHandler(self.logHandler).close()
+        setStorage(self.previous)
+        self.root.cleanup()